@@ -1,4 +1,5 @@
 -- Создание схемы
+CREATE EXTENSION IF NOT EXISTS pg_trgm;  -- триграммный поиск по подстроке
 DROP SCHEMA IF EXISTS elibrary CASCADE;
 CREATE SCHEMA elibrary AUTHORIZATION postgres;
 
@@ -38,7 +39,10 @@ CREATE TABLE elibrary.articles (
     external_id INTEGER UNIQUE,  -- ID из внешней системы elibrary (опционально)
     title VARCHAR NOT NULL,
     year_pub INTEGER NOT NULL,
-    in_rinc BOOLEAN DEFAULT FALSE
+    in_rinc BOOLEAN DEFAULT FALSE,
+    content_hash VARCHAR(40),  -- хеш строки импорта (режим upsert)
+    search_vector TSVECTOR,  -- полнотекстовый вектор (russian): название + авторы
+    document JSONB  -- готовый JSON ArticleOut (read model), см. backend/utils/article_documents.py
 );
 
 -- Таблица авторов (внутренних и внешних)
@@ -46,6 +50,7 @@ CREATE TABLE elibrary.authors (
     id SERIAL PRIMARY KEY,
     article_id INTEGER NOT NULL,
     author_name TEXT NOT NULL,  -- имя автора как оно указано в статье
+    match_key VARCHAR(255),  -- ключ сопоставления "фамилия инициалы" (см. backend/utils/fio_utils.py)
     user_employee_id INTEGER,  -- ID сотрудника (если это внутренний автор)
     contribution REAL CHECK(contribution BETWEEN 0 AND 100),
     applied_for_award BOOLEAN NOT NULL DEFAULT FALSE,
@@ -62,12 +67,88 @@ CREATE TABLE elibrary.employee_articles (
     PRIMARY KEY (employee_id, article_id)
 );
 
+-- Сохранённые предложения статей: непривязанный автор -> возможный пользователь
+-- (ведутся инкрементально, см. backend/utils/suggestions.py)
+CREATE TABLE elibrary.suggestions (
+    author_id INT REFERENCES elibrary.authors(id) ON DELETE CASCADE,
+    user_id INT REFERENCES elibrary.users(id) ON DELETE CASCADE,
+    score REAL NOT NULL,  -- уверенность сопоставления (1.0 - точное совпадение ФИО)
+    PRIMARY KEY (author_id, user_id)
+);
+
+-- Фоновые задачи импорта CSV (состояние переживает перезапуск API)
+CREATE TABLE elibrary.import_jobs (
+    id SERIAL PRIMARY KEY,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',  -- queued, running, done, failed
+    mode VARCHAR(20) NOT NULL DEFAULT 'insert',  -- insert или upsert
+    filename VARCHAR(255),
+    file_path VARCHAR NOT NULL,  -- сохранённая копия загруженного файла
+    chunk_size INTEGER NOT NULL DEFAULT 2000,
+    created_by INT REFERENCES elibrary.users(id) ON DELETE SET NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    processed INTEGER NOT NULL DEFAULT 0,
+    chunks_done INTEGER NOT NULL DEFAULT 0,  -- обработано частей файла (продолжение после перезапуска)
+    imported INTEGER NOT NULL DEFAULT 0,
+    updated INTEGER NOT NULL DEFAULT 0,
+    unchanged INTEGER NOT NULL DEFAULT 0,
+    skipped INTEGER NOT NULL DEFAULT 0,
+    error_count INTEGER NOT NULL DEFAULT 0,
+    errors JSON NOT NULL DEFAULT '[]',  -- ошибки по строкам
+    elapsed_seconds REAL NOT NULL DEFAULT 0,
+    rows_per_second REAL NOT NULL DEFAULT 0,
+    peak_memory_mb REAL NOT NULL DEFAULT 0,
+    message TEXT  -- описание фатальной ошибки
+);
+
 -- Индексы для производительности
 CREATE INDEX idx_articles_external_id ON elibrary.articles (external_id);
 CREATE INDEX idx_articles_year_pub ON elibrary.articles (year_pub);
+CREATE INDEX idx_articles_year_pub_id ON elibrary.articles (year_pub, id);  -- курсорная пагинация по году
 CREATE INDEX idx_articles_in_rinc ON elibrary.articles (in_rinc);
 CREATE INDEX idx_authors_article_id ON elibrary.authors (article_id);
 CREATE INDEX idx_authors_user_employee_id ON elibrary.authors (user_employee_id);
+CREATE INDEX idx_authors_match_key ON elibrary.authors (match_key);
+CREATE INDEX idx_articles_title_trgm ON elibrary.articles USING gin (title gin_trgm_ops);
+CREATE INDEX idx_authors_author_name_trgm ON elibrary.authors USING gin (author_name gin_trgm_ops);
+CREATE INDEX idx_articles_search_vector ON elibrary.articles USING gin (search_vector);
 CREATE INDEX idx_users_role ON elibrary.users (role);
 CREATE INDEX idx_user_departments_user_id ON elibrary.user_departments (user_id);
-CREATE INDEX idx_user_departments_department_id ON elibrary.user_departments (department_id);
\ No newline at end of file
+CREATE INDEX idx_user_departments_department_id ON elibrary.user_departments (department_id);
+CREATE INDEX idx_import_jobs_status ON elibrary.import_jobs (status);
+CREATE INDEX idx_suggestions_user_id ON elibrary.suggestions (user_id);
+
+-- Статистика публикаций подразделений по годам (utils/department_stats.py).
+-- Обновляется после импорта CSV: REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE MATERIALIZED VIEW elibrary.department_stats_rollup AS
+WITH member AS (
+    SELECT ud.department_id, au.article_id,
+           count(*) AS member_authors,
+           coalesce(sum(au.contribution), 0) AS member_contribution,
+           count(*) FILTER (WHERE au.applied_for_award) AS award_applications
+    FROM elibrary.user_departments AS ud
+    JOIN elibrary.authors AS au ON au.user_employee_id = ud.user_id
+    GROUP BY ud.department_id, au.article_id
+),
+article_authors AS (
+    SELECT article_id,
+           count(user_employee_id) AS claimed_authors,
+           count(*) - count(user_employee_id) AS unclaimed_authors
+    FROM elibrary.authors
+    WHERE article_id IN (SELECT article_id FROM member)
+    GROUP BY article_id
+)
+SELECT m.department_id, a.year_pub,
+       count(*) AS articles,
+       count(*) FILTER (WHERE a.in_rinc) AS rinc_articles,
+       sum(aa.claimed_authors) AS claimed_authors,
+       sum(aa.unclaimed_authors) AS unclaimed_authors,
+       sum(m.member_authors) AS member_authors,
+       sum(m.member_contribution) AS total_contribution,
+       sum(m.award_applications) AS award_applications
+FROM member AS m
+JOIN elibrary.articles AS a ON a.id = m.article_id
+JOIN article_authors AS aa ON aa.article_id = m.article_id
+GROUP BY m.department_id, a.year_pub;
+CREATE UNIQUE INDEX idx_department_stats_rollup_key ON elibrary.department_stats_rollup (department_id, year_pub);
\ No newline at end of file
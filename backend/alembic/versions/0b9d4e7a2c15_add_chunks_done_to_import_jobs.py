@@ -0,0 +1,32 @@
+"""Add chunks_done to import_jobs
+
+Revision ID: 0b9d4e7a2c15
+Revises: e6f2a9c4d183
+Create Date: 2026-10-18 23:52:31.604118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b9d4e7a2c15'
+down_revision: Union[str, None] = 'e6f2a9c4d183'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'import_jobs',
+        sa.Column('chunks_done', sa.Integer(), nullable=False, server_default='0'),
+        schema='elibrary'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('import_jobs', 'chunks_done', schema='elibrary')
@@ -0,0 +1,29 @@
+"""Add (year_pub, id) index to articles table
+
+Revision ID: 2b7e9d03c5a1
+Revises: 8f1c2a7d4e10
+Create Date: 2026-10-18 11:42:37.905114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2b7e9d03c5a1'
+down_revision: Union[str, None] = '8f1c2a7d4e10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Индекс для курсорной пагинации GET /articles?pagination=cursor&order_by=year_pub
+    op.create_index('idx_articles_year_pub_id', 'articles', ['year_pub', 'id'], unique=False, schema='elibrary')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_articles_year_pub_id', table_name='articles', schema='elibrary')
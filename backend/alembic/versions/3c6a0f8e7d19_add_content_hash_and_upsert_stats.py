@@ -0,0 +1,56 @@
+"""Add content_hash to articles and upsert counters to import_jobs
+
+Revision ID: 3c6a0f8e7d19
+Revises: a91d5e6b3f02
+Create Date: 2026-10-18 17:36:09.640215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from utils.csv_importer import compute_content_hash
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c6a0f8e7d19'
+down_revision: Union[str, None] = 'a91d5e6b3f02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('articles', sa.Column('content_hash', sa.String(length=40), nullable=True), schema='elibrary')
+    op.add_column('import_jobs', sa.Column('mode', sa.String(length=20), nullable=False, server_default='insert'), schema='elibrary')
+    op.add_column('import_jobs', sa.Column('updated', sa.Integer(), nullable=False, server_default='0'), schema='elibrary')
+    op.add_column('import_jobs', sa.Column('unchanged', sa.Integer(), nullable=False, server_default='0'), schema='elibrary')
+
+    # Считаем хеш для уже импортированных статей, чтобы первый upsert
+    # не считал их все изменёнными
+    bind = op.get_bind()
+    articles = bind.execute(sa.text("""
+        SELECT a.id, a.title, a.year_pub, a.in_rinc,
+               coalesce(array_agg(au.author_name ORDER BY au.id) FILTER (WHERE au.id IS NOT NULL), '{}') AS authors
+        FROM elibrary.articles AS a
+        LEFT JOIN elibrary.authors AS au ON au.article_id = a.id
+        WHERE a.external_id IS NOT NULL
+        GROUP BY a.id
+    """)).fetchall()
+    if articles:
+        bind.execute(
+            sa.text("UPDATE elibrary.articles SET content_hash = :content_hash WHERE id = :id"),
+            [
+                {"id": row.id, "content_hash": compute_content_hash(row.title, row.year_pub, bool(row.in_rinc), list(row.authors))}
+                for row in articles
+            ]
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('import_jobs', 'unchanged', schema='elibrary')
+    op.drop_column('import_jobs', 'updated', schema='elibrary')
+    op.drop_column('import_jobs', 'mode', schema='elibrary')
+    op.drop_column('articles', 'content_hash', schema='elibrary')
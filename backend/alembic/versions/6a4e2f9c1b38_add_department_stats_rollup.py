@@ -0,0 +1,65 @@
+"""Add department_stats_rollup materialized view
+
+Revision ID: 6a4e2f9c1b38
+Revises: 3c6a0f8e7d19
+Create Date: 2026-10-18 19:02:47.118254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a4e2f9c1b38'
+down_revision: Union[str, None] = '3c6a0f8e7d19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Тот же расчёт, что utils.department_stats.department_stats_query, для всех подразделений.
+    # Уникальный индекс нужен для REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.execute("""
+        CREATE MATERIALIZED VIEW elibrary.department_stats_rollup AS
+        WITH member AS (
+            SELECT ud.department_id, au.article_id,
+                   count(*) AS member_authors,
+                   coalesce(sum(au.contribution), 0) AS member_contribution,
+                   count(*) FILTER (WHERE au.applied_for_award) AS award_applications
+            FROM elibrary.user_departments AS ud
+            JOIN elibrary.authors AS au ON au.user_employee_id = ud.user_id
+            GROUP BY ud.department_id, au.article_id
+        ),
+        article_authors AS (
+            SELECT article_id,
+                   count(user_employee_id) AS claimed_authors,
+                   count(*) - count(user_employee_id) AS unclaimed_authors
+            FROM elibrary.authors
+            WHERE article_id IN (SELECT article_id FROM member)
+            GROUP BY article_id
+        )
+        SELECT m.department_id, a.year_pub,
+               count(*) AS articles,
+               count(*) FILTER (WHERE a.in_rinc) AS rinc_articles,
+               sum(aa.claimed_authors) AS claimed_authors,
+               sum(aa.unclaimed_authors) AS unclaimed_authors,
+               sum(m.member_authors) AS member_authors,
+               sum(m.member_contribution) AS total_contribution,
+               sum(m.award_applications) AS award_applications
+        FROM member AS m
+        JOIN elibrary.articles AS a ON a.id = m.article_id
+        JOIN article_authors AS aa ON aa.article_id = m.article_id
+        GROUP BY m.department_id, a.year_pub
+    """)
+    op.execute(
+        "CREATE UNIQUE INDEX idx_department_stats_rollup_key "
+        "ON elibrary.department_stats_rollup (department_id, year_pub)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS elibrary.department_stats_rollup")
@@ -0,0 +1,46 @@
+"""Add search_vector to articles table
+
+Revision ID: 7e3f0b5a2c84
+Revises: d4a8c61f9b27
+Create Date: 2026-10-18 14:27:51.102938
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e3f0b5a2c84'
+down_revision: Union[str, None] = 'd4a8c61f9b27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('articles', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True), schema='elibrary')
+
+    # Заполняем вектор для уже существующих статей
+    op.execute("""
+        UPDATE elibrary.articles AS a
+        SET search_vector =
+            setweight(to_tsvector('russian', a.title), 'A') ||
+            setweight(to_tsvector('russian', coalesce(
+                (SELECT string_agg(au.author_name, ' ') FROM elibrary.authors AS au WHERE au.article_id = a.id),
+                ''
+            )), 'B')
+    """)
+
+    op.create_index(
+        'idx_articles_search_vector', 'articles', ['search_vector'], unique=False, schema='elibrary',
+        postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_articles_search_vector', table_name='articles', schema='elibrary')
+    op.drop_column('articles', 'search_vector', schema='elibrary')
@@ -0,0 +1,42 @@
+"""Add match_key to authors table
+
+Revision ID: 8f1c2a7d4e10
+Revises: 5d2b25b31853
+Create Date: 2026-10-18 10:05:12.418203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from utils.fio_utils import build_author_match_key
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f1c2a7d4e10'
+down_revision: Union[str, None] = '5d2b25b31853'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('authors', sa.Column('match_key', sa.String(length=255), nullable=True), schema='elibrary')
+
+    # Заполняем ключ для уже импортированных авторов
+    bind = op.get_bind()
+    authors = bind.execute(sa.text("SELECT id, author_name FROM elibrary.authors")).fetchall()
+    if authors:
+        bind.execute(
+            sa.text("UPDATE elibrary.authors SET match_key = :match_key WHERE id = :id"),
+            [{"id": row.id, "match_key": build_author_match_key(row.author_name)} for row in authors]
+        )
+
+    op.create_index('idx_authors_match_key', 'authors', ['match_key'], unique=False, schema='elibrary')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_authors_match_key', table_name='authors', schema='elibrary')
+    op.drop_column('authors', 'match_key', schema='elibrary')
@@ -0,0 +1,54 @@
+"""Add import_jobs table
+
+Revision ID: a91d5e6b3f02
+Revises: 7e3f0b5a2c84
+Create Date: 2026-10-18 16:03:44.218760
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a91d5e6b3f02'
+down_revision: Union[str, None] = '7e3f0b5a2c84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'import_jobs',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='queued'),
+        sa.Column('filename', sa.String(length=255), nullable=True),
+        sa.Column('file_path', sa.String(), nullable=False),
+        sa.Column('chunk_size', sa.Integer(), nullable=False, server_default='2000'),
+        sa.Column('created_by', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('processed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('imported', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('skipped', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('errors', postgresql.JSON(), nullable=False, server_default='[]'),
+        sa.Column('elapsed_seconds', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('rows_per_second', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('peak_memory_mb', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('message', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['created_by'], ['elibrary.users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+        schema='elibrary'
+    )
+    op.create_index('idx_import_jobs_status', 'import_jobs', ['status'], unique=False, schema='elibrary')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_import_jobs_status', table_name='import_jobs', schema='elibrary')
+    op.drop_table('import_jobs', schema='elibrary')
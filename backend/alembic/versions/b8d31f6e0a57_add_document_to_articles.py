@@ -0,0 +1,64 @@
+"""Add document (ArticleOut read model) to articles
+
+Revision ID: b8d31f6e0a57
+Revises: 6a4e2f9c1b38
+Create Date: 2026-10-18 20:14:31.502688
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d31f6e0a57'
+down_revision: Union[str, None] = '6a4e2f9c1b38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('articles', sa.Column('document', postgresql.JSONB(), nullable=True), schema='elibrary')
+
+    # Строим документы для существующих статей (тот же расчёт, что utils.article_documents)
+    op.execute("""
+        UPDATE elibrary.articles AS a
+        SET document = jsonb_build_object(
+            'id', a.id,
+            'external_id', a.external_id,
+            'title', a.title,
+            'year_pub', a.year_pub,
+            'in_rinc', coalesce(a.in_rinc, false),
+            'authors', coalesce((
+                SELECT jsonb_agg(jsonb_build_object(
+                    'id', au.id,
+                    'article_id', au.article_id,
+                    'author_name', au.author_name,
+                    'user_employee_id', au.user_employee_id,
+                    'contribution', coalesce(au.contribution, 0),
+                    'applied_for_award', au.applied_for_award,
+                    'award_applied_date', to_char(au.award_applied_date, 'YYYY-MM-DD')
+                ) ORDER BY au.id)
+                FROM elibrary.authors AS au
+                WHERE au.article_id = a.id
+            ), '[]'::jsonb),
+            'employees', coalesce((
+                SELECT jsonb_agg(jsonb_build_object(
+                    'id', u.id,
+                    'fio', u.full_name,
+                    'full_name', u.full_name
+                ) ORDER BY u.id)
+                FROM elibrary.employee_articles AS ea
+                JOIN elibrary.users AS u ON u.id = ea.employee_id
+                WHERE ea.article_id = a.id
+            ), '[]'::jsonb)
+        )
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('articles', 'document', schema='elibrary')
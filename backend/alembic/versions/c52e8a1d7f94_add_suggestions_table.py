@@ -0,0 +1,44 @@
+"""Add suggestions table
+
+Revision ID: c52e8a1d7f94
+Revises: b8d31f6e0a57
+Create Date: 2026-10-18 21:02:47.160935
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from utils.suggestions import rebuild_suggestions
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c52e8a1d7f94'
+down_revision: Union[str, None] = 'b8d31f6e0a57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'suggestions',
+        sa.Column('author_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['author_id'], ['elibrary.authors.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['elibrary.users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('author_id', 'user_id'),
+        schema='elibrary'
+    )
+    op.create_index('idx_suggestions_user_id', 'suggestions', ['user_id'], unique=False, schema='elibrary')
+
+    # Заполняем предложения для уже импортированных авторов и существующих пользователей
+    rebuild_suggestions(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_suggestions_user_id', table_name='suggestions', schema='elibrary')
+    op.drop_table('suggestions', schema='elibrary')
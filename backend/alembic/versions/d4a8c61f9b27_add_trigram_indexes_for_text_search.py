@@ -0,0 +1,39 @@
+"""Add pg_trgm indexes for article title and author name search
+
+Revision ID: d4a8c61f9b27
+Revises: 2b7e9d03c5a1
+Create Date: 2026-10-18 13:10:04.557390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a8c61f9b27'
+down_revision: Union[str, None] = '2b7e9d03c5a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Триграммные GIN-индексы обслуживают ILIKE '%...%' (search_title, search_author).
+    # Расширение ставим в public: search_path миграций указывает на elibrary
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA public")
+    op.create_index(
+        'idx_articles_title_trgm', 'articles', ['title'], unique=False, schema='elibrary',
+        postgresql_using='gin', postgresql_ops={'title': 'public.gin_trgm_ops'}
+    )
+    op.create_index(
+        'idx_authors_author_name_trgm', 'authors', ['author_name'], unique=False, schema='elibrary',
+        postgresql_using='gin', postgresql_ops={'author_name': 'public.gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_authors_author_name_trgm', table_name='authors', schema='elibrary')
+    op.drop_index('idx_articles_title_trgm', table_name='articles', schema='elibrary')
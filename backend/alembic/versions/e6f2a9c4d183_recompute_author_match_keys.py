@@ -0,0 +1,44 @@
+"""Recompute author match keys for compact initials
+
+Revision ID: e6f2a9c4d183
+Revises: c52e8a1d7f94
+Create Date: 2026-10-18 23:14:05.527391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from utils.fio_utils import build_author_match_key
+from utils.suggestions import rebuild_suggestions
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6f2a9c4d183'
+down_revision: Union[str, None] = 'c52e8a1d7f94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Слитные инициалы ("Иванов А.С.") теперь дают ключ с отчеством: "иванов ас" вместо "иванов а"
+    bind = op.get_bind()
+    authors = bind.execute(sa.text("SELECT id, author_name, match_key FROM elibrary.authors")).fetchall()
+    changed = [
+        {"id": row.id, "match_key": build_author_match_key(row.author_name)}
+        for row in authors
+        if row.author_name and build_author_match_key(row.author_name) != row.match_key
+    ]
+    if changed:
+        bind.execute(sa.text("UPDATE elibrary.authors SET match_key = :match_key WHERE id = :id"), changed)
+
+    # Предложения с несовпадающим отчеством больше не должны показываться
+    rebuild_suggestions(bind)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Ключи - производные данные author_name, откатывать нечего
+    pass
@@ -4,12 +4,32 @@ from database import get_db
 from models.article import Article, Author, User, EmployeeArticle, Department
 from models.article import User as UserAlias  # Избегаем конфликта имен
 from schemas.article import ArticleOut, AuthorUpdate, AuthorCreate, ArticleCreate
-from api.deps import get_current_active_user, get_current_admin_user, get_current_manager_user, check_user_can_edit_article
-from utils.fio_utils import generate_author_variants, match_author_with_user
-from typing import List, Optional
+from api.deps import (
+    get_current_active_user, get_current_admin_user, get_current_manager_user,
+    check_user_can_edit_article, get_editable_article_ids, get_manager_scope, ManagerScope
+)
+from utils.bulk_matcher import match_all
+from utils.fio_utils import build_author_match_key
+from utils.fuzzy_fio import FUZZY_MAX_DISTANCE, MAX_QUERY_DISTANCE, author_surname_index, surname_key
+from utils.suggestions import (
+    prune_author_suggestions, refresh_article_suggestions, suggested_article_rows
+)
+from utils.article_search import FTS_CONFIG, refresh_article_search_vectors
+from utils.article_documents import (
+    DOCUMENT_TEXT, article_documents, articles_response, document_list_response, document_response,
+    refresh_article_documents
+)
+from utils.article_counts import article_count_cache, estimate_query_rows, estimate_table_rows, ESTIMATE_EXACT_THRESHOLD
+from utils.request_metrics import query_budget
+from typing import List, Optional, Union
+from sqlalchemy import tuple_, func, select, update
 import urllib.parse
+import structlog
+import base64
+import json
 
 router = APIRouter()
+logger = structlog.get_logger(__name__)
 
 # Модель для ответа с пагинацией
 from pydantic import BaseModel
@@ -21,32 +41,65 @@ class PaginatedArticlesResponse(BaseModel):
     page: int
     pages: int
     per_page: int
+    total_is_exact: bool = True  # False, если total - оценка планировщика (count_mode=estimate)
 
-@router.get("/", response_model=PaginatedArticlesResponse)
-def get_articles(
-    page: int = 1,
-    per_page: int = 50,
-    search_id: Optional[int] = None,
-    search_external_id: Optional[int] = None,  # Новый параметр для поиска по external_id
-    search_title: Optional[str] = None,
-    search_author: Optional[str] = None,
-    db: Session = Depends(get_db)
-):
-    # Декодируем параметры, если они закодированы в URL
-    if search_title:
-        try:
-            # Используем unquote для корректной обработки кириллических символов
-            search_title = urllib.parse.unquote(search_title, encoding='utf-8')
-        except:
-            pass  # Если не удается декодировать, используем как есть
+# Модель для ответа с курсорной (keyset) пагинацией
+class CursorArticlesResponse(BaseModel):
+    articles: List[ArticleOut]
+    next_cursor: Optional[str] = None  # None - больше страниц нет
+    per_page: int
+
+# Допустимые порядки сортировки для курсорной пагинации
+CURSOR_ORDERINGS = {
+    "id": (Article.id,),
+    "year_pub": (Article.year_pub, Article.id),
+}
 
-    if search_author:
+def encode_cursor(order_by: str, values: tuple) -> str:
+    """
+    Кодирует позицию последней статьи страницы в непрозрачный токен.
+    """
+    payload = json.dumps({"o": order_by, "v": list(values)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, order_by: str) -> tuple:
+    """
+    Декодирует токен курсора и проверяет, что он выдан для того же порядка сортировки.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        values = tuple(int(v) for v in payload["v"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if payload.get("o") != order_by or len(values) != len(CURSOR_ORDERINGS[order_by]):
+        raise HTTPException(status_code=400, detail="Cursor does not match order_by")
+
+    return values
+
+def decode_search_param(value: Optional[str]) -> Optional[str]:
+    """Декодирует параметр поиска, если он закодирован в URL"""
+    if value:
         try:
             # Используем unquote для корректной обработки кириллических символов
-            search_author = urllib.parse.unquote(search_author, encoding='utf-8')
+            value = urllib.parse.unquote(value, encoding='utf-8')
         except:
             pass  # Если не удается декодировать, используем как есть
-    
+    return value
+
+def normalize_listing_params(
+    page: int,
+    per_page: int,
+    pagination: str,
+    after: Optional[str],
+    order_by: str,
+    count_mode: str
+) -> tuple:
+    """
+    Проверяет и нормализует параметры списка статей.
+    Возвращает (page, per_page, pagination).
+    """
     # Ограничиваем максимальное количество статей на странице
     if per_page > 150:
         per_page = 150
@@ -57,6 +110,143 @@ def get_articles(
     if per_page < 1:
         per_page = 1
 
+    # Токен курсора сам по себе включает курсорный режим
+    if after is not None:
+        pagination = "cursor"
+    if pagination not in ("page", "cursor"):
+        raise HTTPException(status_code=400, detail="pagination must be 'page' or 'cursor'")
+    if count_mode not in ("exact", "cached", "estimate"):
+        raise HTTPException(status_code=400, detail="count_mode must be 'exact', 'cached' or 'estimate'")
+    if order_by not in CURSOR_ORDERINGS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"order_by must be one of: {', '.join(CURSOR_ORDERINGS)}"
+        )
+
+    return page, per_page, pagination
+
+def fuzzy_author_match_keys(search_author: Optional[str], author_distance: int) -> Optional[List[str]]:
+    """
+    Ключи authors.match_key для нечёткого поиска по автору: фамилия из search_author
+    с точностью до е/ё, латиницы и author_distance опечаток (utils.fuzzy_fio),
+    инициалы, если указаны, - как начало инициалов автора. Читает только
+    снимок author_surname_index, без запросов к БД.
+    None - нечёткий поиск не запрошен (обычный поиск по подстроке).
+    """
+    if not 0 <= author_distance <= FUZZY_MAX_DISTANCE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"author_distance must be between 0 and {FUZZY_MAX_DISTANCE}"
+        )
+    if not search_author or author_distance == 0:
+        return None
+
+    surname, _, initials = build_author_match_key(search_author).partition(" ")
+    initials = surname_key(initials)
+    return sorted(
+        match_key
+        for match_key in author_surname_index.similar_match_keys(surname, author_distance)
+        if surname_key(match_key.partition(" ")[2]).startswith(initials)
+    )
+
+def article_filter_conditions(
+    search_id: Optional[int],
+    search_external_id: Optional[int],
+    search_title: Optional[str],
+    search_author: Optional[str],
+    author_match_keys: Optional[List[str]] = None
+) -> list:
+    """
+    Условия WHERE для фильтров списка статей. Используются и синхронным
+    (Query.filter), и асинхронным (select().where) вариантами эндпоинта.
+    author_match_keys (fuzzy_author_match_keys) заменяет поиск по подстроке имени автора.
+    """
+    conditions = []
+    if search_id:
+        conditions.append(Article.id == search_id)
+    if search_external_id:
+        conditions.append(Article.external_id == search_external_id)
+    if search_title:
+        # ILIKE '%...%' обслуживается индексом idx_articles_title_trgm (pg_trgm)
+        conditions.append(Article.title.ilike(f"%{search_title}%"))
+    if search_author and author_match_keys is not None:
+        # Нечёткий поиск: точные ключи по индексу idx_authors_match_key
+        conditions.append(Article.id.in_(
+            select(Author.article_id).where(Author.match_key.in_(author_match_keys))
+        ))
+    elif search_author:
+        # Поиск по автору - некоррелированный IN-подзапрос вместо EXISTS (any()),
+        # чтобы планировщик начинал с индекса idx_authors_author_name_trgm,
+        # а не проверял авторов для каждой статьи по очереди
+        matching_article_ids = select(Author.article_id).where(
+            Author.author_name.ilike(f"%{search_author}%")
+        )
+        conditions.append(Article.id.in_(matching_article_ids))
+    return conditions
+
+def next_cursor_for(articles: list, per_page: int, order_by: str) -> tuple:
+    """
+    Обрезает выборку из per_page + 1 статей до страницы и строит next_cursor.
+    Возвращает (статьи страницы, next_cursor или None).
+    """
+    if len(articles) <= per_page:
+        return articles, None
+    articles = articles[:per_page]
+    last = articles[-1]
+    sort_columns = CURSOR_ORDERINGS[order_by]
+    return articles, encode_cursor(order_by, tuple(getattr(last, c.key) for c in sort_columns))
+
+# Бюджеты запросов (utils.request_metrics.query_budget) не зависят от per_page:
+# связи, которые сериализует ArticleOut, загружаются явно (selectinload/joinedload)
+
+# Списки и карточка отдают готовые документы (utils.article_documents): COUNT (или EXPLAIN + COUNT)
+# + строки документов; запас на дозагрузку статей без документа (статьи + авторы + сотрудники)
+@router.get(
+    "/",
+    response_model=Union[PaginatedArticlesResponse, CursorArticlesResponse],
+    dependencies=[Depends(query_budget(6))]
+)
+def get_articles(
+    page: int = 1,
+    per_page: int = 50,
+    search_id: Optional[int] = None,
+    search_external_id: Optional[int] = None,  # Новый параметр для поиска по external_id
+    search_title: Optional[str] = None,
+    search_author: Optional[str] = None,
+    pagination: str = "page",  # "page" - номера страниц, "cursor" - курсор (keyset)
+    after: Optional[str] = None,  # Токен next_cursor из предыдущего ответа
+    order_by: str = "id",  # Порядок для курсорной пагинации: "id" или "year_pub"
+    count_mode: str = "exact",  # Подсчёт total: "exact", "cached" (кэш точного COUNT) или "estimate"
+    author_distance: int = 0,  # Нечёткий поиск по фамилии автора: допустимое число опечаток
+    db: Session = Depends(get_db)
+):
+    search_title = decode_search_param(search_title)
+    search_author = decode_search_param(search_author)
+    page, per_page, pagination = normalize_listing_params(page, per_page, pagination, after, order_by, count_mode)
+    author_match_keys = fuzzy_author_match_keys(search_author, author_distance)
+
+    # Формируем запрос
+    query = db.query(Article).filter(
+        *article_filter_conditions(search_id, search_external_id, search_title, search_author, author_match_keys)
+    )
+    document_columns = (Article.id, Article.year_pub, DOCUMENT_TEXT)
+
+    if pagination == "cursor":
+        # Keyset-пагинация: без COUNT(*) и OFFSET, время выборки не зависит от глубины
+        sort_columns = CURSOR_ORDERINGS[order_by]
+        if after is not None:
+            query = query.filter(tuple_(*sort_columns) > tuple_(*decode_cursor(after, order_by)))
+
+        # Берём на одну статью больше, чтобы узнать, есть ли следующая страница
+        rows = query.with_entities(*document_columns).order_by(*sort_columns).limit(per_page + 1).all()
+        rows, next_cursor = next_cursor_for(rows, per_page, order_by)
+
+        return articles_response(
+            article_documents(db, rows),
+            next_cursor=next_cursor,
+            per_page=per_page
+        )
+
     # Ограничение на максимально возможный номер страницы для предотвращения ошибок
     MAX_PAGE = 1000  # Устанавливаем максимальное значение страницы
     if page > MAX_PAGE:
@@ -65,20 +255,28 @@ def get_articles(
     # Вычисляем offset
     skip = (page - 1) * per_page
 
-    # Формируем запрос
-    query = db.query(Article)
-    if search_id:
-        query = query.filter(Article.id == search_id)
-    if search_external_id:
-        query = query.filter(Article.external_id == search_external_id)
-    if search_title:
-        query = query.filter(Article.title.ilike(f"%{search_title or ''}%"))
-    if search_author:
-        # Поиск по автору - используем relationship вместо join
-        query = query.filter(Article.authors.any(Author.author_name.ilike(f"%{search_author or ''}%")))
-
     # Получаем общее количество
-    total = query.count()
+    total_is_exact = True
+    has_filters = any(v is not None for v in (search_id, search_external_id, search_title, search_author))
+    if count_mode == "estimate":
+        # Оценка по статистике планировщика вместо полного COUNT(*)
+        if has_filters:
+            total = estimate_query_rows(db, query)
+        else:
+            total = estimate_table_rows(db, Article.__table__)
+        if total is None or total < ESTIMATE_EXACT_THRESHOLD:
+            total = query.count()
+        else:
+            total_is_exact = False
+    elif count_mode == "cached":
+        # Точный COUNT(*), закэшированный по набору фильтров до следующей записи статей
+        cache_key = (search_id, search_external_id, search_title, search_author, author_distance)
+        total = article_count_cache.get(cache_key)
+        if total is None:
+            total = query.count()
+            article_count_cache.set(cache_key, total)
+    else:
+        total = query.count()
 
     # Защита от выхода за границы
     if total > 0 and skip >= total:
@@ -87,48 +285,119 @@ def get_articles(
         page = max(1, ((total - 1) // per_page) + 1)
         skip = ((page - 1) * per_page)
 
-    # Получаем статьи для текущей страницы
-    articles = query.options(joinedload(Article.employees)).offset(skip).limit(per_page).all()
+    # Получаем статьи для текущей страницы (явный порядок - стабильные страницы OFFSET)
+    rows = query.with_entities(*document_columns).order_by(Article.id).offset(skip).limit(per_page).all()
 
     # Вычисляем количество страниц
     pages = max(1, (total + per_page - 1) // per_page)  # Округление вверх
 
-    return {
-        "articles": articles,
-        "total": total,
-        "page": page,
-        "pages": pages,
-        "per_page": per_page
-    }
+    return articles_response(
+        article_documents(db, rows),
+        total=total,
+        page=page,
+        pages=pages,
+        per_page=per_page,
+        total_is_exact=total_is_exact
+    )
+
+@router.get("/search", response_model=PaginatedArticlesResponse, dependencies=[Depends(query_budget(5))])
+def search_articles(
+    q: str,
+    page: int = 1,
+    per_page: int = 50,
+    db: Session = Depends(get_db)
+):
+    """
+    Полнотекстовый поиск по названиям статей и именам авторов (конфигурация russian).
+    Учитывает словоформы ("схемотехника" найдёт "СХЕМОТЕХНИКА ТЕЛЕКОММУНИКАЦИОННЫХ"),
+    поддерживает синтаксис websearch: "точная фраза", OR, -исключение.
+    Результаты отсортированы по релевантности.
+    """
+    q = q.strip()
+    if not q:
+        raise HTTPException(status_code=400, detail="Search query must not be empty")
+
+    if per_page > 150:
+        per_page = 150
+    if page < 1:
+        page = 1
+    if per_page < 1:
+        per_page = 1
 
-@router.get("/{id}", response_model=ArticleOut)
+    ts_query = func.websearch_to_tsquery(FTS_CONFIG, q)
+    query = db.query(Article).filter(Article.search_vector.op("@@")(ts_query))
+
+    total = query.count()
+    pages = max(1, (total + per_page - 1) // per_page)
+    page = min(page, pages)
+
+    rank = func.ts_rank_cd(Article.search_vector, ts_query)
+    rows = query.with_entities(Article.id, DOCUMENT_TEXT).order_by(
+        rank.desc(), Article.id
+    ).offset((page - 1) * per_page).limit(per_page).all()
+
+    return articles_response(
+        article_documents(db, rows),
+        total=total,
+        page=page,
+        pages=pages,
+        per_page=per_page,
+        total_is_exact=True
+    )
+
+# Документ статьи; запас на дозагрузку, если документ ещё не построен
+@router.get("/{id}", response_model=ArticleOut, dependencies=[Depends(query_budget(4))])
 def get_article(id: int, db: Session = Depends(get_db)):
-    print(f"Searching for article with ID: {id}")
-    article = db.query(Article).options(joinedload(Article.employees)).filter(Article.id == id).first()
-    if not article:
-        print(f"Article with ID {id} not found in DB!")
+    row = db.query(Article.id, DOCUMENT_TEXT).filter(Article.id == id).first()
+    if not row:
+        logger.debug("article_not_found", article_id=id)
         raise HTTPException(status_code=404, detail="Article not found")
-    print(f"Found article: {article.id}, {article.title}")
-    return article
+    return document_response(article_documents(db, [row])[0])
 
-@router.put("/authors/bulk-update")
+@router.put("/authors/bulk-update", dependencies=[Depends(query_budget(4))])
 def update_authors_bulk(
     updates: list[AuthorUpdate],
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    for update in updates:
-        # Получаем автора и связанную статью
-        author = db.query(Author).filter(Author.id == update.id).first()
-        if author:
-            # Проверяем, может ли пользователь редактировать эту статью
-            check_user_can_edit_article(current_user, author.article_id, db)
-
-            # Обновляем поля
-            author.contribution = update.contribution
-            author.applied_for_award = update.applied_for_award
-            author.award_applied_date = update.award_applied_date
+    if not updates:
+        return {"status": "success"}
+
+    # Все авторы пакета - одним запросом (несуществующие ID пропускаются, как и раньше)
+    author_articles = dict(
+        db.query(Author.id, Author.article_id)
+        .filter(Author.id.in_({item.id for item in updates}))
+        .all()
+    )
 
+    # Права - одним запросом на все затронутые статьи; пакет применяется целиком или не применяется
+    editable = get_editable_article_ids(current_user, author_articles.values(), db)
+    forbidden_ids = sorted(
+        author_id for author_id, article_id in author_articles.items() if article_id not in editable
+    )
+    if forbidden_ids:
+        raise HTTPException(
+            status_code=403,
+            detail={
+                "message": "You don't have permission to edit some of the authors",
+                "author_ids": forbidden_ids,
+            }
+        )
+
+    rows = [
+        {
+            "id": item.id,
+            "contribution": item.contribution,
+            "applied_for_award": item.applied_for_award,
+            "award_applied_date": item.award_applied_date,
+        }
+        for item in updates
+        if item.id in author_articles
+    ]
+    if rows:
+        # UPDATE по первичному ключу одним executemany
+        db.execute(update(Author), rows)
+        refresh_article_documents(db, author_articles.values())
     db.commit()
     return {"status": "success"}
 
@@ -193,7 +462,15 @@ def create_article(
             )
             db.add(emp_article)
 
+    # Пересчитываем полнотекстовый вектор по названию и авторам
+    db.flush()
+    refresh_article_search_vectors(db, [new_article.id])
+    refresh_article_documents(db, [new_article.id])
+    refresh_article_suggestions(db, [new_article.id])
+
     db.commit()
+    article_count_cache.invalidate()
+    author_surname_index.schedule_rebuild()
 
     # Обновляем объект статьи, чтобы получить свежие данные с авторами и сотрудниками
     db.refresh(new_article)
@@ -274,7 +551,15 @@ def update_article(
         )
         db.add(emp_article)
 
+    # Пересчитываем полнотекстовый вектор по названию и авторам
+    db.flush()
+    refresh_article_search_vectors(db, [article.id])
+    refresh_article_documents(db, [article.id])
+    refresh_article_suggestions(db, [article.id])
+
     db.commit()
+    article_count_cache.invalidate()
+    author_surname_index.schedule_rebuild()
     db.refresh(article)
 
     # Возвращаем обновленную статью с авторами и сотрудниками
@@ -298,6 +583,8 @@ def delete_article(
 
     db.delete(article)
     db.commit()
+    article_count_cache.invalidate()
+    author_surname_index.schedule_rebuild()
     return {"status": "success"}
 
 
@@ -310,35 +597,18 @@ class ArticleClaimResponse(BaseModel):
     article_title: str
     author_name: str
 
-@router.get("/my/suggestions", response_model=List[ArticleOut])
+# Пользователь + предложения (suggestions по индексу user_id) + дозагрузка статей без документа
+@router.get("/my/suggestions", response_model=List[ArticleOut], dependencies=[Depends(query_budget(5))])
 def get_article_suggestions_for_user(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """
     Возвращает список статей, которые могут принадлежать пользователю.
-    Поиск осуществляется по совпадению ФИО пользователя с именами авторов в статьях.
+    Статьи читаются из таблицы suggestions (ведётся при импорте, изменении
+    статей и пользователей, см. utils/suggestions.py): сначала лучшие совпадения.
     """
-    # Получаем все статьи с авторами
-    articles = db.query(Article).options(
-        joinedload(Article.authors)
-    ).all()
-    
-    # Генерируем варианты ФИО для пользователя
-    user_variants = generate_author_variants(current_user.full_name)
-    
-    # Находим статьи, где автор совпадает с пользователем
-    matching_articles = []
-    for article in articles:
-        for author in article.authors:
-            # Проверяем, совпадает ли автор с пользователем
-            if match_author_with_user(author.author_name, current_user.full_name):
-                # Проверяем, не привязана ли статья уже к другому пользователю
-                if author.user_employee_id is None or author.user_employee_id == current_user.id:
-                    matching_articles.append(article)
-                    break
-    
-    return matching_articles
+    return document_list_response(article_documents(db, suggested_article_rows(db, current_user.id)))
 
 
 @router.post("/{article_id}/claim", response_model=ArticleClaimResponse)
@@ -383,6 +653,9 @@ def claim_article(
 
     # Привязываем автора к пользователю
     author.user_employee_id = current_user.id
+    db.flush()
+    refresh_article_documents(db, [article_id])
+    prune_author_suggestions(db, [author.id])
     db.commit()
     db.refresh(author)
 
@@ -396,7 +669,7 @@ def claim_article(
     }
 
 
-@router.get("/my/articles", response_model=List[ArticleOut])
+@router.get("/my/articles", response_model=List[ArticleOut], dependencies=[Depends(query_budget(4))])
 def get_my_articles(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
@@ -405,10 +678,12 @@ def get_my_articles(
     Возвращает список статей, привязанных к пользователю.
     """
     # Находим все статьи, где пользователь указан как автор
-    articles = db.query(Article).join(Author).filter(
-        Author.user_employee_id == current_user.id
+    # (IN-подзапрос вместо JOIN: статья не дублируется, если пользователь указан в ней дважды)
+    articles = db.query(Article).filter(
+        Article.id.in_(db.query(Author.article_id).filter(Author.user_employee_id == current_user.id))
     ).options(
-        joinedload(Article.authors)
+        selectinload(Article.authors),
+        selectinload(Article.employees)
     ).all()
 
     return articles
@@ -433,11 +708,12 @@ class UserOut(BaseModel):
     class Config:
         from_attributes = True
 
-@router.get("/management/users", response_model=List[UserOut])
+@router.get("/management/users", response_model=List[UserOut], dependencies=[Depends(query_budget(3))])
 def get_users_for_management(
     search: Optional[str] = None,
     department_id: Optional[int] = None,
     current_user: User = Depends(get_current_active_user),
+    scope: ManagerScope = Depends(get_manager_scope),
     db: Session = Depends(get_db)
 ):
     """
@@ -445,29 +721,10 @@ def get_users_for_management(
     Администратор видит всех пользователей.
     Менеджер видит только пользователей своего подразделения.
     """
-    query = db.query(User)
-    
-    # Если не администратор, фильтруем по подразделениям менеджера
-    if current_user.role != "admin":
-        # Получаем подразделения, которыми управляет текущий пользователь
-        managed_depts = db.query(Department).filter(Department.manager_id == current_user.id).all()
-        
-        if not managed_depts:
-            return []  # Менеджер не управляет ни одним подразделением
-        
-        dept_ids = [d.id for d in managed_depts]
-        
-        # Получаем пользователей в этих подразделениях
-        from models.article import UserDepartment
-        user_ids = db.query(UserDepartment.user_id).filter(
-            UserDepartment.department_id.in_(dept_ids)
-        ).all()
-        
-        if not user_ids:
-            return []
-        
-        user_ids = [uid[0] for uid in user_ids]
-        query = query.filter(User.id.in_(user_ids))
+    # Менеджер, не управляющий ни одним подразделением, никого не видит
+    if scope.is_empty:
+        return []
+    query = scope.filter_users(db.query(User))
     
     # Фильтр по поиску (только по ФИО)
     if search:
@@ -476,123 +733,123 @@ def get_users_for_management(
     # Фильтр по подразделению (для админа)
     if department_id and current_user.role == "admin":
         from models.article import UserDepartment
-        user_ids = db.query(UserDepartment.user_id).filter(
-            UserDepartment.department_id == department_id
-        ).all()
-        
-        if user_ids:
-            user_ids = [uid[0] for uid in user_ids]
-            query = query.filter(User.id.in_(user_ids))
-        else:
-            return []
+        query = query.filter(User.id.in_(
+            db.query(UserDepartment.user_id).filter(UserDepartment.department_id == department_id)
+        ))
     
     return query.limit(100).all()
 
 
-@router.get("/management/users/{user_id}/suggestions", response_model=List[ArticleOut])
+# Пользователь + область менеджера (1, из кэша - 0) + целевой пользователь + предложения
+# + дозагрузка статей без документа
+@router.get(
+    "/management/users/{user_id}/suggestions",
+    response_model=List[ArticleOut],
+    dependencies=[Depends(query_budget(7))]
+)
 def get_article_suggestions_for_user(
     user_id: int,
     current_user: User = Depends(get_current_active_user),
+    scope: ManagerScope = Depends(get_manager_scope),
     db: Session = Depends(get_db)
 ):
     """
     Возвращает список статей, которые могут принадлежать указанному пользователю.
     Доступно администраторам и менеджерам подразделений (для своих пользователей).
     """
-    # Проверяем права доступа
-    if current_user.role != "admin":
-        # Проверяем, есть ли у менеджера доступ к этому пользователю
-        from models.article import UserDepartment
-        managed_depts = db.query(Department).filter(Department.manager_id == current_user.id).all()
-        
-        if managed_depts:
-            dept_ids = [d.id for d in managed_depts]
-            is_accessible = db.query(UserDepartment).filter(
-                UserDepartment.user_id == user_id,
-                UserDepartment.department_id.in_(dept_ids)
-            ).first()
-            
-            if not is_accessible:
-                raise HTTPException(
-                    status_code=403,
-                    detail="Access denied: This user is not in your department"
-                )
-        else:
-            raise HTTPException(
-                status_code=403,
-                detail="Access denied: You don't manage any departments"
-            )
+    # Проверяем права доступа (пользователь должен входить в подразделения менеджера)
+    scope.require_user(user_id)
     
-    # Находим пользователя
-    target_user = db.query(User).filter(User.id == user_id).first()
-    if not target_user:
+    # Проверяем, что пользователь существует
+    if db.query(User.id).filter(User.id == user_id).first() is None:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Получаем все статьи с авторами
-    articles = db.query(Article).options(
-        joinedload(Article.authors)
-    ).all()
-    
-    # Находим статьи, где автор совпадает с пользователем
-    matching_articles = []
-    for article in articles:
-        for author in article.authors:
-            if match_author_with_user(author.author_name, target_user.full_name):
-                matching_articles.append(article)
-                break
-    
-    return matching_articles
+    return document_list_response(article_documents(db, suggested_article_rows(db, user_id)))
 
 
-@router.get("/management/users/{user_id}/articles", response_model=List[ArticleOut])
+@router.get(
+    "/management/users/{user_id}/articles",
+    response_model=List[ArticleOut],
+    dependencies=[Depends(query_budget(5))]
+)
 def get_user_articles(
     user_id: int,
     current_user: User = Depends(get_current_active_user),
+    scope: ManagerScope = Depends(get_manager_scope),
     db: Session = Depends(get_db)
 ):
     """
     Возвращает список статей, привязанных к указанному пользователю.
     Доступно администраторам и менеджерам подразделений (для своих пользователей).
     """
-    # Проверяем права доступа (аналогично эндпоинту выше)
-    if current_user.role != "admin":
-        from models.article import UserDepartment
-        managed_depts = db.query(Department).filter(Department.manager_id == current_user.id).all()
-        
-        if managed_depts:
-            dept_ids = [d.id for d in managed_depts]
-            is_accessible = db.query(UserDepartment).filter(
-                UserDepartment.user_id == user_id,
-                UserDepartment.department_id.in_(dept_ids)
-            ).first()
-            
-            if not is_accessible:
-                raise HTTPException(
-                    status_code=403,
-                    detail="Access denied: This user is not in your department"
-                )
-        else:
-            raise HTTPException(
-                status_code=403,
-                detail="Access denied: You don't manage any departments"
-            )
+    # Проверяем права доступа (пользователь должен входить в подразделения менеджера)
+    scope.require_user(user_id)
     
     # Находим статьи, привязанные к пользователю
-    articles = db.query(Article).join(Author).filter(
-        Author.user_employee_id == user_id
+    articles = db.query(Article).filter(
+        Article.id.in_(db.query(Author.article_id).filter(Author.user_employee_id == user_id))
     ).options(
-        joinedload(Article.authors)
+        selectinload(Article.authors),
+        selectinload(Article.employees)
     ).all()
     
     return articles
 
 
+class BulkMatchPair(BaseModel):
+    author_id: int
+    article_id: int
+    user_id: int
+    confidence: float
+
+class BulkMatchResponse(BaseModel):
+    authors: int  # сколько авторов сопоставлялось
+    users: int
+    total_pairs: int  # всего пар до ограничения limit
+    pairs: List[BulkMatchPair]
+
+# Пользователь + авторы + пользователи; само сопоставление - в NumPy (utils.bulk_matcher)
+@router.get("/management/bulk-match", response_model=BulkMatchResponse, dependencies=[Depends(query_budget(3))])
+def bulk_match_authors(
+    min_confidence: float = 0.7,
+    include_claimed: bool = False,  # Учитывать авторов, уже привязанных к пользователям
+    max_distance: int = 0,  # Допустимое число опечаток в фамилии
+    limit: int = 10000,
+    current_user: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Сопоставляет всех авторов со всеми пользователями за один векторный проход.
+    Возвращает пары (author_id, article_id, user_id, confidence), отсортированные
+    по убыванию уверенности. Статьи не привязываются - это делает claim-for-user.
+    """
+    if not 0 <= min_confidence <= 1:
+        raise HTTPException(status_code=400, detail="min_confidence must be between 0 and 1")
+    if not 0 <= max_distance <= MAX_QUERY_DISTANCE:
+        raise HTTPException(status_code=400, detail=f"max_distance must be between 0 and {MAX_QUERY_DISTANCE}")
+    limit = max(0, min(limit, 100000))
+
+    result = match_all(db, min_confidence=min_confidence, include_claimed=include_claimed, max_distance=max_distance)
+    frame = result.to_frame().sort_values(
+        ["confidence", "author_id", "user_id"], ascending=[False, True, True], kind="stable"
+    ).head(limit)
+    frame["confidence"] = frame["confidence"].astype(float).round(2)
+
+    return {
+        "authors": result.authors_count,
+        "users": result.users_count,
+        "total_pairs": len(result),
+        "pairs": frame.to_dict("records")
+    }
+
+
 @router.post("/articles/{article_id}/claim-for-user", response_model=UserArticleClaimResponse)
 def claim_article_for_user(
     article_id: int,
     author_name: Optional[str] = None,
     user_id: Optional[int] = None,
     current_user: User = Depends(get_current_active_user),
+    scope: ManagerScope = Depends(get_manager_scope),
     db: Session = Depends(get_db)
 ):
     """
@@ -602,28 +859,8 @@ def claim_article_for_user(
     if not author_name or user_id is None:
         raise HTTPException(status_code=400, detail="author_name and user_id are required")
     
-    # Проверяем права доступа (аналогично эндпоинту выше)
-    if current_user.role != "admin":
-        from models.article import UserDepartment
-        managed_depts = db.query(Department).filter(Department.manager_id == current_user.id).all()
-        
-        if managed_depts:
-            dept_ids = [d.id for d in managed_depts]
-            is_accessible = db.query(UserDepartment).filter(
-                UserDepartment.user_id == user_id,
-                UserDepartment.department_id.in_(dept_ids)
-            ).first()
-            
-            if not is_accessible:
-                raise HTTPException(
-                    status_code=403,
-                    detail="Access denied: This user is not in your department"
-                )
-        else:
-            raise HTTPException(
-                status_code=403,
-                detail="Access denied: You don't manage any departments"
-            )
+    # Проверяем права доступа (пользователь должен входить в подразделения менеджера)
+    scope.require_user(user_id)
     
     # Находим статью
     article = db.query(Article).filter(Article.id == article_id).first()
@@ -651,6 +888,9 @@ def claim_article_for_user(
     
     # Привязываем автора к пользователю
     author.user_employee_id = user_id
+    db.flush()
+    refresh_article_documents(db, [article_id])
+    prune_author_suggestions(db, [author.id])
     db.commit()
     db.refresh(author)
     
@@ -669,6 +909,7 @@ def unclaim_article(
     article_id: int,
     author_id: Optional[int] = None,
     current_user: User = Depends(get_current_active_user),
+    scope: ManagerScope = Depends(get_manager_scope),
     db: Session = Depends(get_db)
 ):
     """
@@ -687,33 +928,15 @@ def unclaim_article(
     if not author:
         raise HTTPException(status_code=404, detail="Author not found in this article")
     
-    # Проверяем права доступа
-    if current_user.role != "admin":
-        # Для менеджера проверяем, принадлежит ли пользователь к его подразделению
-        if author.user_employee_id:
-            from models.article import UserDepartment
-            managed_depts = db.query(Department).filter(Department.manager_id == current_user.id).all()
-            
-            if managed_depts:
-                dept_ids = [d.id for d in managed_depts]
-                is_accessible = db.query(UserDepartment).filter(
-                    UserDepartment.user_id == author.user_employee_id,
-                    UserDepartment.department_id.in_(dept_ids)
-                ).first()
-                
-                if not is_accessible:
-                    raise HTTPException(
-                        status_code=403,
-                        detail="Access denied: This user is not in your department"
-                    )
-            else:
-                raise HTTPException(
-                    status_code=403,
-                    detail="Access denied: You don't manage any departments"
-                )
+    # Проверяем права доступа: менеджер отвязывает только пользователей своих подразделений
+    if author.user_employee_id:
+        scope.require_user(author.user_employee_id)
     
     # Отвязываем автора
     author.user_employee_id = None
+    db.flush()
+    refresh_article_documents(db, [article_id])
+    refresh_article_suggestions(db, [article_id])
     db.commit()
     
     return {"status": "success", "message": "Article unclaimed successfully"}
\ No newline at end of file
@@ -0,0 +1,143 @@
+"""
+Асинхронные варианты самых нагруженных эндпоинтов статей.
+
+Подключаются в main.py вместо синхронных при DB_ASYNC=true и работают
+поверх AsyncSession (asyncpg), не занимая поток из пула на время ожидания БД.
+Параметры и формат ответа совпадают с синхронными обработчиками в api/articles.py.
+Статьи отдаются готовыми документами read model (utils.article_documents);
+дозагрузка статей без документа выполняется синхронным кодом через run_sync.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, Union
+from database import get_async_db
+from models.article import Article
+from schemas.article import ArticleOut
+from utils.article_documents import DOCUMENT_TEXT, article_documents, articles_response, document_response
+from api.articles import (
+    PaginatedArticlesResponse,
+    CursorArticlesResponse,
+    CURSOR_ORDERINGS,
+    decode_cursor,
+    decode_search_param,
+    normalize_listing_params,
+    fuzzy_author_match_keys,
+    article_filter_conditions,
+    next_cursor_for,
+)
+from utils.request_metrics import query_budget
+from utils.article_counts import (
+    article_count_cache,
+    estimate_query_rows,
+    estimate_table_rows,
+    ESTIMATE_EXACT_THRESHOLD,
+)
+
+router = APIRouter()
+
+async def _count(db: AsyncSession, conditions: list) -> int:
+    return (await db.execute(
+        select(func.count()).select_from(Article).where(*conditions)
+    )).scalar_one()
+
+
+@router.get(
+    "/",
+    response_model=Union[PaginatedArticlesResponse, CursorArticlesResponse],
+    dependencies=[Depends(query_budget(6))]
+)
+async def get_articles(
+    page: int = 1,
+    per_page: int = 50,
+    search_id: Optional[int] = None,
+    search_external_id: Optional[int] = None,
+    search_title: Optional[str] = None,
+    search_author: Optional[str] = None,
+    pagination: str = "page",
+    after: Optional[str] = None,
+    order_by: str = "id",
+    count_mode: str = "exact",
+    author_distance: int = 0,
+    db: AsyncSession = Depends(get_async_db)
+):
+    search_title = decode_search_param(search_title)
+    search_author = decode_search_param(search_author)
+    page, per_page, pagination = normalize_listing_params(page, per_page, pagination, after, order_by, count_mode)
+    author_match_keys = fuzzy_author_match_keys(search_author, author_distance)
+
+    conditions = article_filter_conditions(
+        search_id, search_external_id, search_title, search_author, author_match_keys
+    )
+    stmt = select(Article.id, Article.year_pub, DOCUMENT_TEXT).where(*conditions)
+
+    if pagination == "cursor":
+        sort_columns = CURSOR_ORDERINGS[order_by]
+        if after is not None:
+            stmt = stmt.where(tuple_(*sort_columns) > tuple_(*decode_cursor(after, order_by)))
+
+        rows = (await db.execute(stmt.order_by(*sort_columns).limit(per_page + 1))).all()
+        rows, next_cursor = next_cursor_for(rows, per_page, order_by)
+
+        return articles_response(
+            await db.run_sync(article_documents, rows),
+            next_cursor=next_cursor,
+            per_page=per_page
+        )
+
+    MAX_PAGE = 1000
+    if page > MAX_PAGE:
+        page = MAX_PAGE
+
+    skip = (page - 1) * per_page
+
+    total_is_exact = True
+    has_filters = any(v is not None for v in (search_id, search_external_id, search_title, search_author))
+    if count_mode == "estimate":
+        # Функции оценки написаны для синхронной сессии - вызываем их через run_sync
+        if has_filters:
+            total = await db.run_sync(
+                lambda session: estimate_query_rows(session, session.query(Article).filter(*conditions))
+            )
+        else:
+            total = await db.run_sync(estimate_table_rows, Article.__table__)
+        if total is None or total < ESTIMATE_EXACT_THRESHOLD:
+            total = await _count(db, conditions)
+        else:
+            total_is_exact = False
+    elif count_mode == "cached":
+        cache_key = (search_id, search_external_id, search_title, search_author, author_distance)
+        total = article_count_cache.get(cache_key)
+        if total is None:
+            total = await _count(db, conditions)
+            article_count_cache.set(cache_key, total)
+    else:
+        total = await _count(db, conditions)
+
+    if total > 0 and skip >= total:
+        page = max(1, ((total - 1) // per_page) + 1)
+        skip = ((page - 1) * per_page)
+
+    # Явный порядок по первичному ключу, чтобы страницы OFFSET были стабильными
+    rows = (await db.execute(stmt.order_by(Article.id).offset(skip).limit(per_page))).all()
+
+    pages = max(1, (total + per_page - 1) // per_page)
+
+    return articles_response(
+        await db.run_sync(article_documents, rows),
+        total=total,
+        page=page,
+        pages=pages,
+        per_page=per_page,
+        total_is_exact=total_is_exact
+    )
+
+
+# Конвертер :int, чтобы маршрут не перехватывал /search, /my/... и т.п. синхронного роутера
+@router.get("/{id:int}", response_model=ArticleOut, dependencies=[Depends(query_budget(4))])
+async def get_article(id: int, db: AsyncSession = Depends(get_async_db)):
+    row = (await db.execute(select(Article.id, DOCUMENT_TEXT).where(Article.id == id))).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Article not found")
+    return document_response((await db.run_sync(article_documents, [row]))[0])
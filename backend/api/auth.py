@@ -2,23 +2,29 @@ from datetime import datetime, timedelta
 from typing import Optional
 import jwt
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from passlib.context import CryptContext
 from models.article import User, Department
 from schemas.user import UserOut, UserCreate
 from database import get_db
-from api.deps import get_current_active_user, get_current_admin_user, get_current_manager_user
+from api.deps import get_current_active_user, get_current_admin_user, get_current_manager_user, get_manager_scope, ManagerScope
+from utils.principal_cache import principal_cache
+from utils.manager_scope import manager_scope_cache
+from utils.passwords import hash_password_async, verify_and_update_async
+from utils.article_documents import employee_article_ids, refresh_article_documents
+from utils.suggestions import refresh_user_suggestions
 from dotenv import load_dotenv
 import os
+import structlog
 
 # Загружаем переменные окружения
 load_dotenv()
 
 router = APIRouter()
+logger = structlog.get_logger(__name__)
 
 # Настройка безопасности
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
 # Настройки JWT
@@ -26,24 +32,33 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production"
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password):
-    return pwd_context.hash(password)
+def _save_rehashed_user(db: Session, user: User) -> None:
+    db.commit()
+    db.refresh(user)
 
-def authenticate_user(db: Session, login: str, password: str):
+async def authenticate_user(db: Session, login: str, password: str):
+    """
+    Проверяет логин и пароль. bcrypt выполняется в пуле utils.passwords,
+    запросы к БД - в пуле потоков FastAPI, так что цикл событий не блокируется.
+    Если хеш создан с устаревшей стоимостью, он пересчитывается и сохраняется.
+    """
     try:
-        user = db.query(User).filter(User.login == login).first()
+        user = await run_in_threadpool(lambda: db.query(User).filter(User.login == login).first())
         if not user:
-            print(f"User with login '{login}' not found")  # Для отладки
+            logger.debug("login_user_not_found", login=login)
             return False
-        if not verify_password(password, user.password_hash):
-            print(f"Password verification failed for user '{login}'")  # Для отладки
+        valid, new_hash = await verify_and_update_async(password, user.password_hash)
+        if not valid:
+            logger.debug("login_wrong_password", login=login)
             return False
+        if new_hash:
+            user.password_hash = new_hash
+            # commit сбрасывает атрибуты user: перечитываем их в том же потоке,
+            # иначе login/role/full_name загрузятся лениво прямо в цикле событий
+            await run_in_threadpool(_save_rehashed_user, db, user)
         return user
-    except Exception as e:
-        print(f"Error during authentication: {e}")  # Для отладки
+    except Exception:
+        logger.exception("login_failed", login=login)
         return False
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -52,30 +67,26 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
+    # iat входит в ключ кэша пользователей (utils.principal_cache)
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 @router.post("/token", response_model=dict)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    print("Login endpoint called with OAuth2PasswordRequestForm")
-    print(f"Username received: {form_data.username}")
-    print(f"Attempting to authenticate user: {form_data.username}")
-    user = authenticate_user(db, form_data.username, form_data.password)
-    print(f"User authentication result: {user is not None}")
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
-        print(f"Authentication failed for user: {form_data.username}")
+        logger.info("login_rejected", login=form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect login or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    print(f"User authenticated successfully: {user.login}, role: {user.role}")
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.login, "role": user.role, "full_name": user.full_name}, expires_delta=access_token_expires
     )
-    print(f"Access token created for user: {user.login}")
+    logger.info("login_succeeded", login=user.login, role=user.role)
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=UserOut)
@@ -91,31 +102,15 @@ def read_users(
     department_id: int | None = None,
     sort_by: str = 'full_name',  # 'full_name', 'login', 'role'
     sort_order: str = 'asc',  # 'asc' или 'desc'
+    scope: ManagerScope = Depends(get_manager_scope),
     db: Session = Depends(get_db)
 ):
     users_query = db.query(User)
     
-    # Если не администратор, фильтруем по подразделениям пользователя
-    if current_user.role != "admin":
-        # Получаем подразделения, которыми управляет пользователь
-        from models.article import Department, UserDepartment
-        managed_depts = db.query(Department).filter(Department.manager_id == current_user.id).all()
-        
-        if managed_depts:
-            dept_ids = [d.id for d in managed_depts]
-            user_ids = db.query(UserDepartment.user_id).filter(
-                UserDepartment.department_id.in_(dept_ids)
-            ).all()
-            
-            if user_ids:
-                user_ids = [uid[0] for uid in user_ids]
-                users_query = users_query.filter(User.id.in_(user_ids))
-            else:
-                # Если в подразделениях нет пользователей, возвращаем пустой список
-                return []
-        else:
-            # Если пользователь не управляет ни одним подразделением, возвращаем пустой список
-            return []
+    # Если не администратор, оставляем только пользователей управляемых подразделений
+    if scope.is_empty:
+        return []
+    users_query = scope.filter_users(users_query)
     
     # Фильтр по поиску
     if search:
@@ -128,16 +123,9 @@ def read_users(
     # Фильтр по подразделению (только для админа)
     if department_id and current_user.role == "admin":
         from models.article import UserDepartment
-        user_ids = db.query(UserDepartment.user_id).filter(
-            UserDepartment.department_id == department_id
-        ).all()
-        
-        if user_ids:
-            user_ids = [uid[0] for uid in user_ids]
-            users_query = users_query.filter(User.id.in_(user_ids))
-        else:
-            # Если в подразделении нет пользователей, возвращаем пустой список
-            return []
+        users_query = users_query.filter(User.id.in_(
+            db.query(UserDepartment.user_id).filter(UserDepartment.department_id == department_id)
+        ))
     
     # Сортировка
     if sort_by == 'full_name':
@@ -183,19 +171,62 @@ def delete_user(
             detail=f"Cannot delete user who is a manager of {len(managed_depts)} department(s). Remove them as manager first."
         )
     
-    # Удаляем пользователя
+    # Удаляем пользователя (связи со статьями удаляются каскадно - обновляем их документы)
+    linked_article_ids = employee_article_ids(db, user_id)
     db.delete(user)
+    db.flush()
+    refresh_article_documents(db, linked_article_ids)
     db.commit()
+    principal_cache.invalidate_user(user_id)
+    manager_scope_cache.invalidate_member(user_id)
     
     return {"status": "success", "message": f"User {user.login} deleted successfully"}
 
-@router.put("/users/{user_id}", response_model=UserOut)
-def update_user(
-    user_id: int,
+def _ensure_login_and_email_free(db: Session, login: str, email: Optional[str], user_id: Optional[int] = None) -> None:
+    """Проверяет, что логин и email не заняты другим пользователем (user_id - сам изменяемый пользователь)"""
+    existing_user = db.query(User).filter(User.login == login).first()
+    if existing_user and existing_user.id != user_id:
+        raise HTTPException(status_code=400, detail="User with this login already exists")
+
+    if email:
+        existing_email = db.query(User).filter(User.email == email).first()
+        if existing_email and existing_email.id != user_id:
+            raise HTTPException(status_code=400, detail="User with this email already exists")
+
+def _add_user(
+    db: Session,
     user_data: UserCreate,
-    current_user: User = Depends(get_current_admin_user),  # Только администратор может редактировать пользователей
-    db: Session = Depends(get_db)
-):
+    role: str,
+    password_hash: str,
+    department: Optional[Department] = None
+) -> User:
+    """
+    Создаёт пользователя с готовым хешем пароля (выполняется в пуле потоков).
+    department - подразделение, менеджером которого становится пользователь.
+    """
+    # Если id_elibrary_user не указано, используем full_name
+    id_elibrary_value = user_data.id_elibrary_user if user_data.id_elibrary_user is not None else user_data.full_name
+    db_user = User(
+        login=user_data.login,
+        password_hash=password_hash,
+        email=user_data.email,
+        role=role,
+        full_name=user_data.full_name,
+        id_elibrary_user=id_elibrary_value
+    )
+    db.add(db_user)
+    db.flush()
+    refresh_user_suggestions(db, db_user.id, db_user.full_name)
+    if department:
+        department.manager_id = db_user.id
+    db.commit()
+    if department:
+        manager_scope_cache.invalidate_department(department.id)
+    # Атрибуты перечитываются здесь: ответ сериализуется в цикле событий, без ленивых загрузок
+    db.refresh(db_user)
+    return db_user
+
+def _load_user_for_update(db: Session, user_id: int, user_data: UserCreate, current_user: User) -> User:
     # Проверяем, что пользователь не пытается изменить сам себя (только роль admin)
     if user_id == current_user.id and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Cannot update yourself")
@@ -205,23 +236,17 @@ def update_user(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Проверяем, не занят ли новый логин другим пользователем
-    if user_data.login != user.login:
-        existing_user = db.query(User).filter(User.login == user_data.login).first()
-        if existing_user and existing_user.id != user_id:
-            raise HTTPException(status_code=400, detail="User with this login already exists")
-    
-    # Проверяем, не занят ли новый email другим пользователем
-    if user_data.email and user_data.email != user.email:
-        existing_email = db.query(User).filter(User.email == user_data.email).first()
-        if existing_email and existing_email.id != user_id:
-            raise HTTPException(status_code=400, detail="User with this email already exists")
+    # Проверяем, не заняты ли новые логин и email другим пользователем
+    _ensure_login_and_email_free(db, user_data.login, user_data.email, user_id)
     
     # Проверяем, что ФИО указано
     if not user_data.full_name:
         raise HTTPException(status_code=400, detail="Full name (ФИО) is required")
-    
+    return user
+
+def _apply_user_update(db: Session, user: User, user_data: UserCreate, password_hash: Optional[str]) -> User:
     # Обновляем данные пользователя
+    full_name_changed = user.full_name != user_data.full_name
     user.login = user_data.login
     user.email = user_data.email
     user.full_name = user_data.full_name
@@ -232,60 +257,41 @@ def update_user(
         user.role = user_data.role
     
     # Если указан пароль, обновляем его
-    if user_data.password:
-        user.password_hash = get_password_hash(user_data.password)
+    if password_hash:
+        user.password_hash = password_hash
     
+    db.flush()
+    refresh_article_documents(db, employee_article_ids(db, user.id))
+    if full_name_changed:
+        refresh_user_suggestions(db, user.id, user.full_name)
     db.commit()
+    principal_cache.invalidate_user(user.id)
     db.refresh(user)
-    
     return user
 
-@router.post("/register", response_model=UserOut)
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    # Проверяем, существует ли уже пользователь с таким логином
-    existing_user = db.query(User).filter(User.login == user.login).first()
-    if existing_user:
-        raise HTTPException(status_code=400, detail="User with this login already exists")
-
-    # Проверяем, существует ли уже пользователь с таким email
-    if user.email:
-        existing_email = db.query(User).filter(User.email == user.email).first()
-        if existing_email:
-            raise HTTPException(status_code=400, detail="User with this email already exists")
-
-    # Создаем нового пользователя
-    # Если id_elibrary_user не указано, используем full_name
-    id_elibrary_value = user.id_elibrary_user if user.id_elibrary_user is not None else user.full_name
-    db_user = User(
-        login=user.login,
-        password_hash=get_password_hash(user.password),
-        email=user.email,
-        role="user",  # По умолчанию роль 'user'
-        full_name=user.full_name,
-        id_elibrary_user=id_elibrary_value
-    )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
-
-# Маршрут для создания менеджера подразделения (только для администраторов)
-@router.post("/create-manager", response_model=UserOut)
-def create_manager(
+@router.put("/users/{user_id}", response_model=UserOut)
+async def update_user(
+    user_id: int,
     user_data: UserCreate,
-    current_user: User = Depends(get_current_admin_user),  # Только администратор может создавать менеджеров
+    current_user: User = Depends(get_current_admin_user),  # Только администратор может редактировать пользователей
     db: Session = Depends(get_db)
 ):
-    # Проверяем, существует ли уже пользователь с таким логином
-    existing_user = db.query(User).filter(User.login == user_data.login).first()
-    if existing_user:
-        raise HTTPException(status_code=400, detail="User with this login already exists")
+    # Запросы к БД - в пуле потоков FastAPI, bcrypt - в пуле utils.passwords
+    user = await run_in_threadpool(_load_user_for_update, db, user_id, user_data, current_user)
+    password_hash = await hash_password_async(user_data.password) if user_data.password else None
+    return await run_in_threadpool(_apply_user_update, db, user, user_data, password_hash)
 
-    # Проверяем, существует ли уже пользователь с таким email
-    if user_data.email:
-        existing_email = db.query(User).filter(User.email == user_data.email).first()
-        if existing_email:
-            raise HTTPException(status_code=400, detail="User with this email already exists")
+@router.post("/register", response_model=UserOut)
+async def register(user: UserCreate, db: Session = Depends(get_db)):
+    # Проверяем, не заняты ли логин и email
+    await run_in_threadpool(_ensure_login_and_email_free, db, user.login, user.email)
+
+    # Создаем нового пользователя, по умолчанию роль 'user'
+    password_hash = await hash_password_async(user.password)
+    return await run_in_threadpool(_add_user, db, user, "user", password_hash)
+
+def _manager_department(db: Session, user_data: UserCreate) -> Optional[Department]:
+    _ensure_login_and_email_free(db, user_data.login, user_data.email)
 
     # Если указан department_id, проверяем, существует ли подразделение
     department = None
@@ -293,66 +299,23 @@ def create_manager(
         department = db.query(Department).filter(Department.id == user_data.department_id).first()
         if not department:
             raise HTTPException(status_code=404, detail="Department not found")
+    return department
 
-    # Создаем менеджера подразделения
-    # Если id_elibrary_user не указано, используем full_name
-    id_elibrary_value = user_data.id_elibrary_user if user_data.id_elibrary_user is not None else user_data.full_name
-    db_user = User(
-        login=user_data.login,
-        password_hash=get_password_hash(user_data.password),
-        email=user_data.email,
-        role="manager",  # Роль менеджера
-        full_name=user_data.full_name,
-        id_elibrary_user=id_elibrary_value
-    )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-
-    # Если указано подразделение, устанавливаем пользователя как менеджера подразделения
-    if department:
-        department.manager_id = db_user.id
-        db.commit()
-
-    return db_user
-
-# Маршрут для создания обычного пользователя (только для менеджеров подразделений)
-@router.post("/create-user", response_model=UserOut)
-def create_user(
+# Маршрут для создания менеджера подразделения (только для администраторов)
+@router.post("/create-manager", response_model=UserOut)
+async def create_manager(
     user_data: UserCreate,
-    current_user: User = Depends(get_current_manager_user),  # Только менеджер или администратор может создавать пользователей
+    current_user: User = Depends(get_current_admin_user),  # Только администратор может создавать менеджеров
     db: Session = Depends(get_db)
 ):
-    # Проверяем, существует ли уже пользователь с таким логином
-    existing_user = db.query(User).filter(User.login == user_data.login).first()
-    if existing_user:
-        raise HTTPException(status_code=400, detail="User with this login already exists")
+    department = await run_in_threadpool(_manager_department, db, user_data)
 
-    # Проверяем, существует ли уже пользователь с таким email
-    if user_data.email:
-        existing_email = db.query(User).filter(User.email == user_data.email).first()
-        if existing_email:
-            raise HTTPException(status_code=400, detail="User with this email already exists")
+    # Создаем менеджера подразделения; если указано подразделение,
+    # пользователь становится его менеджером
+    password_hash = await hash_password_async(user_data.password)
+    return await run_in_threadpool(_add_user, db, user_data, "manager", password_hash, department)
 
-    # Проверяем, что ФИО указано
-    if not user_data.full_name:
-        raise HTTPException(status_code=400, detail="Full name (ФИО) is required")
-
-    # Создаем обычного пользователя
-    # Если id_elibrary_user не указано, используем full_name
-    id_elibrary_value = user_data.id_elibrary_user if user_data.id_elibrary_user is not None else user_data.full_name
-    db_user = User(
-        login=user_data.login,
-        password_hash=get_password_hash(user_data.password),
-        email=user_data.email,
-        role="user",  # Роль пользователя
-        full_name=user_data.full_name,
-        id_elibrary_user=id_elibrary_value
-    )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    
+def _add_to_managed_department(db: Session, db_user: User, current_user: User) -> User:
     # Если текущий пользователь - менеджер, добавляем созданного пользователя в его подразделение
     if current_user.role == "manager":
         from models.article import Department, UserDepartment
@@ -370,5 +333,25 @@ def create_user(
             )
             db.add(user_dept)
             db.commit()
-    
-    return db_user
\ No newline at end of file
+            manager_scope_cache.invalidate_department(dept.id)
+            db.refresh(db_user)
+
+    return db_user
+
+# Маршрут для создания обычного пользователя (только для менеджеров подразделений)
+@router.post("/create-user", response_model=UserOut)
+async def create_user(
+    user_data: UserCreate,
+    current_user: User = Depends(get_current_manager_user),  # Только менеджер или администратор может создавать пользователей
+    db: Session = Depends(get_db)
+):
+    # Проверяем, что ФИО указано
+    if not user_data.full_name:
+        raise HTTPException(status_code=400, detail="Full name (ФИО) is required")
+
+    await run_in_threadpool(_ensure_login_and_email_free, db, user_data.login, user_data.email)
+
+    # Создаем обычного пользователя
+    password_hash = await hash_password_async(user_data.password)
+    db_user = await run_in_threadpool(_add_user, db, user_data, "user", password_hash)
+    return await run_in_threadpool(_add_to_managed_department, db, db_user, current_user)
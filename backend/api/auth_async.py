@@ -0,0 +1,46 @@
+"""
+Асинхронные варианты /auth/token и /auth/me (подключаются при DB_ASYNC=true).
+
+Проверка пароля bcrypt занимает процессорное время, поэтому выполняется
+в пуле utils.passwords и не блокирует цикл событий.
+"""
+
+from datetime import timedelta
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+from models.article import User
+from schemas.user import UserOut
+from api.auth import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from api.deps import get_current_user_async
+from utils.passwords import verify_and_update_async
+
+router = APIRouter()
+
+
+@router.post("/token", response_model=dict)
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = (await db.execute(select(User).where(User.login == form_data.username))).scalars().first()
+    valid, new_hash = await verify_and_update_async(form_data.password, user.password_hash) if user else (False, None)
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect login or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if new_hash:
+        # Хеш создан с устаревшей стоимостью bcrypt - сохраняем пересчитанный
+        user.password_hash = new_hash
+        await db.commit()
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data={"sub": user.login, "role": user.role, "full_name": user.full_name}, expires_delta=access_token_expires
+    )
+    return {"access_token": access_token, "token_type": "bearer"}
+
+
+@router.get("/me", response_model=UserOut)
+async def read_users_me(current_user: User = Depends(get_current_user_async)):
+    return current_user
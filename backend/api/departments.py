@@ -2,12 +2,20 @@ from fastapi import APIRouter, Depends, HTTPException, Path
 from sqlalchemy.orm import Session
 from database import get_db
 from models.article import Department, User, Article
-from schemas.department import DepartmentCreate, DepartmentUpdate, DepartmentOut
-from api.deps import get_current_active_user, get_current_admin_user, get_current_manager_user, get_department_manager_or_admin
+from schemas.department import DepartmentCreate, DepartmentUpdate, DepartmentOut, DepartmentStatsOut
+from api.deps import (
+    get_current_active_user, get_current_admin_user, get_current_manager_user,
+    get_department_manager_or_admin, get_manager_scope, ManagerScope
+)
+from utils.principal_cache import principal_cache
+from utils.manager_scope import manager_scope_cache
+from utils.request_metrics import query_budget
+from utils.department_stats import DEPARTMENT_STATS_ROLLUP, collect_department_stats
 
 router = APIRouter()
 
-@router.get("/", response_model=list[DepartmentOut])
+# Подразделения + их сотрудники (selectinload)
+@router.get("/", response_model=list[DepartmentOut], dependencies=[Depends(query_budget(2))])
 def get_departments(
     skip: int = 0,
     limit: int = 100,
@@ -20,7 +28,40 @@ def get_departments(
     ).offset(skip).limit(limit).all()
     return departments
 
-@router.get("/{dept_id}", response_model=DepartmentOut)
+# Статистика публикаций: пользователь + область менеджера + подразделения + один агрегирующий запрос
+@router.get("/stats", response_model=list[DepartmentStatsOut], dependencies=[Depends(query_budget(4))])
+def get_all_departments_stats(
+    live: bool = False,  # Считать по таблицам, даже если включено материализованное представление
+    current_user: User = Depends(get_current_manager_user),
+    scope: ManagerScope = Depends(get_manager_scope),
+    db: Session = Depends(get_db)
+):
+    """
+    Статистика всех подразделений (администратор) или подразделений,
+    которыми управляет текущий менеджер.
+    """
+    query = db.query(Department.id, Department.name)
+    if not scope.is_admin:
+        if not scope.department_ids:
+            return []
+        query = query.filter(Department.id.in_(scope.department_ids))
+    departments = [tuple(row) for row in query.order_by(Department.name).all()]
+    return collect_department_stats(db, departments, use_rollup=DEPARTMENT_STATS_ROLLUP and not live)
+
+@router.get("/{dept_id}/stats", response_model=DepartmentStatsOut, dependencies=[Depends(query_budget(4))])
+def get_department_stats(
+    dept_id: int = Path(..., ge=1),
+    live: bool = False,
+    current_user: User = Depends(get_department_manager_or_admin),  # Менеджер конкретного подразделения или администратор
+    db: Session = Depends(get_db)
+):
+    department = db.query(Department.id, Department.name).filter(Department.id == dept_id).first()
+    if not department:
+        raise HTTPException(status_code=404, detail="Department not found")
+
+    return collect_department_stats(db, [tuple(department)], use_rollup=DEPARTMENT_STATS_ROLLUP and not live)[0]
+
+@router.get("/{dept_id}", response_model=DepartmentOut, dependencies=[Depends(query_budget(2))])
 def get_department(dept_id: int, db: Session = Depends(get_db)):
     from sqlalchemy.orm import selectinload
     
@@ -55,6 +96,7 @@ def create_department(
         if manager.role != "manager":
             manager.role = "manager"
             db.commit()
+            principal_cache.invalidate_user(manager.id)
 
     dept = Department(
         name=dept_data.name,
@@ -62,6 +104,8 @@ def create_department(
     )
     db.add(dept)
     db.commit()
+    if dept.manager_id:
+        manager_scope_cache.invalidate_manager(dept.manager_id)
     db.refresh(dept)
     return dept
 
@@ -76,6 +120,9 @@ def update_department(
     if not department:
         raise HTTPException(status_code=404, detail="Department not found")
 
+    # Пользователи, чья роль или набор управляемых подразделений может измениться
+    affected_user_ids = {department.manager_id, dept_data.manager_id} - {None}
+
     # Если меняется менеджер подразделения
     if department.manager_id != dept_data.manager_id:
         # Если у подразделения был старый менеджер, понижаем его роль до user
@@ -106,6 +153,9 @@ def update_department(
     department.manager_id = dept_data.manager_id
 
     db.commit()
+    for user_id in affected_user_ids:
+        principal_cache.invalidate_user(user_id)
+        manager_scope_cache.invalidate_manager(user_id)
     db.refresh(department)
     return department
 
@@ -128,8 +178,12 @@ def delete_department(
             detail="Cannot delete department that has associated users. Remove user associations first."
         )
 
+    manager_id = department.manager_id
     db.delete(department)
     db.commit()
+    if manager_id:
+        principal_cache.invalidate_user(manager_id)
+    manager_scope_cache.invalidate_department(dept_id)
     return {"status": "success"}
 
 # Маршруты для управления пользователями в подразделении
@@ -139,7 +193,7 @@ def add_employee_to_department(
     employee_id: int = Path(..., ge=1),
     is_primary: bool = False,
     position_title: str = "",
-    current_user: dict = Depends(lambda dept_id=Path(..., ge=1), db=Depends(get_db): get_department_manager_or_admin(dept_id, db=db)),  # Менеджер конкретного подразделения или администратор
+    current_user: User = Depends(get_department_manager_or_admin),  # Менеджер конкретного подразделения или администратор
     db: Session = Depends(get_db)
 ):
     # Проверяем, существует ли подразделение
@@ -171,13 +225,15 @@ def add_employee_to_department(
     )
     db.add(user_dept)
     db.commit()
+    principal_cache.invalidate_user(employee_id)
+    manager_scope_cache.invalidate_department(dept_id)
     return {"status": "success"}
 
 @router.delete("/{dept_id}/employees/{employee_id}")
 def remove_employee_from_department(
     dept_id: int = Path(..., ge=1),
     employee_id: int = Path(..., ge=1),
-    current_user: dict = Depends(lambda dept_id=Path(..., ge=1), db=Depends(get_db): get_department_manager_or_admin(dept_id, db=db)),  # Менеджер конкретного подразделения или администратор
+    current_user: User = Depends(get_department_manager_or_admin),  # Менеджер конкретного подразделения или администратор
     db: Session = Depends(get_db)
 ):
     # Проверяем, существует ли подразделение
@@ -202,12 +258,14 @@ def remove_employee_from_department(
 
     db.delete(assoc)
     db.commit()
+    principal_cache.invalidate_user(employee_id)
+    manager_scope_cache.invalidate_department(dept_id)
     return {"status": "success"}
 
-@router.get("/{dept_id}/employees")
+@router.get("/{dept_id}/employees", dependencies=[Depends(query_budget(4))])
 def get_department_employees(
     dept_id: int = Path(..., ge=1),
-    current_user: dict = Depends(lambda dept_id=Path(..., ge=1), db=Depends(get_db): get_department_manager_or_admin(dept_id, db=db)),  # Менеджер конкретного подразделения или администратор
+    current_user: User = Depends(get_department_manager_or_admin),  # Менеджер конкретного подразделения или администратор
     db: Session = Depends(get_db)
 ):
     # Проверяем, существует ли подразделение
@@ -215,11 +273,10 @@ def get_department_employees(
     if not department:
         raise HTTPException(status_code=404, detail="Department not found")
 
-    # Получаем пользователей, связанных с подразделением
+    # Получаем пользователей, связанных с подразделением (одним запросом с подзапросом)
     from models.article import UserDepartment
-    user_depts = db.query(UserDepartment).filter(UserDepartment.department_id == dept_id).all()
-
-    employee_ids = [ud.user_id for ud in user_depts]
-    employees = db.query(User).filter(User.id.in_(employee_ids)).all()
+    employees = db.query(User).filter(
+        User.id.in_(db.query(UserDepartment.user_id).filter(UserDepartment.department_id == dept_id))
+    ).all()
 
     return employees
\ No newline at end of file
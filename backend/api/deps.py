@@ -1,10 +1,14 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import jwt, JWTError
 from datetime import timedelta
-from database import get_db
-from models.article import User, Department
+from database import get_db, get_async_db
+from models.article import User, Department, UserDepartment
+from utils.principal_cache import principal_cache
+from utils.manager_scope import manager_scope_cache
 from dotenv import load_dotenv
 import os
 
@@ -16,11 +20,8 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-):
-    print(f"get_current_user called with token")
+def _principal_key(token: str) -> tuple:
+    """Проверяет JWT и возвращает ключ кэша пользователей (login, iat)"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -32,19 +33,50 @@ def get_current_user(
         if login is None:
             raise credentials_exception
     except JWTError:
-        print(f"JWT Error occurred")
         raise credentials_exception
-    print(f"Looking for user with login: {login}")
-    user = db.query(User).filter(User.login == login).first()
-    print(f"Found user in DB: {user is not None}")
+    return login, payload.get("iat")
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    key = _principal_key(token)
+    cached = principal_cache.get(key)
+    if cached is not None:
+        # Присоединяем пользователя к сессии запроса без SELECT
+        return db.merge(principal_cache.to_user(cached), load=False)
+
+    user = db.query(User).filter(User.login == key[0]).first()
     if user is None:
-        print(f"User not found in DB")
-        raise credentials_exception
-    print(f"Returning user: {user.login}")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    principal_cache.set(key, user)
+    return user
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Асинхронный вариант get_current_user для обработчиков на AsyncSession"""
+    key = _principal_key(token)
+    cached = principal_cache.get(key)
+    if cached is not None:
+        return await db.merge(principal_cache.to_user(cached), load=False)
+
+    user = (await db.execute(select(User).where(User.login == key[0]))).scalars().first()
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    principal_cache.set(key, user)
     return user
 
 def get_current_active_user(current_user: User = Depends(get_current_user)):
-    print(f"get_current_active_user called for user: {current_user.login}")
     return current_user
 
 def get_current_admin_user(current_user: User = Depends(get_current_active_user)):
@@ -64,13 +96,89 @@ def get_current_manager_user(current_user: User = Depends(get_current_active_use
     return current_user
 
 
-def get_department_manager_or_admin(dept_id: int, current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)):
+class ManagerScope:
+    """
+    Пользователи, которых видит текущий пользователь в разделах управления:
+    администратор - всех, остальные - пользователей управляемых ими подразделений.
+    Проверка доступа к одному пользователю идёт по закэшированному множеству ID,
+    а выборки списков фильтруются подзапросом по user_departments (filter_users),
+    без передачи списка ID в запрос.
+    """
+
+    def __init__(self, is_admin: bool, department_ids=frozenset(), user_ids=frozenset()):
+        self.is_admin = is_admin
+        self.department_ids = department_ids
+        self.user_ids = user_ids
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.is_admin and not self.department_ids
+
+    def user_ids_subquery(self):
+        return select(UserDepartment.user_id).where(UserDepartment.department_id.in_(self.department_ids))
+
+    def filter_users(self, query, column=User.id):
+        """Ограничивает запрос пользователями области (column - колонка с ID пользователя)"""
+        if self.is_admin:
+            return query
+        return query.filter(column.in_(self.user_ids_subquery()))
+
+    def require_user(self, user_id: int) -> None:
+        """403, если пользователь user_id вне области"""
+        if self.is_admin:
+            return
+        if not self.department_ids:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied: You don't manage any departments"
+            )
+        if user_id not in self.user_ids:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied: This user is not in your department"
+            )
+
+
+def get_manager_scope(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+) -> ManagerScope:
+    """
+    Область видимости текущего пользователя. В пределах запроса FastAPI вызывает
+    зависимость один раз, между запросами область берётся из manager_scope_cache
+    (при промахе - один запрос подразделений вместе с их сотрудниками).
+    """
+    if current_user.role == "admin":
+        return ManagerScope(is_admin=True)
+
+    cached = manager_scope_cache.get(current_user.id)
+    if cached is None:
+        rows = db.query(Department.id, UserDepartment.user_id).outerjoin(
+            UserDepartment, UserDepartment.department_id == Department.id
+        ).filter(Department.manager_id == current_user.id).all()
+        cached = (
+            frozenset(row[0] for row in rows),
+            frozenset(row[1] for row in rows if row[1] is not None),
+        )
+        manager_scope_cache.set(current_user.id, *cached)
+    return ManagerScope(False, *cached)
+
+
+def get_department_manager_or_admin(
+    dept_id: int,
+    current_user: User = Depends(get_current_active_user),
+    scope: ManagerScope = Depends(get_manager_scope),
+    db: Session = Depends(get_db)
+):
     """Проверяет, является ли пользователь администратором или менеджером указанного подразделения"""
     if current_user.role == "admin":
         return current_user
     
     if current_user.role == "manager":
-        # Проверяем, является ли пользователь менеджером указанного подразделения
+        if dept_id in scope.department_ids:
+            return current_user
+
+        # Вне области: различаем несуществующее и чужое подразделение
         department = db.query(Department).filter(Department.id == dept_id).first()
         if not department:
             raise HTTPException(
@@ -78,13 +186,10 @@ def get_department_manager_or_admin(dept_id: int, current_user: User = Depends(g
                 detail="Department not found"
             )
         
-        if department.manager_id != current_user.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied: You are not the manager of this department"
-            )
-        
-        return current_user
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied: You are not the manager of this department"
+        )
     else:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -145,4 +250,27 @@ def check_user_can_edit_article(user: User, article_id: int, db: Session):
     raise HTTPException(
         status_code=status.HTTP_403_FORBIDDEN,
         detail="Insufficient permissions"
-    )
\ No newline at end of file
+    )
+
+def get_editable_article_ids(user: User, article_ids, db: Session) -> set:
+    """
+    Множественный вариант check_user_can_edit_article: возвращает те из article_ids,
+    которые пользователь может редактировать, за один запрос (для администратора - без запросов).
+    Правила те же: администратор - любые статьи, менеджер (с заполненным ФИО)
+    и пользователь - статьи, где он привязан к автору.
+    """
+    from models.article import Author
+
+    article_ids = set(article_ids)
+    if user.role == "admin":
+        return article_ids
+    if not article_ids or user.role not in ("manager", "user"):
+        return set()
+    if user.role == "manager" and not user.full_name:
+        return set()
+
+    rows = db.query(Author.article_id).filter(
+        Author.article_id.in_(article_ids),
+        Author.user_employee_id == user.id
+    ).distinct().all()
+    return {row.article_id for row in rows}
@@ -1,16 +1,16 @@
+from typing import Union
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from database import get_db
 from models.article import User, Department, UserDepartment, Article
 from schemas.employee import EmployeeCreate, EmployeeUpdate, EmployeeOut, EmployeeCreateExtended, EmployeeCreateWithDetails
 from api.deps import get_current_active_user, get_current_admin_user
-from passlib.context import CryptContext
-
-# Создаем контекст для хеширования паролей
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def get_password_hash(password: str):
-    return pwd_context.hash(password)
+from utils.principal_cache import principal_cache
+from utils.manager_scope import manager_scope_cache
+from utils.passwords import hash_password_async
+from utils.article_documents import employee_article_ids, refresh_article_documents
+from utils.suggestions import refresh_user_suggestions
 
 router = APIRouter()
 
@@ -30,16 +30,15 @@ def get_employee(employee_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Employee not found")
     return employee
 
-@router.post("/", response_model=EmployeeOut)
-def create_employee(
-    emp_data: EmployeeCreateExtended,
-    current_user: dict = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
-):
-    # Создаем нового пользователя-сотрудника
+def _add_employee(
+    db: Session,
+    emp_data: Union[EmployeeCreateExtended, EmployeeCreateWithDetails],
+    password_hash: str
+) -> User:
+    """Создаёт сотрудника с готовым хешем пароля (выполняется в пуле потоков)"""
     emp = User(
         login=emp_data.login,
-        password_hash=get_password_hash(emp_data.password),  # Хешируем пароль
+        password_hash=password_hash,
         email=emp_data.email,
         full_name=emp_data.full_name,
         id_elibrary_user=emp_data.id_elibrary_user or emp_data.full_name  # Если id_elibrary_user не указано, используем full_name
@@ -59,42 +58,32 @@ def create_employee(
             )
             db.add(user_dept)
 
+    refresh_user_suggestions(db, emp.id, emp.full_name)
     db.commit()
+    for dept_id in emp_data.department_ids:
+        manager_scope_cache.invalidate_department(dept_id)
     db.refresh(emp)
     return emp
 
+@router.post("/", response_model=EmployeeOut)
+async def create_employee(
+    emp_data: EmployeeCreateExtended,
+    current_user: dict = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    # Хешируем пароль в пуле bcrypt, запись в БД - в пуле потоков FastAPI
+    password_hash = await hash_password_async(emp_data.password)
+    return await run_in_threadpool(_add_employee, db, emp_data, password_hash)
+
 # Дополнительный эндпоинт для создания сотрудника с деталями
 @router.post("/with-details", response_model=EmployeeOut)
-def create_employee_with_details(
+async def create_employee_with_details(
     emp_data: EmployeeCreateWithDetails,
     current_user: dict = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
 ):
-    emp = User(
-        login=emp_data.login,
-        password_hash=get_password_hash(emp_data.password),  # Хешируем пароль
-        email=emp_data.email,
-        full_name=emp_data.full_name,
-        id_elibrary_user=emp_data.id_elibrary_user or emp_data.full_name  # Если id_elibrary_user не указано, используем full_name
-    )
-    db.add(emp)
-    db.flush()
-
-    # Привязываем к подразделениям
-    for dept_id in emp_data.department_ids:
-        dept = db.query(Department).filter(Department.id == dept_id).first()
-        if dept:
-            user_dept = UserDepartment(
-                user_id=emp.id,
-                department_id=dept_id,
-                is_primary=emp_data.primary_department_id == dept_id if emp_data.primary_department_id else False,
-                position_title=emp_data.position_title
-            )
-            db.add(user_dept)
-
-    db.commit()
-    db.refresh(emp)
-    return emp
+    password_hash = await hash_password_async(emp_data.password)
+    return await run_in_threadpool(_add_employee, db, emp_data, password_hash)
 
 @router.put("/{employee_id}", response_model=EmployeeOut)
 def update_employee(
@@ -108,11 +97,19 @@ def update_employee(
         raise HTTPException(status_code=404, detail="Employee not found")
 
     # Обновляем данные сотрудника
+    full_name_changed = employee.full_name != emp_data.full_name
     employee.full_name = emp_data.full_name
-    employee.fio = emp_data.fio
+    # Если id_elibrary_user не указано, используем full_name (как в /auth/users)
+    employee.id_elibrary_user = emp_data.id_elibrary_user if emp_data.id_elibrary_user is not None else emp_data.full_name
     employee.email = emp_data.email
     
+    # ФИО сотрудника входит в документы связанных статей
+    db.flush()
+    refresh_article_documents(db, employee_article_ids(db, employee_id))
+    if full_name_changed:
+        refresh_user_suggestions(db, employee_id, employee.full_name)
     db.commit()
+    principal_cache.invalidate_user(employee_id)
     db.refresh(employee)
     return employee
 
@@ -126,8 +123,13 @@ def delete_employee(
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
 
+    linked_article_ids = employee_article_ids(db, employee_id)
     db.delete(employee)
+    db.flush()
+    refresh_article_documents(db, linked_article_ids)
     db.commit()
+    principal_cache.invalidate_user(employee_id)
+    manager_scope_cache.invalidate_member(employee_id)
     return {"status": "success"}
 
 # Маршруты для связи сотрудников со статьями
@@ -163,6 +165,8 @@ def link_employee_to_article(
         article_id=article_id
     )
     db.add(emp_article)
+    db.flush()
+    refresh_article_documents(db, [article_id])
     db.commit()
     return {"status": "success"}
 
@@ -191,6 +195,8 @@ def unlink_employee_from_article(
     
     if link:
         db.delete(link)
+        db.flush()
+        refresh_article_documents(db, [article_id])
         db.commit()
     return {"status": "success"}
 
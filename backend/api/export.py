@@ -0,0 +1,143 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from itertools import groupby
+from typing import Optional
+from database import SessionLocal
+from models.article import Article, Author, User
+from api.deps import get_current_manager_user
+import csv
+import io
+import json
+
+router = APIRouter()
+
+# Сколько строк забирать с сервера за раз через серверный курсор
+EXPORT_BATCH_SIZE = 2000
+
+# Первые пять колонок совпадают с форматом импорта (/import/import-csv),
+# остальные - данные о привязке авторов; значения по авторам перечислены
+# через "; " в том же порядке, что и в колонке "Авторы"
+CSV_COLUMNS = [
+    'ID', 'Название', 'Авторы', 'Год публикации', 'В_РИНЦ',
+    'ID статьи', 'ID сотрудников', 'Сотрудники', 'Вклад', 'Заявка на премию', 'Дата заявки'
+]
+
+
+def _export_rows(year_from: Optional[int], year_to: Optional[int]):
+    """
+    Потоково читает статьи с авторами (серверный курсор) и отдаёт их по одной:
+    (строка статьи, [строки её авторов с ФИО привязанного сотрудника]).
+    Память не зависит от размера таблицы.
+    """
+    stmt = select(
+        Article.id, Article.external_id, Article.title, Article.year_pub, Article.in_rinc,
+        Author.author_name, Author.user_employee_id, User.full_name,
+        Author.contribution, Author.applied_for_award, Author.award_applied_date
+    ).outerjoin(
+        Author, Author.article_id == Article.id
+    ).outerjoin(
+        User, User.id == Author.user_employee_id
+    ).order_by(Article.id, Author.id)
+
+    if year_from is not None:
+        stmt = stmt.where(Article.year_pub >= year_from)
+    if year_to is not None:
+        stmt = stmt.where(Article.year_pub <= year_to)
+
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE))
+        for _, rows in groupby(result, key=lambda r: r.id):
+            rows = list(rows)
+            authors = [r for r in rows if r.author_name is not None]
+            yield rows[0], authors
+    finally:
+        db.close()
+
+
+def _stream_csv(year_from: Optional[int], year_to: Optional[int]):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')  # BOM, как в final_result.csv (для Excel)
+    writer.writerow(CSV_COLUMNS)
+
+    for count, (article, authors) in enumerate(_export_rows(year_from, year_to), start=1):
+        writer.writerow([
+            article.external_id if article.external_id is not None else '',
+            article.title,
+            ', '.join(a.author_name for a in authors),
+            article.year_pub,
+            'Да' if article.in_rinc else 'Нет',
+            article.id,
+            '; '.join(str(a.user_employee_id) if a.user_employee_id is not None else '' for a in authors),
+            '; '.join(a.full_name or '' for a in authors),
+            '; '.join(str(a.contribution) if a.contribution is not None else '' for a in authors),
+            '; '.join('Да' if a.applied_for_award else 'Нет' for a in authors),
+            '; '.join(a.award_applied_date.isoformat() if a.award_applied_date else '' for a in authors),
+        ])
+        if count % 500 == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue().encode('utf-8')
+
+
+def _stream_ndjson(year_from: Optional[int], year_to: Optional[int]):
+    lines = []
+    for article, authors in _export_rows(year_from, year_to):
+        lines.append(json.dumps({
+            "id": article.id,
+            "external_id": article.external_id,
+            "title": article.title,
+            "year_pub": article.year_pub,
+            "in_rinc": bool(article.in_rinc),
+            "authors": [
+                {
+                    "author_name": a.author_name,
+                    "user_employee_id": a.user_employee_id,
+                    "user_full_name": a.full_name,
+                    "contribution": a.contribution,
+                    "applied_for_award": bool(a.applied_for_award),
+                    "award_applied_date": a.award_applied_date.isoformat() if a.award_applied_date else None,
+                }
+                for a in authors
+            ],
+        }, ensure_ascii=False))
+        if len(lines) == 500:
+            yield ('\n'.join(lines) + '\n').encode('utf-8')
+            lines = []
+
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+@router.get("/articles")
+def export_articles(
+    format: str = "csv",  # "csv" или "ndjson"
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+    current_user: User = Depends(get_current_manager_user)  # Менеджер или администратор
+):
+    """
+    Полная выгрузка статей с авторами, привязками к сотрудникам, вкладом
+    и заявками на премию. Данные читаются серверным курсором и отдаются
+    потоково, поэтому память не растёт с размером таблицы.
+
+    CSV начинается с колонок формата импорта (ID, Название, Авторы,
+    Год публикации, В_РИНЦ) и может быть загружен обратно через /import/import-csv.
+    """
+    if format == "csv":
+        return StreamingResponse(
+            _stream_csv(year_from, year_to),
+            media_type="text/csv; charset=utf-8",
+            headers={"Content-Disposition": 'attachment; filename="articles.csv"'}
+        )
+    if format == "ndjson":
+        return StreamingResponse(
+            _stream_ndjson(year_from, year_to),
+            media_type="application/x-ndjson",
+            headers={"Content-Disposition": 'attachment; filename="articles.ndjson"'}
+        )
+    raise HTTPException(status_code=400, detail="format must be 'csv' or 'ndjson'")
@@ -0,0 +1,14 @@
+"""
+Пакет бенчмарков API.
+
+Скрипты запускаются из каталога backend:
+    python -m benchmarks.text_search --articles 100000
+    python -m benchmarks.api_hot_paths --scales 1,10,100
+    python -m benchmarks.synthetic_dataset --articles 1000000 --out-dir /tmp/elibrary_1m
+    python -m benchmarks.fio_golden
+
+Общие функции (схема elibrary_bench, заполнение данными, сводка замеров) -
+в benchmarks.common. Результаты api_hot_paths пишутся в benchmarks/results/.
+fio_golden проверяет utils/fio_utils.py по эталонному корпусу fio_golden.csv
+и замеряет его функции (БД не нужна).
+"""
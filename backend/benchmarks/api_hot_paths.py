@@ -0,0 +1,296 @@
+"""
+Бенчмарк горячих путей API через настоящее приложение FastAPI (TestClient).
+
+Для каждого масштаба (1x, 10x, 100x статей от размера final_result.csv)
+пересоздаёт схему elibrary_bench по Create_DB.sql, заполняет её статьями,
+пользователями и подразделениями и замеряет:
+    list         - GET /articles/ (случайные страницы)
+    list_cursor  - GET /articles/?pagination=cursor
+    list_filter  - GET /articles/?search_author=...
+    search       - GET /articles/search?q=...
+    suggestions  - GET /articles/my/suggestions (от имени пользователей)
+    claim        - POST /articles/{id}/claim
+    bulk_update  - PUT /articles/authors/bulk-update (50 авторов)
+    csv_import   - POST /import/import-csv и ожидание завершения задачи
+Для каждого случая - p50/p95/среднее время, пропускная способность
+и число SQL-запросов на запрос (из заголовка Server-Timing).
+Результаты пишутся в JSON, чтобы прогоны можно было сравнивать.
+
+Запуск (из каталога backend, нужна доступная PostgreSQL из .env):
+    python -m benchmarks.api_hot_paths --scales 1,10 --output benchmarks/results/run.json
+"""
+
+import argparse
+import csv
+import io
+import json
+import random
+import re
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.common import (
+    BENCH_SCHEMA,
+    BENCH_SCHEMA_MAP,
+    ROOT_DIR,
+    create_bench_engine,
+    create_schema,
+    load_source_rows,
+    seed,
+    seed_users,
+    summarize,
+)
+from config.database import db_config
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+SEARCH_QUERIES = ["схемотехника", "устройства", "моделирование систем", "Редкова"]
+AUTHOR_FILTERS = ["Редкова", "Кузин", "ова"]
+BULK_UPDATE_SIZE = 50
+
+_STATEMENTS_RE = re.compile(r"statements=(\d+)")
+
+
+def _statements(response) -> int:
+    match = _STATEMENTS_RE.search(response.headers.get("server-timing", ""))
+    return int(match.group(1)) if match else 0
+
+
+def run_case(make_request, repeats: int, warmup: int = 2) -> dict:
+    """
+    Выполняет make_request(i) repeats раз (после warmup прогревочных вызовов)
+    и возвращает сводку времени, пропускной способности и числа SQL-запросов.
+    """
+    for i in range(warmup):
+        make_request(i)
+
+    timings, statements, errors = [], [], 0
+    started_all = time.perf_counter()
+    for i in range(repeats):
+        started = time.perf_counter()
+        response = make_request(warmup + i)
+        timings.append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            errors += 1
+        statements.append(_statements(response))
+    result = summarize(timings, time.perf_counter() - started_all)
+    result["errors"] = errors
+    result["statements_max"] = max(statements) if statements else 0
+    return result
+
+
+def _auth_headers(user: dict, role: str) -> dict:
+    from api.auth import create_access_token
+
+    token = create_access_token({"sub": user["login"], "role": role, "full_name": user["full_name"]})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _claim_targets(engine, users: list, rng: random.Random) -> list:
+    """Пары (пользователь, article_id, author_name) для POST /articles/{id}/claim"""
+    from utils.fio_utils import build_user_match_keys
+
+    targets = []
+    with engine.connect() as conn:
+        for user in users:
+            row = conn.execute(
+                text(
+                    "SELECT article_id, author_name FROM authors "
+                    "WHERE match_key = ANY(:keys) AND user_employee_id IS NULL LIMIT 1"
+                ),
+                {"keys": build_user_match_keys(user["full_name"])},
+            ).first()
+            if row:
+                targets.append((user, row.article_id, row.author_name))
+    rng.shuffle(targets)
+    return targets
+
+
+def _import_csv(source: list, rows: int, first_external_id: int, rng: random.Random) -> bytes:
+    """CSV в формате /import/import-csv с новыми external_id"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["ID", "Название", "Авторы", "Год публикации", "В_РИНЦ"])
+    for i in range(rows):
+        title, authors = source[rng.randrange(len(source))]
+        writer.writerow([
+            first_external_id + i, f"{title} импорт {i}", ", ".join(authors),
+            rng.randint(2000, 2025), "Да" if rng.random() < 0.7 else "Нет",
+        ])
+    return buffer.getvalue().encode("utf-8")
+
+
+def benchmark_scale(scale: int, args, source: list, password_hash: str) -> dict:
+    import main
+    import database
+    import utils.import_jobs as import_jobs
+    from fastapi.testclient import TestClient
+
+    rng = random.Random(args.seed)
+    articles_count = len(source) * scale
+    engine = create_bench_engine(pool_size=5, max_overflow=10)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    started = time.perf_counter()
+    create_schema(engine)
+    seed(engine, articles_count, args.seed, source=source)
+    people = seed_users(engine, args.users * scale, args.seed, password_hash, source=source)
+    seed_seconds = time.perf_counter() - started
+    print(f"[{scale}x] {articles_count} статей, {len(people['users'])} пользователей, "
+          f"заполнение {seed_seconds:.1f} с")
+
+    # Приложение работает со схемой бенчмарка: подменяем сессию запросов
+    # и фабрику сессий фоновых задач импорта (engine уже переводит elibrary -> elibrary_bench)
+    def get_bench_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    main.app.dependency_overrides[database.get_db] = get_bench_db
+    import_jobs.SessionLocal = session_factory
+
+    if db_config.use_async:
+        # Асинхронные обработчики (DB_ASYNC=true) - через свой движок на ту же схему
+        async_engine = create_async_engine(
+            db_config.async_url,
+            connect_args={"server_settings": {"search_path": f"{BENCH_SCHEMA},public"}}
+        ).execution_options(schema_translate_map=BENCH_SCHEMA_MAP)
+        async_session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+        async def get_bench_async_db():
+            async with async_session_factory() as db:
+                yield db
+
+        main.app.dependency_overrides[database.get_async_db] = get_bench_async_db
+    client = TestClient(main.app)
+
+    admin_headers = _auth_headers(people["admin"][0], "admin")
+    users = people["users"]
+    user_headers = [_auth_headers(u, "user") for u in users]
+    max_page = max(1, min(1000, articles_count // 50))
+
+    with engine.connect() as conn:
+        author_ids = conn.execute(text("SELECT id FROM authors ORDER BY id LIMIT 100000")).scalars().all()
+
+    cursors = {"next": None}
+
+    def list_cursor(i):
+        params = {"per_page": 50, "pagination": "cursor"}
+        if cursors["next"]:
+            params["after"] = cursors["next"]
+        response = client.get("/articles/", params=params)
+        cursors["next"] = response.json().get("next_cursor")
+        return response
+
+    targets = _claim_targets(engine, users, rng)
+
+    def claim(i):
+        user, article_id, author_name = targets[i % len(targets)]
+        return client.post(
+            f"/articles/{article_id}/claim",
+            json={"author_name": author_name},
+            headers=_auth_headers(user, "user"),
+        )
+
+    def bulk_update(i):
+        picked = rng.sample(author_ids, min(BULK_UPDATE_SIZE, len(author_ids)))
+        return client.put("/articles/authors/bulk-update", headers=admin_headers, json=[
+            {"id": author_id, "contribution": round(rng.random(), 2),
+             "applied_for_award": rng.random() < 0.1, "award_applied_date": None}
+            for author_id in picked
+        ])
+
+    cases = {
+        "list": lambda i: client.get("/articles/", params={"page": rng.randint(1, max_page), "per_page": 50}),
+        "list_cursor": list_cursor,
+        "list_filter": lambda i: client.get(
+            "/articles/", params={"search_author": AUTHOR_FILTERS[i % len(AUTHOR_FILTERS)], "per_page": 50}
+        ),
+        "search": lambda i: client.get("/articles/search", params={"q": SEARCH_QUERIES[i % len(SEARCH_QUERIES)]}),
+        "suggestions": lambda i: client.get(
+            "/articles/my/suggestions", headers=user_headers[i % len(user_headers)]
+        ),
+        "claim": claim,
+        "bulk_update": bulk_update,
+    }
+
+    results = {"articles": articles_count, "users": len(users), "seed_seconds": round(seed_seconds, 1)}
+    for name, make_request in cases.items():
+        if name == "claim" and not targets:
+            continue
+        results[name] = run_case(make_request, args.repeats)
+        print(f"[{scale}x] {name:12} p50 {results[name]['p50_ms']:>9} мс  p95 {results[name]['p95_ms']:>9} мс")
+
+    # Импорт: загрузка файла и ожидание фоновой задачи
+    import_timings, rows_per_second = [], []
+    for run in range(args.import_repeats):
+        payload = _import_csv(source, args.import_rows, 10_000_000 * (run + 1) + articles_count, rng)
+        started = time.perf_counter()
+        job = client.post(
+            "/import/import-csv", headers=admin_headers,
+            files={"file": ("bench.csv", payload, "text/csv")}
+        ).json()
+        while job["status"] not in ("done", "failed"):
+            time.sleep(0.2)
+            job = client.get(f"/import/jobs/{job['id']}", headers=admin_headers).json()
+        import_timings.append((time.perf_counter() - started) * 1000)
+        rows_per_second.append(job.get("rows_per_second") or 0)
+    results["csv_import"] = summarize(import_timings)
+    results["csv_import"]["rows"] = args.import_rows
+    results["csv_import"]["rows_per_second"] = round(max(rows_per_second), 1) if rows_per_second else None
+
+    main.app.dependency_overrides.clear()
+    engine.dispose()
+    return results
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="1,10,100", help="Масштабы через запятую (множитель к final_result.csv)")
+    parser.add_argument("--users", type=int, default=500, help="Пользователей на масштаб 1x")
+    parser.add_argument("--repeats", type=int, default=50, help="Замеров на каждый случай")
+    parser.add_argument("--import-rows", type=int, default=5000, help="Строк в CSV для замера импорта")
+    parser.add_argument("--import-repeats", type=int, default=3, help="Замеров импорта")
+    parser.add_argument("--seed", type=int, default=42, help="Seed генератора данных")
+    parser.add_argument("--output", type=Path, help="Файл результатов (по умолчанию benchmarks/results/<время>.json)")
+    args = parser.parse_args()
+
+    from utils.passwords import hash_password
+
+    source = load_source_rows()
+    password_hash = hash_password("bench")
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+
+    report = {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "git_revision": _git_revision(),
+        "schema": BENCH_SCHEMA,
+        "params": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+        "scales": {f"{scale}x": benchmark_scale(scale, args, source, password_hash) for scale in scales},
+    }
+
+    output = args.output or RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"Результаты записаны в {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+Общие части бенчмарков: отдельная схема elibrary_bench по Create_DB.sql,
+заполнение синтетическими данными на основе final_result.csv и сводка замеров.
+"""
+
+import csv
+import random
+import statistics
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+
+from config.database import db_config
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+SCHEMA_SQL = ROOT_DIR / "Create_DB.sql"
+SOURCE_CSV = ROOT_DIR / "final_result.csv"
+BENCH_SCHEMA = "elibrary_bench"
+# Модели указаны со схемой elibrary (MetaData(schema="elibrary")), search_path
+# на ORM-запросы не влияет - имя схемы подменяется при компиляции
+BENCH_SCHEMA_MAP = {"elibrary": BENCH_SCHEMA}
+
+# Имена и отчества для восстановления полного ФИО пользователя по инициалам автора
+MALE_NAMES = [
+    "Александр", "Алексей", "Андрей", "Борис", "Вадим", "Валерий", "Василий", "Виктор",
+    "Владимир", "Геннадий", "Георгий", "Дмитрий", "Евгений", "Егор", "Иван", "Игорь",
+    "Константин", "Леонид", "Максим", "Михаил", "Николай", "Олег", "Павел", "Пётр",
+    "Роман", "Сергей", "Станислав", "Тимур", "Фёдор", "Юрий", "Ярослав", "Эдуард",
+]
+FEMALE_NAMES = [
+    "Александра", "Алла", "Анна", "Валентина", "Вера", "Галина", "Дарья", "Екатерина",
+    "Елена", "Жанна", "Зоя", "Ирина", "Ксения", "Лариса", "Людмила", "Марина",
+    "Мария", "Наталья", "Нина", "Оксана", "Ольга", "Полина", "Раиса", "Светлана",
+    "Татьяна", "Ульяна", "Юлия", "Яна", "Эльвира",
+]
+PATRONYMICS = [
+    ("Александрович", "Александровна"), ("Алексеевич", "Алексеевна"), ("Андреевич", "Андреевна"),
+    ("Борисович", "Борисовна"), ("Вадимович", "Вадимовна"), ("Викторович", "Викторовна"),
+    ("Владимирович", "Владимировна"), ("Геннадьевич", "Геннадьевна"), ("Георгиевич", "Георгиевна"),
+    ("Дмитриевич", "Дмитриевна"), ("Евгеньевич", "Евгеньевна"), ("Егорович", "Егоровна"),
+    ("Иванович", "Ивановна"), ("Игоревич", "Игоревна"), ("Константинович", "Константиновна"),
+    ("Леонидович", "Леонидовна"), ("Максимович", "Максимовна"), ("Михайлович", "Михайловна"),
+    ("Николаевич", "Николаевна"), ("Олегович", "Олеговна"), ("Павлович", "Павловна"),
+    ("Петрович", "Петровна"), ("Романович", "Романовна"), ("Сергеевич", "Сергеевна"),
+    ("Станиславович", "Станиславовна"), ("Тимурович", "Тимуровна"), ("Фёдорович", "Фёдоровна"),
+    ("Юрьевич", "Юрьевна"), ("Ярославович", "Ярославовна"), ("Эдуардович", "Эдуардовна"),
+]
+
+
+def create_bench_engine(**kwargs) -> Engine:
+    """
+    Движок на схему бенчмарка: ORM-запросы переводятся с elibrary на elibrary_bench
+    через schema_translate_map, текстовый SQL идёт через search_path
+    (расширения, например pg_trgm, - в public).
+    """
+    engine = create_engine(db_config.url, **kwargs)
+
+    @event.listens_for(engine, "connect")
+    def set_search_path(dbapi_connection, connection_record):
+        with dbapi_connection.cursor() as cursor:
+            cursor.execute(f"SET search_path TO {BENCH_SCHEMA}, public")
+
+    return engine.execution_options(schema_translate_map=BENCH_SCHEMA_MAP)
+
+
+def load_source_rows():
+    """Читает пары (название, список авторов) из final_result.csv"""
+    from utils.csv_importer import extract_authors
+
+    with open(SOURCE_CSV, encoding="utf-8-sig", newline="") as f:
+        return [(row["Название"], extract_authors(row["Авторы"])) for row in csv.DictReader(f)]
+
+
+def create_schema(engine: Engine) -> None:
+    """Пересоздаёт схему бенчмарка по Create_DB.sql"""
+    ddl = SCHEMA_SQL.read_text(encoding="utf-8-sig")
+    ddl = ddl.replace("AUTHORIZATION postgres", "").replace("elibrary.", f"{BENCH_SCHEMA}.")
+    ddl = ddl.replace("SCHEMA IF EXISTS elibrary ", f"SCHEMA IF EXISTS {BENCH_SCHEMA} ")
+    ddl = ddl.replace("CREATE SCHEMA elibrary", f"CREATE SCHEMA {BENCH_SCHEMA}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(ddl)
+
+
+def seed(engine: Engine, articles_count: int, seed_value: int, source: Optional[list] = None) -> None:
+    """
+    Заполняет схему синтетическими статьями (названия и авторы берутся из CSV).
+    Заполняются и производные колонки, которые приложение ведёт само:
+    authors.match_key, articles.search_vector и articles.document.
+    """
+    from utils.article_documents import refresh_article_documents
+    from utils.article_search import refresh_article_search_vectors
+    from utils.fio_utils import build_author_match_key
+
+    rng = random.Random(seed_value)
+    source = source or load_source_rows()
+    batch = 5000
+
+    with engine.begin() as conn:
+        for start in range(0, articles_count, batch):
+            size = min(batch, articles_count - start)
+            picked = [source[rng.randrange(len(source))] for _ in range(size)]
+            article_ids = conn.execute(
+                text(
+                    "INSERT INTO articles (external_id, title, year_pub, in_rinc) "
+                    "SELECT * FROM unnest(:ext, :title, :year, :rinc) RETURNING id"
+                ),
+                {
+                    "ext": [start + i + 1 for i in range(size)],
+                    "title": [f"{title} {start + i}" for i, (title, _) in enumerate(picked)],
+                    "year": [rng.randint(2000, 2025) for _ in range(size)],
+                    "rinc": [rng.random() < 0.7 for _ in range(size)],
+                },
+            ).scalars().all()
+
+            author_rows = [
+                {"article_id": article_id, "author_name": name, "match_key": build_author_match_key(name)}
+                for article_id, (_, authors) in zip(article_ids, picked)
+                for name in authors
+            ]
+            if author_rows:
+                conn.execute(
+                    text(
+                        "INSERT INTO authors (article_id, author_name, match_key, contribution, applied_for_award) "
+                        "VALUES (:article_id, :author_name, :match_key, 0, false)"
+                    ),
+                    author_rows,
+                )
+            refresh_article_search_vectors(conn, article_ids)
+            refresh_article_documents(conn, article_ids)
+        conn.exec_driver_sql("ANALYZE")
+
+
+def author_initials(author_name: str) -> List[str]:
+    """Инициалы имени автора "Фамилия И.О." (не больше двух, в верхнем регистре): ["И", "О"]"""
+    return [part[0].upper() for part in author_name.replace(".", " ").split()[1:3]]
+
+
+def expand_author_name(author_name: str, rng: random.Random) -> Optional[str]:
+    """
+    Восстанавливает правдоподобное полное ФИО по имени автора "Фамилия И.О.":
+    имя и отчество подбираются по инициалам. None, если инициалов нет
+    или для инициала нет подходящего имени.
+    """
+    initials = author_initials(author_name)
+    if not initials:
+        return None
+    surname = author_name.split()[0]
+    female = surname.endswith(("а", "я"))
+
+    names = [n for n in (FEMALE_NAMES if female else MALE_NAMES) if n[0] == initials[0]]
+    if not names:
+        return None
+    full_name = [surname, rng.choice(names)]
+
+    if len(initials) > 1:
+        patronymics = [p[1] if female else p[0] for p in PATRONYMICS if p[0][0] == initials[1]]
+        if not patronymics:
+            return None
+        full_name.append(rng.choice(patronymics))
+    return " ".join(full_name)
+
+
+def seed_users(
+    engine: Engine,
+    users_count: int,
+    seed_value: int,
+    password_hash: str,
+    source: Optional[list] = None,
+    users_per_department: int = 25
+) -> Dict[str, List[dict]]:
+    """
+    Создаёт администратора, пользователей с ФИО, совпадающими с авторами
+    из CSV, и подразделения (первый пользователь подразделения - его менеджер),
+    затем заполняет таблицу suggestions.
+    Возвращает {"admin": [...], "managers": [...], "users": [...]} со строками id/login/full_name.
+    """
+    from utils.suggestions import rebuild_suggestions
+
+    rng = random.Random(seed_value)
+    source = source or load_source_rows()
+    author_names = sorted({name for _, authors in source for name in authors})
+    rng.shuffle(author_names)
+
+    full_names = []
+    seen = set()
+    for name in author_names:
+        full_name = expand_author_name(name, rng)
+        if full_name and full_name not in seen:
+            seen.add(full_name)
+            full_names.append(full_name)
+        if len(full_names) == users_count:
+            break
+
+    with engine.begin() as conn:
+        def insert_user(login: str, role: str, full_name: str) -> dict:
+            user_id = conn.execute(
+                text(
+                    "INSERT INTO users (login, password_hash, role, full_name, id_elibrary_user) "
+                    "VALUES (:login, :password_hash, :role, :full_name, :full_name) RETURNING id"
+                ),
+                {"login": login, "password_hash": password_hash, "role": role, "full_name": full_name},
+            ).scalar_one()
+            return {"id": user_id, "login": login, "full_name": full_name}
+
+        result = {
+            "admin": [insert_user("bench_admin", "admin", "Администратор Бенчмарка")],
+            "managers": [],
+            "users": [],
+        }
+        for start in range(0, len(full_names), users_per_department):
+            group = full_names[start:start + users_per_department]
+            manager = insert_user(f"bench_manager_{start}", "manager", group[0])
+            department_id = conn.execute(
+                text("INSERT INTO departments (name, manager_id) VALUES (:name, :manager_id) RETURNING id"),
+                {"name": f"Кафедра {start // users_per_department + 1}", "manager_id": manager["id"]},
+            ).scalar_one()
+            members = [manager] + [
+                insert_user(f"bench_user_{start + i}", "user", full_name)
+                for i, full_name in enumerate(group[1:], start=1)
+            ]
+            conn.execute(
+                text(
+                    "INSERT INTO user_departments (user_id, department_id, is_primary) "
+                    "VALUES (:user_id, :department_id, true)"
+                ),
+                [{"user_id": m["id"], "department_id": department_id} for m in members],
+            )
+            result["managers"].append(manager)
+            result["users"].extend(members[1:])
+        # Таблицу suggestions приложение ведёт само; модели указаны со схемой elibrary
+        rebuild_suggestions(conn.execution_options(schema_translate_map=BENCH_SCHEMA_MAP))
+        conn.exec_driver_sql("ANALYZE")
+    return result
+
+
+def summarize(timings_ms: List[float], total_seconds: Optional[float] = None) -> dict:
+    """p50/p95/среднее в миллисекундах и пропускная способность (запросов в секунду)"""
+    if not timings_ms:
+        return {"count": 0}
+    ordered = sorted(timings_ms)
+    total_seconds = total_seconds if total_seconds is not None else sum(ordered) / 1000
+    return {
+        "count": len(ordered),
+        "p50_ms": round(statistics.median(ordered), 2),
+        "p95_ms": round(ordered[max(0, int(len(ordered) * 0.95 + 0.5) - 1)], 2),
+        "mean_ms": round(statistics.fmean(ordered), 2),
+        "throughput_rps": round(len(ordered) / total_seconds, 2) if total_seconds > 0 else None,
+    }
@@ -0,0 +1,203 @@
+"""
+Эталонный корпус и микробенчмарки utils/fio_utils.py.
+
+Корпус benchmarks/fio_golden.csv - пары (имя автора, ФИО сотрудника, ожидаемый
+результат match_author_with_user). Имена авторов взяты из final_result.csv
+(как есть, "Фамилия И.О.", и в записи "Фамилия И. О." с пробелом), ФИО
+сотрудников восстановлены по инициалам авторов (benchmarks.common.expand_author_name),
+в том числе неполные: только фамилия, фамилия и имя. Для каждого сотрудника
+в корпус попадают все авторы-однофамильцы (совпадения и несовпадения по
+инициалам) и случайные авторы с другими фамилиями.
+
+Ожидание берётся из построения, а не из fio_utils (expected_match): инициалы
+сотрудника известны - по ним expand_author_name подбирал имя и отчество.
+Автор совпадает с сотрудником, если фамилия та же и каждый инициал автора
+есть в записи сотрудника и равен её инициалу. Дополнительно проверяются
+EDGE_CASES - ожидания в них записаны вручную.
+
+Проверка корпуса и граничных случаев входит в тесты (tests/test_fio_utils.py);
+любая оптимизация fio_utils должна проходить её без расхождений и не замедлять
+микробенчмарки.
+
+Запуск (из каталога backend, БД не нужна):
+    python -m benchmarks.fio_golden                 # проверка корпуса и замеры
+    python -m benchmarks.fio_golden --check-only    # только проверка (код возврата 1 при расхождениях)
+    python -m benchmarks.fio_golden --regenerate    # пересоздать корпус (после осознанного изменения правил)
+"""
+
+import argparse
+import csv
+import random
+import sys
+import timeit
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+from benchmarks.common import author_initials, expand_author_name, load_source_rows
+from utils.fio_utils import (
+    compile_user_matcher, generate_author_variants, match_author_with_user, normalize_fio
+)
+
+GOLDEN_CSV = Path(__file__).resolve().parent / "fio_golden.csv"
+
+# (имя автора, ФИО пользователя, ожидаемый результат)
+EDGE_CASES = [
+    ("Редкова Н.А.", "Редкова Наталья Александровна", True),
+    ("Редкова Н. А.", "Редкова Наталья Александровна", True),
+    ("Редкова Н. Б.", "Редкова Наталья Александровна", False),  # другое отчество
+    ("Редкова Н.Б.", "Редкова Наталья Александровна", False),  # другое отчество, слитные инициалы
+    ("Грака Ж.Д", "Грака Жанна Дмитриевна", True),  # без последней точки
+    ("Редкова Н. А.", "Редкова Наталья", False),  # у пользователя нет отчества
+    ("Редкова Н.А.", "Редкова Наталья", False),
+    ("Редкова М.А.", "Редкова Наталья Александровна", False),
+    ("Редкова", "Редкова Наталья Александровна", True),  # у автора только фамилия
+    ("Редкова Н.А.", "Редкова", False),  # у пользователя только фамилия
+    ("Редкова", "Редкова", True),
+    ("  редкова   н.а. ", "РЕДКОВА Наталья Александровна", True),
+    ("Редкова Наталья Александровна", "Редкова  Наталья  Александровна", True),
+    ("Редкова Наталья", "Редкова Наталья Александровна", True),
+    ("Редков Н.А.", "Редкова Наталья Александровна", False),
+    ("Кузин П.И.", "Кузина Полина Игоревна", False),
+    ("Иванов С. Е.", "Иванов Сергей Евгеньевич", True),
+]
+
+
+def expected_match(author_name: str, staff_surname: str, staff_initials: List[str]) -> bool:
+    """Ожидание по построению корпуса: фамилия та же, инициалы автора - начало инициалов сотрудника"""
+    initials = author_initials(author_name)
+    return (
+        author_name.split()[0].lower() == staff_surname.lower()
+        and len(initials) <= len(staff_initials)
+        and initials == staff_initials[:len(initials)]
+    )
+
+
+def build_corpus(seed_value: int = 42, staff_count: int = 600, strangers: int = 3) -> Iterator[Tuple[str, str, bool]]:
+    """Пары (автор, сотрудник, ожидание) из final_result.csv; ожидание - expected_match"""
+    rng = random.Random(seed_value)
+    author_names = sorted({name for _, authors in load_source_rows() for name in authors})
+
+    by_surname = defaultdict(list)
+    for name in author_names:
+        by_surname[name.split()[0].lower()].append(name)
+
+    shuffled = author_names[:]
+    rng.shuffle(shuffled)
+    staff = []
+    for name in shuffled[:staff_count]:
+        full_name = expand_author_name(name, rng)
+        if not full_name:
+            continue
+        parts = full_name.split()
+        # Часть сотрудников - с неполным ФИО: в записи остаются только первые инициалы
+        kept = rng.choice([1, 2, len(parts), len(parts)])
+        staff.append((" ".join(parts[:kept]), parts[0], author_initials(name)[:kept - 1]))
+
+    for full_name, surname, initials in staff:
+        namesakes = by_surname[surname.lower()]
+        candidates = []
+        for author_name in namesakes + [rng.choice(author_names) for _ in range(strangers)]:
+            candidates.append(author_name)
+            parts = author_name.split()
+            if len(parts) == 2 and parts[1].count(".") == 2:
+                # "Фамилия И.О." -> "Фамилия И. О.": инициалы разбираются как имя и отчество
+                first, patronymic = parts[1].split(".")[:2]
+                candidates.append(f"{parts[0]} {first}. {patronymic}.")
+        for author_name in dict.fromkeys(candidates):
+            yield author_name, full_name, expected_match(author_name, surname, initials)
+
+
+def write_corpus(path: Path, rows) -> int:
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["author_name", "user_full_name", "expected"])
+        for author_name, user_full_name, expected in rows:
+            writer.writerow([author_name, user_full_name, int(expected)])
+            count += 1
+    return count
+
+
+def load_corpus(path: Path = GOLDEN_CSV) -> List[Tuple[str, str, bool]]:
+    with open(path, encoding="utf-8", newline="") as f:
+        return [(row["author_name"], row["user_full_name"], row["expected"] == "1") for row in csv.DictReader(f)]
+
+
+def check(corpus: List[Tuple[str, str, bool]]) -> List[Tuple[str, str, bool, object]]:
+    """Расхождения (автор, сотрудник, ожидание, фактический результат или исключение)"""
+    mismatches = []
+    for author_name, user_full_name, expected in EDGE_CASES + corpus:
+        try:
+            actual = match_author_with_user(author_name, user_full_name)
+        except Exception as e:  # ошибка в правилах - тоже расхождение
+            actual = f"{type(e).__name__}: {e}"
+        if actual != expected:
+            mismatches.append((author_name, user_full_name, expected, actual))
+    return mismatches
+
+
+def benchmark(corpus: List[Tuple[str, str, bool]], repeats: int) -> dict:
+    """
+    Время одного вызова, мкс (лучший из repeats проходов по корпусу).
+    Для сопоставителей - время на одну пару (автор, сотрудник)
+    """
+    authors = [author_name for author_name, _, _ in corpus]
+    users = [user_full_name for _, user_full_name, _ in corpus]
+    pairs = [(author_name, user_full_name) for author_name, user_full_name, _ in corpus]
+    # Авторы, сгруппированные по сотруднику: один сопоставитель на всех его авторов
+    by_user = defaultdict(list)
+    for author_name, user_full_name in pairs:
+        by_user[user_full_name].append(author_name)
+
+    def compile_and_match():
+        compile_user_matcher.cache_clear()
+        return [compile_user_matcher(u).match_many(names) for u, names in by_user.items()]
+
+    matchers = [(compile_user_matcher(u), names) for u, names in by_user.items()]
+
+    cases = {
+        "normalize_fio": lambda: [normalize_fio(name) for name in authors],
+        "generate_author_variants": lambda: [generate_author_variants(name) for name in users],
+        "match_author_with_user": lambda: [match_author_with_user(a, u) for a, u in pairs],
+        # Пустой кэш: компиляция сопоставителя + проверка всех авторов сотрудника
+        "compile_user_matcher": compile_and_match,
+        # Сопоставители уже скомпилированы
+        "UserMatcher.match_many": lambda: [matcher.match_many(names) for matcher, names in matchers],
+    }
+    return {
+        name: round(min(timeit.repeat(func, number=1, repeat=repeats)) / len(corpus) * 1e6, 3)
+        for name, func in cases.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--regenerate", action="store_true", help="Пересоздать fio_golden.csv")
+    parser.add_argument("--check-only", action="store_true", help="Только проверка корпуса")
+    parser.add_argument("--repeats", type=int, default=5, help="Проходов по корпусу в замерах")
+    parser.add_argument("--seed", type=int, default=42, help="Seed выбора сотрудников (для --regenerate)")
+    args = parser.parse_args()
+
+    if args.regenerate:
+        count = write_corpus(GOLDEN_CSV, build_corpus(args.seed))
+        print(f"Записано {count} пар в {GOLDEN_CSV}")
+
+    corpus = load_corpus()
+    mismatches = check(corpus)
+    matches = sum(expected for _, _, expected in corpus)
+    print(f"Пар: {len(corpus)} (совпадений {matches}) + {len(EDGE_CASES)} граничных случаев, "
+          f"расхождений: {len(mismatches)}")
+    for author_name, user_full_name, expected, actual in mismatches[:20]:
+        print(f"  {author_name!r} / {user_full_name!r}: ожидалось {expected}, получено {actual}")
+
+    if not args.check_only:
+        for name, microseconds in benchmark(corpus, args.repeats).items():
+            print(f"{name:26} {microseconds:>9} мкс/вызов")
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+"""
+Генератор синтетических наборов данных для проверки масштабирования.
+
+Распределения берутся из final_result.csv:
+    - фамилии (с частотами) и буквы инициалов, доля авторов с одним инициалом;
+    - число статей на автора (от него зависит, как часто автор повторяется);
+    - число авторов в статье, включая статьи без авторов;
+    - слова названий (цепь Маркова по парам слов) и длина названия;
+    - годы публикации и доля статей в РИНЦ.
+
+На выходе:
+    articles.csv          - формат /import/import-csv (ID, Название, Авторы, Год публикации, В_РИНЦ)
+    users.csv             - пользователи; большая часть ФИО - развёрнутые инициалы авторов
+                            из articles.csv, поэтому подсказки и привязка находят совпадения
+    departments.csv       - подразделения (первый пользователь подразделения - менеджер)
+    user_departments.csv  - принадлежность пользователей подразделениям
+
+Результат полностью определяется --seed. Статьи пишутся построчно, в памяти
+держится только пул авторов (около половины числа статей, как в исходных данных),
+поэтому генерируются и миллионы строк авторов.
+
+Запуск (из каталога backend):
+    python -m benchmarks.synthetic_dataset --articles 1000000 --users 20000 --out-dir /tmp/elibrary_1m
+
+Загрузка: articles.csv - через /import/import-csv, справочники - в указанном
+порядке через psql (пароль всех пользователей - --password):
+    \\copy elibrary.users (id, login, password_hash, email, role, full_name, id_elibrary_user) FROM 'users.csv' CSV HEADER
+    \\copy elibrary.departments (id, name, manager_id) FROM 'departments.csv' CSV HEADER
+    \\copy elibrary.user_departments (user_id, department_id, is_primary, position_title) FROM 'user_departments.csv' CSV HEADER
+    SELECT setval('elibrary.users_id_seq', (SELECT max(id) FROM elibrary.users));
+    SELECT setval('elibrary.departments_id_seq', (SELECT max(id) FROM elibrary.departments));
+"""
+
+import argparse
+import bisect
+import csv
+import itertools
+import random
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.common import SOURCE_CSV, expand_author_name
+
+# Номера статей синтетического набора не пересекаются с реальными ID elibrary
+DEFAULT_FIRST_ID = 900_000_000
+
+_WORD_RE = re.compile(r"\S+")
+_START, _END = "\x02", "\x03"
+
+
+class WeightedChoice:
+    """Выбор из значений с весами за O(log n) (накопленные веса + bisect)"""
+
+    def __init__(self, values: list, weights: list):
+        self.values = values
+        self.cum_weights = list(itertools.accumulate(weights))
+        self.total = self.cum_weights[-1]
+
+    @classmethod
+    def from_counter(cls, counter: Counter) -> "WeightedChoice":
+        # Сортировка делает результат независимым от порядка вставки в Counter
+        items = sorted(counter.items(), key=lambda kv: (-kv[1], str(kv[0])))
+        return cls([k for k, _ in items], [v for _, v in items])
+
+    def __call__(self, rng: random.Random):
+        return self.values[bisect.bisect_right(self.cum_weights, rng.random() * self.total)]
+
+
+@dataclass
+class SourceModel:
+    """Распределения, извлечённые из исходного CSV"""
+    surnames: WeightedChoice
+    first_initials: WeightedChoice
+    second_initials: WeightedChoice
+    single_initial_share: float
+    articles_per_author: WeightedChoice
+    authors_per_article: WeightedChoice
+    title_lengths: WeightedChoice
+    title_transitions: Dict[str, WeightedChoice]
+    years: WeightedChoice
+    in_rinc_share: float
+    distinct_authors_per_article: float
+
+
+def learn_model(path: Path = SOURCE_CSV) -> SourceModel:
+    """Строит SourceModel по CSV в формате final_result.csv"""
+    from utils.csv_importer import extract_authors
+
+    source, years, rinc = [], Counter(), Counter()
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            source.append((row["Название"], extract_authors(row["Авторы"])))
+            if str(row["Год публикации"]).isdigit():
+                years[int(row["Год публикации"])] += 1
+            rinc[row["В_РИНЦ"] == "Да"] += 1
+
+    surnames, first, second = Counter(), Counter(), Counter()
+    per_author, per_article, lengths = Counter(), Counter(), Counter()
+    transitions = defaultdict(Counter)
+    single_initial = 0
+
+    for title, authors in source:
+        per_article[len(authors)] += 1
+        for name in authors:
+            per_author[name] += 1
+            surname, _, initials = name.partition(" ")
+            letters = initials.replace(".", "")
+            surnames[surname] += 1
+            first[letters[0]] += 1
+            if len(letters) > 1:
+                second[letters[1]] += 1
+            else:
+                single_initial += 1
+
+        words = _WORD_RE.findall(title)
+        lengths[len(words)] += 1
+        for prev, word in zip([_START] + words, words + [_END]):
+            transitions[prev][word] += 1
+
+    total_authors = sum(count * authors for authors, count in per_article.items())
+    return SourceModel(
+        surnames=WeightedChoice.from_counter(surnames),
+        first_initials=WeightedChoice.from_counter(first),
+        second_initials=WeightedChoice.from_counter(second),
+        single_initial_share=single_initial / max(1, total_authors),
+        articles_per_author=WeightedChoice.from_counter(Counter(per_author.values())),
+        authors_per_article=WeightedChoice.from_counter(per_article),
+        title_lengths=WeightedChoice.from_counter(lengths),
+        title_transitions={word: WeightedChoice.from_counter(c) for word, c in transitions.items()},
+        years=WeightedChoice.from_counter(years),
+        in_rinc_share=rinc[True] / max(1, sum(rinc.values())),
+        distinct_authors_per_article=len(per_author) / max(1, len(source)),
+    )
+
+
+class AuthorPool:
+    """
+    Пул синтетических авторов "Фамилия И.О." с весами продуктивности:
+    вероятность попасть в статью пропорциональна числу статей автора,
+    взятому из исходного распределения.
+    """
+
+    def __init__(self, model: SourceModel, size: int, rng: random.Random):
+        names, weights, seen = [], [], set()
+        attempts = 0
+        while len(names) < size and attempts < size * 20:
+            attempts += 1
+            initials = model.first_initials(rng) + "."
+            if rng.random() >= model.single_initial_share:
+                initials += model.second_initials(rng) + "."
+            name = f"{model.surnames(rng)} {initials}"
+            if name in seen:
+                continue
+            seen.add(name)
+            names.append(name)
+            weights.append(model.articles_per_author(rng))
+        self.names = names
+        self.weights = weights
+        self.choice = WeightedChoice(names, weights)
+
+    def sample_authors(self, count: int, rng: random.Random) -> List[str]:
+        """count разных авторов одной статьи"""
+        count = min(count, len(self.names))
+        picked = []
+        while len(picked) < count:
+            name = self.choice(rng)
+            if name not in picked:
+                picked.append(name)
+        return picked
+
+
+def generate_title(model: SourceModel, rng: random.Random) -> str:
+    target_length = model.title_lengths(rng)
+    words, prev = [], _START
+    while len(words) < target_length:
+        transitions = model.title_transitions.get(prev)
+        if transitions is None:
+            break
+        word = transitions(rng)
+        if word == _END:
+            if len(words) >= max(1, target_length // 2):
+                break
+            prev = _START  # Слишком короткое название - начинаем новую фразу
+            continue
+        words.append(word)
+        prev = word
+    return " ".join(words)
+
+
+def write_articles(
+    path: Path,
+    model: SourceModel,
+    pool: AuthorPool,
+    articles: int,
+    rng: random.Random,
+    first_id: int = DEFAULT_FIRST_ID
+) -> int:
+    """Пишет articles.csv построчно; возвращает число строк авторов"""
+    author_rows = 0
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ID", "Название", "Авторы", "Год публикации", "В_РИНЦ"])
+        for i in range(articles):
+            authors = pool.sample_authors(model.authors_per_article(rng), rng)
+            author_rows += len(authors)
+            writer.writerow([
+                first_id + i,
+                generate_title(model, rng),
+                ", ".join(authors) if authors else "Нет авторов",
+                model.years(rng),
+                "Да" if rng.random() < model.in_rinc_share else "Нет",
+            ])
+    return author_rows
+
+
+def _random_full_name(model: SourceModel, rng: random.Random) -> Optional[str]:
+    """ФИО сотрудника, не обязательно совпадающее с кем-то из авторов"""
+    initials = f"{model.first_initials(rng)}.{model.second_initials(rng)}."
+    return expand_author_name(f"{model.surnames(rng)} {initials}", rng)
+
+
+def write_user_fixtures(
+    out_dir: Path,
+    model: SourceModel,
+    pool: AuthorPool,
+    users: int,
+    rng: random.Random,
+    password_hash: str,
+    author_share: float = 0.8,
+    users_per_department: int = 25
+) -> Tuple[int, int]:
+    """
+    Пишет users.csv, departments.csv и user_departments.csv.
+    Доля author_share пользователей - авторы из пула (чаще продуктивные),
+    остальные получают случайные ФИО и могут совпасть с авторами лишь случайно,
+    как однофамильцы. Возвращает (число пользователей, число подразделений).
+    """
+    full_names, seen = [], set()
+    attempts = 0
+    while len(full_names) < users and attempts < users * 50:
+        attempts += 1
+        if rng.random() < author_share:
+            full_name = expand_author_name(pool.choice(rng), rng)
+        else:
+            full_name = _random_full_name(model, rng)
+        if full_name and full_name not in seen:
+            seen.add(full_name)
+            full_names.append(full_name)
+
+    departments = 0
+    with open(out_dir / "users.csv", "w", encoding="utf-8", newline="") as users_file, \
+            open(out_dir / "departments.csv", "w", encoding="utf-8", newline="") as departments_file, \
+            open(out_dir / "user_departments.csv", "w", encoding="utf-8", newline="") as links_file:
+        users_writer = csv.writer(users_file)
+        departments_writer = csv.writer(departments_file)
+        links_writer = csv.writer(links_file)
+        users_writer.writerow(["id", "login", "password_hash", "email", "role", "full_name", "id_elibrary_user"])
+        departments_writer.writerow(["id", "name", "manager_id"])
+        links_writer.writerow(["user_id", "department_id", "is_primary", "position_title"])
+
+        users_writer.writerow([1, "admin", password_hash, "admin@example.org", "admin",
+                               "Администратор Системы", "Администратор Системы"])
+        for index, full_name in enumerate(full_names):
+            user_id = index + 2
+            department_id = index // users_per_department + 1
+            is_manager = index % users_per_department == 0
+            users_writer.writerow([
+                user_id, f"user{user_id}", password_hash, f"user{user_id}@example.org",
+                "manager" if is_manager else "user", full_name, full_name
+            ])
+            if is_manager:
+                departments += 1
+                departments_writer.writerow([department_id, f"Подразделение {department_id}", user_id])
+            links_writer.writerow([
+                user_id, department_id, "true", "Заведующий" if is_manager else "Сотрудник"
+            ])
+    return len(full_names) + 1, departments
+
+
+_BCRYPT_SALT_CHARS = "./ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+
+
+def deterministic_password_hash(password: str, rng: random.Random) -> str:
+    """
+    bcrypt-хеш с солью из rng (стоимость - BCRYPT_ROUNDS приложения), чтобы
+    users.csv побайтно совпадал при одинаковом seed. Только для тестовых данных.
+    """
+    from utils.passwords import BCRYPT_ROUNDS, pwd_context
+
+    # Последний символ соли bcrypt кодирует лишь 2 бита - допустимы только ".Oeu"
+    salt = "".join(rng.choice(_BCRYPT_SALT_CHARS) for _ in range(21)) + rng.choice(".Oeu")
+    return pwd_context.handler("bcrypt").using(salt=salt, rounds=BCRYPT_ROUNDS).hash(password)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=100_000, help="Количество статей")
+    parser.add_argument("--users", type=int, default=2000, help="Количество пользователей (без администратора)")
+    parser.add_argument("--author-share", type=float, default=0.8,
+                        help="Доля пользователей, чьё ФИО взято из авторов набора")
+    parser.add_argument("--seed", type=int, default=42, help="Seed генератора")
+    parser.add_argument("--first-id", type=int, default=DEFAULT_FIRST_ID, help="Первый ID статьи")
+    parser.add_argument("--password", default="password", help="Пароль всех пользователей")
+    parser.add_argument("--source", type=Path, default=SOURCE_CSV, help="CSV, по которому строятся распределения")
+    parser.add_argument("--out-dir", type=Path, required=True, help="Каталог для результатов")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    model = learn_model(args.source)
+    pool_size = max(1, round(args.articles * model.distinct_authors_per_article))
+    pool = AuthorPool(model, pool_size, rng)
+
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    author_rows = write_articles(args.out_dir / "articles.csv", model, pool, args.articles, rng, args.first_id)
+    users, departments = write_user_fixtures(
+        args.out_dir, model, pool, args.users, rng,
+        deterministic_password_hash(args.password, rng), args.author_share
+    )
+
+    print(f"Статей: {args.articles}, строк авторов: {author_rows}, уникальных авторов в пуле: {len(pool.names)}")
+    print(f"Пользователей: {users}, подразделений: {departments}")
+    print(f"Файлы записаны в {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
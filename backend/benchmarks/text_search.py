@@ -0,0 +1,90 @@
+"""
+Бенчмарк поиска по подстроке в GET /articles (search_title, search_author).
+
+Создаёт отдельную схему elibrary_bench по Create_DB.sql, заполняет её
+синтетическими статьями на основе final_result.csv и замеряет время
+get_articles без триграммных индексов и с ними.
+
+Запуск (из каталога backend, нужна доступная PostgreSQL из .env):
+    python -m benchmarks.text_search --articles 100000
+"""
+
+import argparse
+import time
+
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.common import BENCH_SCHEMA, create_bench_engine, create_schema, seed, summarize
+
+# Поисковые запросы: длинные и короткие подстроки, частые и редкие
+TITLE_QUERIES = ["СХЕМОТЕХНИКА", "устройств", "МОДЕЛИРОВАНИЕ СИСТЕМ", "ая"]
+AUTHOR_QUERIES = ["Редкова", "Кузин П.", "ова", "Иванов С.Е."]
+
+TRGM_INDEXES = {
+    "idx_articles_title_trgm": "CREATE INDEX idx_articles_title_trgm ON articles USING gin (title gin_trgm_ops)",
+    "idx_authors_author_name_trgm": "CREATE INDEX idx_authors_author_name_trgm ON authors USING gin (author_name gin_trgm_ops)",
+}
+
+
+def set_trgm_indexes(engine, enabled: bool):
+    """Создаёт или удаляет триграммные индексы в схеме бенчмарка"""
+    with engine.begin() as conn:
+        for name, ddl in TRGM_INDEXES.items():
+            conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+            if enabled:
+                conn.exec_driver_sql(ddl)
+        conn.exec_driver_sql("ANALYZE")
+
+
+def measure(session_factory, repeats: int) -> dict:
+    """Замеряет время get_articles для каждого поискового запроса, мс"""
+    from api.articles import get_articles
+
+    cases = [("search_title", q) for q in TITLE_QUERIES] + [("search_author", q) for q in AUTHOR_QUERIES]
+    results = {}
+    for param, value in cases:
+        timings = []
+        for _ in range(repeats):
+            db = session_factory()
+            try:
+                started = time.perf_counter()
+                get_articles(per_page=50, db=db, **{param: value})
+                timings.append((time.perf_counter() - started) * 1000)
+            finally:
+                db.close()
+        summary = summarize(timings)
+        results[f"{param}={value}"] = {"p50_ms": summary["p50_ms"], "p95_ms": summary["p95_ms"]}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=100_000, help="Количество синтетических статей")
+    parser.add_argument("--repeats", type=int, default=20, help="Повторов на каждый запрос")
+    parser.add_argument("--seed", type=int, default=42, help="Seed генератора данных")
+    parser.add_argument("--skip-seed", action="store_true", help="Использовать уже заполненную схему")
+    args = parser.parse_args()
+
+    engine = create_bench_engine()
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    if not args.skip_seed:
+        print(f"Создание схемы {BENCH_SCHEMA} и генерация {args.articles} статей...")
+        create_schema(engine)
+        seed(engine, args.articles, args.seed)
+
+    print("Без триграммных индексов:")
+    set_trgm_indexes(engine, enabled=False)
+    before = measure(session_factory, args.repeats)
+
+    print("С триграммными индексами:")
+    set_trgm_indexes(engine, enabled=True)
+    after = measure(session_factory, args.repeats)
+
+    print(f"{'запрос':40} {'до, p50 мс':>12} {'после, p50 мс':>14}")
+    for case in before:
+        print(f"{case:40} {before[case]['p50_ms']:>12} {after[case]['p50_ms']:>14}")
+
+
+if __name__ == "__main__":
+    main()
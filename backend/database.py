@@ -7,8 +7,10 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from models import Base  # Импортируем Base из models
 from config.database import db_config
+from utils.request_metrics import install_sql_instrumentation
 
 # Создаём движок SQLAlchemy с использованием конфигурации
 engine = create_engine(
@@ -23,8 +25,31 @@ def set_search_path(dbapi_connection, connection_record):
     with dbapi_connection.cursor() as cursor:
         cursor.execute("SET search_path TO elibrary")  # <-- указываем схему
 
+# Время, число SQL-запросов и строк по каждому HTTP-запросу (utils/request_metrics.py)
+install_sql_instrumentation(engine)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Асинхронный движок (asyncpg) для асинхронных обработчиков.
+# Соединение не открывается до первого запроса, поэтому движок создаётся
+# всегда, а используется только при DB_ASYNC=true
+async_engine = create_async_engine(
+    db_config.async_url,
+    echo=db_config.echo,
+    pool_size=db_config.async_pool_size,
+    max_overflow=db_config.async_max_overflow,
+    connect_args={"server_settings": {"search_path": "elibrary"}}  # <-- указываем схему
+)
+
+install_sql_instrumentation(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False  # Объекты не перечитываются после commit (в async ленивая загрузка недоступна)
+)
+
 def get_db():
     """
     Генератор для получения сессии базы данных.
@@ -46,3 +71,15 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    """
+    Асинхронный генератор сессии базы данных.
+    
+    Использование через Depends в FastAPI:
+        @app.get("/items")
+        async def get_items(db: AsyncSession = Depends(get_async_db)):
+            ...
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,11 +1,25 @@
 from fastapi import FastAPI
+from utils.logging_config import configure_logging
+from utils.request_metrics import RequestMetricsMiddleware
 from api import auth as auth_api, articles, employees, departments
 from api.csv_import import router as csv_import_router
+from api.export import router as export_router
+from api.articles_async import router as articles_async_router
+from api.auth_async import router as auth_async_router
+from config.database import db_config
+from database import SessionLocal, async_engine
 from models import Base  # Только для импорта моделей
 from fastapi.middleware.cors import CORSMiddleware
+from utils.fuzzy_fio import author_surname_index
+from utils.import_jobs import resume_pending_import_jobs
+
+configure_logging()
 
 app = FastAPI(title="Elibrary API")
 
+# Время обработки и статистика SQL по каждому запросу: заголовок Server-Timing и лог "request"
+app.add_middleware(RequestMetricsMiddleware)
+
 # Добавляем CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -13,15 +27,39 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],  # Доступ к метрикам запроса из браузера
 )
 
+@app.on_event("startup")
+def resume_import_jobs():
+    # Возобновляем импорты, прерванные перезапуском API
+    resume_pending_import_jobs()
+
+@app.on_event("startup")
+def build_author_surname_index():
+    # Снимок фамилий авторов для нечёткого поиска строится до первых запросов,
+    # дальше его обновляет фоновый поток
+    with SessionLocal() as db:
+        author_surname_index.rebuild(db)
+    author_surname_index.start(SessionLocal)
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    await async_engine.dispose()
+
 @app.get("/")
 def root():
     return {"message": "Welcome to Elibrary API"}
 
 # Подключаем роутеры
+if db_config.use_async:
+    # Асинхронные обработчики горячих эндпоинтов подключаются первыми и
+    # перекрывают синхронные с теми же путями; остальные маршруты остаются синхронными
+    app.include_router(auth_async_router, prefix="/auth", tags=["auth"])
+    app.include_router(articles_async_router, prefix="/articles", tags=["articles"])
 app.include_router(auth_api.router, prefix="/auth", tags=["auth"])
 app.include_router(articles.router, prefix="/articles", tags=["articles"])
 app.include_router(employees.router, prefix="/employees", tags=["employees"])
 app.include_router(departments.router, prefix="/departments", tags=["departments"])
-app.include_router(csv_import_router, prefix="/import", tags=["import"])
\ No newline at end of file
+app.include_router(csv_import_router, prefix="/import", tags=["import"])
+app.include_router(export_router, prefix="/export", tags=["export"])
\ No newline at end of file
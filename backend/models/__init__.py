@@ -7,5 +7,7 @@ metadata = MetaData(schema="elibrary")
 Base = declarative_base(metadata=metadata)
 
 from .article import User, Article, Author, Department, UserDepartment, EmployeeArticle
+from .import_job import ImportJob
+from .suggestion import Suggestion
 
-__all__ = ["User", "Article", "Author", "Department", "UserDepartment", "EmployeeArticle"]
\ No newline at end of file
+__all__ = ["User", "Article", "Author", "Department", "UserDepartment", "EmployeeArticle", "ImportJob", "Suggestion"]
\ No newline at end of file
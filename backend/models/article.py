@@ -1,7 +1,15 @@
 from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Float, Date, DateTime, CheckConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.sql import func
 from . import Base
+from utils.fio_utils import build_author_match_key
+
+
+def _author_match_key(context):
+    """Вычисляет authors.match_key из author_name при вставке строки"""
+    author_name = context.get_current_parameters().get("author_name")
+    return build_author_match_key(author_name) if author_name else None
 
 class User(Base):
     __tablename__ = "users"
@@ -59,6 +67,11 @@ class Article(Base):
     title = Column(String, nullable=False)
     year_pub = Column(Integer, nullable=False)
     in_rinc = Column(Boolean, default=False)
+    content_hash = Column(String(40), nullable=True)  # хеш строки импорта, см. utils/csv_importer.py
+    # Полнотекстовый вектор (название + авторы), см. utils/article_search.py
+    search_vector = deferred(Column(TSVECTOR, nullable=True))
+    # Готовый JSON ArticleOut (read model), см. utils/article_documents.py
+    document = deferred(Column(JSONB, nullable=True))
 
     # Связь с авторами
     authors = relationship("Author", back_populates="article", cascade="all, delete-orphan")
@@ -72,6 +85,8 @@ class Author(Base):
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     article_id = Column(Integer, ForeignKey("articles.id"), nullable=False)
     author_name = Column(String, nullable=False)  # имя автора как оно указано в статье
+    # Ключ сопоставления "фамилия инициалы" для индексного поиска предложений
+    match_key = Column(String(255), default=_author_match_key)  # индекс idx_authors_match_key
     user_employee_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # ID сотрудника (если это внутренний автор)
     contribution = Column(Float)  # вклад автора в статью
     __table_args__ = (CheckConstraint('contribution >= 0.0 AND contribution <= 100.0', name='check_contribution_range'),)
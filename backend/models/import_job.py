@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON, Text
+from sqlalchemy.sql import func
+from . import Base
+
+
+class ImportJob(Base):
+    """Фоновая задача импорта CSV (состояние хранится в БД и переживает перезапуск API)"""
+    __tablename__ = "import_jobs"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, done, failed
+    mode = Column(String(20), nullable=False, default="insert")  # insert или upsert
+    filename = Column(String(255), nullable=True)  # имя загруженного файла
+    file_path = Column(String, nullable=False)  # путь к сохранённой копии файла
+    chunk_size = Column(Integer, nullable=False, default=2000)
+    created_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime, default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    # Прогресс и результат
+    processed = Column(Integer, nullable=False, default=0)
+    chunks_done = Column(Integer, nullable=False, default=0)  # обработано частей файла (для продолжения после перезапуска)
+    imported = Column(Integer, nullable=False, default=0)
+    updated = Column(Integer, nullable=False, default=0)
+    unchanged = Column(Integer, nullable=False, default=0)
+    skipped = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    errors = Column(JSON, nullable=False, default=list)  # ошибки по строкам (первые MAX_REPORTED_ERRORS)
+    elapsed_seconds = Column(Float, nullable=False, default=0.0)
+    rows_per_second = Column(Float, nullable=False, default=0.0)
+    peak_memory_mb = Column(Float, nullable=False, default=0.0)
+    message = Column(Text, nullable=True)  # описание фатальной ошибки
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey
+from . import Base
+
+
+class Suggestion(Base):
+    """
+    Сохранённое предложение: непривязанный автор статьи, который может быть
+    пользователем user_id (см. utils/suggestions.py). Ведётся инкрементально.
+    """
+    __tablename__ = "suggestions"
+
+    author_id = Column(Integer, ForeignKey("authors.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)  # индекс idx_suggestions_user_id
+    score = Column(Float, nullable=False)  # уверенность сопоставления, см. utils/bulk_matcher.py
@@ -31,4 +31,28 @@ class DepartmentUpdate(BaseModel):
     manager_id: Optional[int] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class DepartmentYearStats(BaseModel):
+    year_pub: Optional[int]
+    articles: int
+    rinc_articles: int
+    claimed_authors: int
+    unclaimed_authors: int
+    member_authors: int
+    total_contribution: float
+    award_applications: int
+
+class DepartmentStatsOut(BaseModel):
+    department_id: int
+    department_name: str
+    articles: int
+    rinc_articles: int
+    rinc_share: float  # доля статей в РИНЦ (0..1)
+    claimed_authors: int  # авторы статей подразделения, привязанные к пользователям
+    unclaimed_authors: int
+    member_authors: int  # авторы, привязанные к сотрудникам подразделения
+    total_contribution: float
+    award_applications: int
+    by_year: List[DepartmentYearStats] = []
+    source: str  # live - расчёт по таблицам, rollup - материализованное представление
\ No newline at end of file
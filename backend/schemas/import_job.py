@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+class ImportJobOut(BaseModel):
+    id: int
+    status: str  # queued, running, done, failed
+    mode: str  # insert или upsert
+    filename: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    processed: int
+    imported: int
+    updated: int
+    unchanged: int
+    skipped: int
+    error_count: int
+    errors: List[ImportRowError] = []
+    elapsed_seconds: float
+    rows_per_second: float
+    peak_memory_mb: float
+    message: Optional[str] = None
+
+    class Config:
+        from_attributes = True
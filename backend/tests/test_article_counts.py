@@ -0,0 +1,162 @@
+"""Оценка числа строк для count_mode=estimate (utils.article_counts)"""
+
+import re
+
+from sqlalchemy.dialects.postgresql import asyncpg, psycopg2
+from sqlalchemy.orm import Session
+
+from api.articles import article_filter_conditions
+from models.article import Article
+from tests.conftest import seed_catalog
+from utils.article_counts import estimate_query_rows, estimate_table_rows
+
+
+class _Result:
+    def __init__(self, rows: int):
+        self.rows = rows
+
+    def scalar(self):
+        return [{"Plan": {"Plan Rows": self.rows}}]
+
+
+class _TableResult:
+    def __init__(self, reltuples: float):
+        self.reltuples = reltuples
+
+    def scalar(self):
+        return self.reltuples
+
+
+class RecordingConnection:
+    """Соединение, которое запоминает EXPLAIN вместо выполнения"""
+
+    def __init__(self, dialect, execution_options=None):
+        self.dialect = dialect
+        self.execution_options = execution_options or {}
+        self.statements = []
+
+    def get_execution_options(self):
+        return self.execution_options
+
+    def exec_driver_sql(self, statement, params):
+        self.statements.append((statement, params))
+        return _Result(1234)
+
+    def execute(self, statement, params):
+        self.statements.append((statement.text, params))
+        return _TableResult(5678)
+
+
+class RecordingSession:
+    def __init__(self, connection: RecordingConnection):
+        self._connection = connection
+
+    def connection(self):
+        return self._connection
+
+
+def _filtered_query():
+    # search_author + author_distance=1: список IN по authors.match_key
+    conditions = article_filter_conditions(
+        None, None, "схемотехника", "Редкова", ["редкова на", "редкова н", "редкина на"]
+    )
+    return Session().query(Article).filter(*conditions)
+
+
+def test_estimate_expands_in_list_for_pyformat_dialect():
+    connection = RecordingConnection(psycopg2.dialect())
+
+    assert estimate_query_rows(RecordingSession(connection), _filtered_query()) == 1234
+
+    statement, params = connection.statements[0]
+    assert statement.startswith("EXPLAIN (FORMAT JSON) SELECT")
+    assert "POSTCOMPILE" not in statement
+    placeholders = re.findall(r"%\((\w+)\)s", statement)
+    assert set(placeholders) == set(params)
+    assert {"редкова на", "редкова н", "редкина на"} <= set(params.values())
+
+
+def test_estimate_passes_positional_params_for_asyncpg():
+    connection = RecordingConnection(asyncpg.dialect())
+
+    assert estimate_query_rows(RecordingSession(connection), _filtered_query()) == 1234
+
+    statement, params = connection.statements[0]
+    assert "POSTCOMPILE" not in statement
+    assert isinstance(params, tuple)
+    numbers = sorted(int(n) for n in re.findall(r"\$(\d+)", statement))
+    assert numbers == list(range(1, len(params) + 1))
+    # $n получает n-й элемент кортежа
+    assert params[0] == "%схемотехника%"
+    for match_key in ("редкова на", "редкова н", "редкина на"):
+        number = params.index(match_key) + 1
+        assert re.search(rf"\${number}::VARCHAR", statement)
+
+
+def test_estimate_applies_schema_translate_map():
+    connection = RecordingConnection(
+        psycopg2.dialect(), {"schema_translate_map": {"elibrary": "elibrary_bench"}}
+    )
+
+    estimate_query_rows(RecordingSession(connection), _filtered_query())
+
+    statement, _ = connection.statements[0]
+    assert "elibrary_bench.articles" in statement
+    assert "elibrary.articles" not in statement
+
+
+def test_table_estimate_applies_schema_translate_map():
+    connection = RecordingConnection(
+        psycopg2.dialect(), {"schema_translate_map": {"elibrary": "elibrary_bench"}}
+    )
+
+    assert estimate_table_rows(RecordingSession(connection), Article.__table__) == 5678
+
+    _, params = connection.statements[0]
+    assert params == {"schema": "elibrary_bench", "table_name": "articles"}
+
+
+def test_table_estimate_reads_analyzed_table(db, test_database):
+    seed_catalog(db, 5)
+    with test_database.begin() as connection:
+        connection.exec_driver_sql("ANALYZE elibrary.articles")
+
+    assert estimate_table_rows(db, Article.__table__) == 5
+
+
+def test_estimate_mode_with_fuzzy_author_filter(client, catalog):
+    # author_distance=1 превращает search_author в список IN по authors.match_key
+    response = client.get("/articles/", params={
+        "count_mode": "estimate", "search_author": "Редкова", "author_distance": 1,
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == len(catalog.article_ids)
+    assert body["total_is_exact"] is True  # меньше ESTIMATE_EXACT_THRESHOLD - точный COUNT(*)
+
+
+def test_async_estimate_mode_with_fuzzy_author_filter(async_client, catalog):
+    # То же через AsyncSession: estimate_query_rows вызывается в run_sync с диалектом asyncpg
+    response = async_client.get("/articles/", params={
+        "count_mode": "estimate", "search_author": "Редкова", "author_distance": 1,
+    })
+    assert response.status_code == 200
+    assert response.json()["total"] == len(catalog.article_ids)
+
+
+def test_async_estimate_mode_above_threshold(async_client, db, monkeypatch):
+    # Оценка планировщика возвращается как есть, если она не меньше порога
+    monkeypatch.setattr("api.articles_async.ESTIMATE_EXACT_THRESHOLD", 0)
+    seed_catalog(db, 5)
+    response = async_client.get("/articles/", params={
+        "count_mode": "estimate", "search_title": "моделирование", "search_author": "Редкова", "author_distance": 1,
+    })
+    assert response.status_code == 200
+    assert response.json()["total_is_exact"] is False
+
+
+def test_async_estimate_mode_without_filters(async_client, catalog):
+    # Без фильтров - estimate_table_rows через run_sync с параметрами asyncpg
+    response = async_client.get("/articles/", params={"count_mode": "estimate"})
+    assert response.status_code == 200
+    assert response.json()["total"] == len(catalog.article_ids)
@@ -0,0 +1,29 @@
+"""Импорт CSV частями: отчёт об ошибках откаченной части (utils/csv_importer.py)"""
+
+import io
+
+from models.article import Article
+from utils import csv_importer
+
+CSV_HEADER = "ID;Название;Авторы;Год публикации;В_РИНЦ\n"
+
+
+def test_failed_chunk_replaces_row_errors(db, monkeypatch):
+    # Первая часть: строка с ошибкой года и строка, которая не запишется из-за сбоя части
+    rows = "1;Статья 1;Редкова Н.А.;год;да\n2;Статья 2;Редкова Н.А.;2020;да\n3;Статья 3;Редкова Н.А.;2021;нет\n"
+    refresh = csv_importer.refresh_article_suggestions
+    calls = []
+
+    def fail_first_chunk(session, article_ids):
+        calls.append(article_ids)
+        if len(calls) == 1:
+            raise RuntimeError("deadlock detected")
+        refresh(session, article_ids)
+
+    monkeypatch.setattr(csv_importer, "refresh_article_suggestions", fail_first_chunk)
+    stats = csv_importer.import_articles_stream(db, io.BytesIO((CSV_HEADER + rows).encode("utf-8")), chunk_size=2)
+
+    assert (stats.processed, stats.imported, stats.skipped) == (3, 1, 2)
+    assert stats.error_count == 1
+    assert stats.errors == [{"row": 0, "error": "Rows 0-1 failed: deadlock detected"}]
+    assert [title for (title,) in db.query(Article.title)] == ["Статья 3"]
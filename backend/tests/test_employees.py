@@ -0,0 +1,26 @@
+"""Изменение сотрудника: read model статей и предложения (api/employees.py)"""
+
+from models.article import EmployeeArticle
+from models.suggestion import Suggestion
+from tests.conftest import auth_headers
+
+
+def test_rename_employee_refreshes_documents_and_suggestions(client, db, catalog):
+    user_id = catalog.user.id
+    article_id = catalog.article_ids[0]
+    db.add(EmployeeArticle(employee_id=user_id, article_id=article_id))
+    db.commit()
+    assert db.query(Suggestion).filter(Suggestion.user_id == user_id).count() > 0
+
+    response = client.put(
+        f"/employees/{user_id}",
+        json={"full_name": "Иванова Наталья Александровна", "email": None},
+        headers=auth_headers(catalog.admin),
+    )
+
+    assert response.status_code == 200
+    assert response.json()["full_name"] == "Иванова Наталья Александровна"
+    document = client.get(f"/articles/{article_id}").json()
+    assert [e["full_name"] for e in document["employees"]] == ["Иванова Наталья Александровна"]
+    # Авторов "Иванова Н.А." в каталоге нет - предложения пересчитаны и пусты
+    assert db.query(Suggestion).filter(Suggestion.user_id == user_id).count() == 0
@@ -0,0 +1,51 @@
+"""
+Сопоставление авторов с пользователями (utils.fio_utils, utils.bulk_matcher)
+на эталонном корпусе benchmarks/fio_golden.csv и граничных случаях.
+"""
+
+import pandas as pd
+import pytest
+
+from benchmarks.fio_golden import EDGE_CASES, check, load_corpus
+from utils.bulk_matcher import encode_authors, encode_users, match_encoded
+from utils.fio_utils import build_author_match_key, build_user_match_keys, extract_fio_parts, match_author_with_user
+
+
+@pytest.mark.parametrize("author_name, user_full_name, expected", EDGE_CASES)
+def test_edge_cases(author_name, user_full_name, expected):
+    assert match_author_with_user(author_name, user_full_name) is expected
+
+
+def test_golden_corpus():
+    mismatches = check(load_corpus())
+    assert mismatches == [], mismatches[:20]
+
+
+def test_bulk_matcher_agrees_with_golden_corpus():
+    corpus = EDGE_CASES + load_corpus()
+    authors = pd.DataFrame({
+        "id": range(len(corpus)),
+        "article_id": 0,
+        "author_name": [author_name for author_name, _, _ in corpus],
+        "match_key": None,
+    })
+    users = pd.DataFrame({"id": range(len(corpus)), "full_name": [full_name for _, full_name, _ in corpus]})
+
+    result = match_encoded(encode_authors(authors), encode_users(users))
+
+    matched = set(zip(result.author_ids.tolist(), result.user_ids.tolist()))
+    mismatches = [pair for i, pair in enumerate(corpus) if ((i, i) in matched) != pair[2]]
+    assert mismatches == [], mismatches[:20]
+
+
+@pytest.mark.parametrize("author_name", ["Иванов А.С.", "Иванов А. С.", "Иванов А.С"])
+def test_compact_initials_split_into_first_name_and_patronymic(author_name):
+    assert extract_fio_parts(author_name) == {"last_name": "Иванов", "first_name": "А.", "patronymic": "С."}
+    assert build_author_match_key(author_name) == "иванов ас"
+
+
+def test_author_match_keys_are_user_match_keys():
+    keys = build_user_match_keys("Иванов Александр Сергеевич")
+    assert build_author_match_key("Иванов А.С.") in keys
+    assert build_author_match_key("Иванов А.") in keys
+    assert build_author_match_key("Иванов А.Б.") not in keys
@@ -0,0 +1,72 @@
+"""Снимок фамилий авторов (utils.fuzzy_fio.AuthorSurnameIndex) без БД"""
+
+import threading
+
+from utils.fuzzy_fio import AuthorSurnameIndex
+
+
+class KeysResult:
+    def __init__(self, keys):
+        self._keys = keys
+
+    def scalars(self):
+        return iter(self._keys)
+
+
+class KeysConnection:
+    """Отдаёт текущий список authors.match_key и считает чтения"""
+
+    def __init__(self, keys):
+        self.keys = list(keys)
+        self.reads = 0
+        self.read_done = threading.Event()
+
+    def execute(self, statement):
+        self.reads += 1
+        self.read_done.set()
+        return KeysResult(list(self.keys))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def test_lookup_uses_snapshot_without_db():
+    index = AuthorSurnameIndex(max_distance=1)
+    connection = KeysConnection(["редкова на", "петров ао"])
+    index.rebuild(connection)
+
+    connection.keys.append("редькова на")
+    assert index.similar_match_keys("Редкова") == {"редкова на": 0}
+    assert index.similar_match_keys("Редкова") == {"редкова на": 0}
+    assert connection.reads == 1
+
+
+def test_rebuild_swaps_snapshot():
+    index = AuthorSurnameIndex(max_distance=1)
+    index.rebuild(KeysConnection(["редкова на"]))
+    old_snapshot = index._index
+
+    index.rebuild(KeysConnection(["петров ао"]))
+
+    assert index.similar_match_keys("Редкова") == {}
+    assert index.similar_match_keys("Петрова") == {"петров ао": 1}
+    # Прежний снимок не изменился: запрос, который его уже читает, видит целый индекс
+    assert "redkova" in old_snapshot._values
+
+
+def test_schedule_rebuild_runs_in_background():
+    index = AuthorSurnameIndex(max_distance=1, ttl_seconds=3600)
+    connection = KeysConnection(["редкова на"])
+    index.start(lambda: connection)
+
+    index.schedule_rebuild()
+
+    assert connection.read_done.wait(5)
+    for _ in range(100):
+        if index.similar_match_keys("Редкова"):
+            break
+        threading.Event().wait(0.01)
+    assert index.similar_match_keys("Редкова") == {"редкова на": 0}
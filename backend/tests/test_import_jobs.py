@@ -0,0 +1,60 @@
+"""Фоновый импорт CSV: продолжение задачи после перезапуска API (utils/import_jobs.py)"""
+
+import pytest
+
+from models.article import Article
+from models.import_job import ImportJob
+from utils import csv_importer, import_jobs
+
+CSV_HEADER = "ID;Название;Авторы;Год публикации;В_РИНЦ\n"
+
+
+class ProcessKilled(BaseException):
+    """Остановка процесса посреди импорта: except Exception её не перехватывает"""
+
+
+class InlineExecutor:
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    # Статьи без ID: в режиме insert дубликаты по external_id не отсекаются
+    rows = [f";Статья {i};Редкова Н.А.;2020;да\n" for i in range(6)]
+    path = tmp_path / "articles.csv"
+    path.write_text(CSV_HEADER + "".join(rows), encoding="utf-8")
+    return path
+
+
+def test_resume_skips_committed_chunks(db, csv_file, monkeypatch):
+    monkeypatch.setattr(import_jobs, "_executor", InlineExecutor())
+    job = ImportJob(status="queued", mode="insert", file_path=str(csv_file), chunk_size=2)
+    db.add(job)
+    db.commit()
+
+    # Процесс "падает" на третьей части, после коммита первых двух
+    refresh = csv_importer.refresh_article_suggestions
+    calls = []
+
+    def crash_on_third_chunk(session, article_ids):
+        calls.append(article_ids)
+        if len(calls) == 3:
+            raise ProcessKilled()
+        refresh(session, article_ids)
+
+    monkeypatch.setattr(csv_importer, "refresh_article_suggestions", crash_on_third_chunk)
+    with pytest.raises(ProcessKilled):
+        import_jobs.run_import_job(job.id)
+
+    db.refresh(job)
+    assert (job.status, job.chunks_done, job.processed, job.imported) == ("running", 2, 4, 4)
+    assert db.query(Article).count() == 4
+
+    # Перезапуск API
+    monkeypatch.setattr(csv_importer, "refresh_article_suggestions", refresh)
+    assert import_jobs.resume_pending_import_jobs() == 1
+
+    db.refresh(job)
+    assert (job.status, job.chunks_done, job.processed, job.imported) == ("done", 3, 6, 6)
+    assert sorted(title for (title,) in db.query(Article.title)) == [f"Статья {i}" for i in range(6)]
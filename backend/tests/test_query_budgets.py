@@ -0,0 +1,135 @@
+"""
+Бюджеты SQL-запросов маршрутов (query_budget) на настоящих роутерах.
+
+Каждый тест выполняется на двух размерах каталога (фикстура catalog: 5 и 50),
+BudgetClient проваливает тест, если маршрут выполнил больше запросов, чем
+объявил. Кэши процесса перед тестом пусты, поэтому считается худший случай
+(проверка пользователя и область менеджера - запросами к БД).
+"""
+
+import pytest
+
+from tests.conftest import BudgetClient, auth_headers
+
+
+def test_list_articles(budget_client, catalog):
+    size = len(catalog.article_ids)
+    response = budget_client.get("/articles/", params={"per_page": size})
+    assert response.status_code == 200
+    assert len(response.json()["articles"]) == size
+
+
+def test_search_articles(budget_client, catalog):
+    size = len(catalog.article_ids)
+    response = budget_client.get("/articles/search", params={"q": "моделирование", "per_page": size})
+    assert response.status_code == 200
+    assert len(response.json()["articles"]) == size
+
+
+def test_get_article(budget_client, catalog):
+    response = budget_client.get(f"/articles/{catalog.article_ids[0]}")
+    assert response.status_code == 200
+    assert response.json()["id"] == catalog.article_ids[0]
+
+
+def test_bulk_update_authors(budget_client, catalog):
+    updates = [
+        {"id": author_id, "contribution": 0.25, "applied_for_award": True, "award_applied_date": "2024-05-01"}
+        for author_id in catalog.author_ids
+    ]
+    response = budget_client.put(
+        "/articles/authors/bulk-update", json=updates, headers=auth_headers(catalog.admin)
+    )
+    assert response.status_code == 200
+
+
+def test_my_suggestions(budget_client, catalog):
+    response = budget_client.get("/articles/my/suggestions", headers=auth_headers(catalog.user))
+    assert response.status_code == 200
+    assert len(response.json()) == len(catalog.article_ids) // 2
+
+
+def test_my_articles(budget_client, catalog):
+    response = budget_client.get("/articles/my/articles", headers=auth_headers(catalog.user))
+    assert response.status_code == 200
+    assert len(response.json()) == (len(catalog.article_ids) + 1) // 2
+
+
+def test_management_users(budget_client, catalog):
+    response = budget_client.get("/articles/management/users", headers=auth_headers(catalog.manager))
+    assert response.status_code == 200
+    assert len(response.json()) == len(catalog.employees) + 2
+
+
+def test_management_user_suggestions(budget_client, catalog):
+    response = budget_client.get(
+        f"/articles/management/users/{catalog.user.id}/suggestions", headers=auth_headers(catalog.manager)
+    )
+    assert response.status_code == 200
+    assert len(response.json()) == len(catalog.article_ids) // 2
+
+
+def test_management_user_articles(budget_client, catalog):
+    response = budget_client.get(
+        f"/articles/management/users/{catalog.user.id}/articles", headers=auth_headers(catalog.manager)
+    )
+    assert response.status_code == 200
+    assert len(response.json()) == (len(catalog.article_ids) + 1) // 2
+
+
+def test_bulk_match(budget_client, catalog):
+    response = budget_client.get("/articles/management/bulk-match", headers=auth_headers(catalog.admin))
+    assert response.status_code == 200
+    assert response.json()["authors"] == len(catalog.author_ids) - (len(catalog.article_ids) + 1) // 2
+
+
+def test_list_departments(budget_client, catalog):
+    size = len(catalog.department_ids)
+    response = budget_client.get("/departments/", params={"limit": size})
+    assert response.status_code == 200
+    assert len(response.json()) == size
+
+
+def test_departments_stats(budget_client, catalog):
+    response = budget_client.get("/departments/stats", headers=auth_headers(catalog.manager))
+    assert response.status_code == 200
+    assert len(response.json()) == len(catalog.department_ids)
+
+
+def test_department_stats(budget_client, catalog):
+    response = budget_client.get(
+        f"/departments/{catalog.department_ids[0]}/stats", headers=auth_headers(catalog.manager)
+    )
+    assert response.status_code == 200
+
+
+def test_get_department(budget_client, catalog):
+    response = budget_client.get(f"/departments/{catalog.department_ids[0]}")
+    assert response.status_code == 200
+    assert len(response.json()["users"]) == len(catalog.employees) + 2
+
+
+def test_department_employees(budget_client, catalog):
+    response = budget_client.get(
+        f"/departments/{catalog.department_ids[0]}/employees", headers=auth_headers(catalog.manager)
+    )
+    assert response.status_code == 200
+    assert len(response.json()) == len(catalog.employees) + 2
+
+
+@pytest.fixture
+def async_budget_client(async_client):
+    return BudgetClient(async_client)
+
+
+def test_async_list_articles(async_budget_client, catalog):
+    size = len(catalog.article_ids)
+    response = async_budget_client.get("/articles/", params={"per_page": size})
+    assert response.status_code == 200
+    assert len(response.json()["articles"]) == size
+
+
+def test_async_get_article(async_budget_client, catalog):
+    response = async_budget_client.get(f"/articles/{catalog.article_ids[0]}")
+    assert response.status_code == 200
+    assert response.json()["id"] == catalog.article_ids[0]
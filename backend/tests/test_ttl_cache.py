@@ -0,0 +1,53 @@
+"""Кэши внутри процесса (utils.ttl_cache и построенные на нём)"""
+
+from utils.manager_scope import ManagerScopeCache
+from utils.ttl_cache import TTLCache
+
+
+def test_expired_entry_is_dropped(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("utils.ttl_cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(max_entries=10, ttl_seconds=5)
+
+    cache.set("a", 1)
+    now[0] += 4
+    assert cache.get("a") == 1
+    now[0] += 2
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_read_entry_is_evicted():
+    cache = TTLCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_invalidate_where_drops_matching_entries():
+    cache = TTLCache()
+    for key in range(6):
+        cache.set(key, key * 10)
+
+    assert cache.invalidate_where(lambda key, value: value >= 30) == 3
+    assert [cache.get(key) for key in range(6)] == [0, 10, 20, None, None, None]
+
+
+def test_manager_scope_invalidation():
+    cache = ManagerScopeCache()
+    cache.set(1, frozenset({10}), frozenset({1, 2, 3}))
+    cache.set(4, frozenset({20}), frozenset({4, 5}))
+    cache.set(6, frozenset({10, 30}), frozenset({6, 1}))
+
+    cache.invalidate_department(30)
+    assert cache.get(6) is None
+    assert cache.get(1) == (frozenset({10}), frozenset({1, 2, 3}))
+
+    cache.invalidate_member(5)
+    assert cache.get(4) is None
+    assert cache.get(1) is not None
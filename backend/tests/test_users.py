@@ -0,0 +1,95 @@
+"""Создание и изменение пользователей: bcrypt вне пула потоков FastAPI (api/auth.py, api/employees.py)"""
+
+import inspect
+
+import pytest
+
+from api import auth, employees
+from models.article import Department, User
+from tests.conftest import auth_headers
+from utils.passwords import pwd_context
+
+
+@pytest.mark.parametrize("endpoint", [
+    auth.register, auth.create_manager, auth.create_user, auth.update_user,
+    employees.create_employee, employees.create_employee_with_details,
+])
+def test_password_hashing_handlers_are_async(endpoint):
+    # Синхронный обработчик занимал бы поток пула FastAPI на всё время bcrypt
+    assert inspect.iscoroutinefunction(endpoint)
+
+
+def _user_payload(login: str, **fields) -> dict:
+    return {"login": login, "password": "secret", "full_name": "Редкова Наталья Александровна", **fields}
+
+
+def test_register(client, db):
+    response = client.post("/auth/register", json=_user_payload("redkova"))
+
+    assert response.status_code == 200
+    assert response.json()["role"] == "user"
+    assert response.json()["id_elibrary_user"] == "Редкова Наталья Александровна"
+    user = db.query(User).filter(User.login == "redkova").one()
+    assert pwd_context.verify("secret", user.password_hash)
+
+
+def test_register_duplicate_login(client, db):
+    assert client.post("/auth/register", json=_user_payload("redkova")).status_code == 200
+
+    response = client.post("/auth/register", json=_user_payload("redkova"))
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "User with this login already exists"
+
+
+def test_create_manager_for_department(client, catalog):
+    department_id = catalog.department_ids[1]
+
+    response = client.post(
+        "/auth/create-manager",
+        json=_user_payload("manager2", full_name="Смирнова Ольга Петровна", department_id=department_id),
+        headers=auth_headers(catalog.admin),
+    )
+
+    assert response.status_code == 200
+    assert response.json()["role"] == "manager"
+    department = client.get(f"/departments/{department_id}").json()
+    assert department["manager_id"] == response.json()["id"]
+
+
+def test_create_user_joins_manager_department(client, db, catalog):
+    response = client.post(
+        "/auth/create-user", json=_user_payload("new_user"), headers=auth_headers(catalog.manager)
+    )
+
+    assert response.status_code == 200
+    users = client.get(f"/departments/{catalog.department_ids[0]}").json()["users"]
+    assert response.json()["id"] in [user["id"] for user in users]
+
+
+def test_update_user_password(client, db, catalog):
+    response = client.put(
+        f"/auth/users/{catalog.user.id}",
+        json=_user_payload("redkova", password="new-secret"),
+        headers=auth_headers(catalog.admin),
+    )
+
+    assert response.status_code == 200
+    db.expire_all()
+    assert pwd_context.verify("new-secret", db.get(User, catalog.user.id).password_hash)
+
+
+def test_create_employee(client, db, catalog):
+    response = client.post(
+        "/employees/",
+        json={
+            "login": "employee_new", "password": "secret", "email": None,
+            "full_name": "Орлов Игорь Олегович", "department_ids": [catalog.department_ids[0]],
+        },
+        headers=auth_headers(catalog.admin),
+    )
+
+    assert response.status_code == 200
+    assert response.json()["full_name"] == "Орлов Игорь Олегович"
+    employee = db.query(User).filter(User.login == "employee_new").one()
+    assert pwd_context.verify("secret", employee.password_hash)
@@ -0,0 +1,66 @@
+from typing import Optional
+
+from sqlalchemy import Table, text
+from sqlalchemy.orm import Query, Session
+
+from utils.ttl_cache import TTLCache
+
+# Ниже этого порога оценка планировщика заменяется точным COUNT(*):
+# на малых выборках он дешёвый, а оценка может сильно ошибаться
+ESTIMATE_EXACT_THRESHOLD = 1000
+
+
+class ArticleCountCache(TTLCache):
+    """
+    Кэш точных COUNT(*) для списка статей, ключ - набор фильтров запроса.
+
+    Сбрасывается целиком при любой записи статей (создание, изменение,
+    удаление, импорт).
+    """
+
+
+article_count_cache = ArticleCountCache(max_entries=1024, ttl_seconds=300.0)
+
+
+def estimate_table_rows(db: Session, table: Table) -> Optional[int]:
+    """
+    Оценка числа строк таблицы по статистике pg_class.reltuples.
+    Схема таблицы подменяется по schema_translate_map соединения, как в estimate_query_rows.
+    Возвращает None, если таблица ещё ни разу не анализировалась.
+    """
+    connection = db.connection()
+    schema_translate_map = connection.get_execution_options().get("schema_translate_map") or {}
+    reltuples = connection.execute(
+        text(
+            "SELECT c.reltuples FROM pg_class AS c "
+            "JOIN pg_namespace AS n ON n.oid = c.relnamespace "
+            "WHERE n.nspname = coalesce(:schema, current_schema()) AND c.relname = :table_name"
+        ),
+        {"schema": schema_translate_map.get(table.schema, table.schema), "table_name": table.name}
+    ).scalar()
+    if reltuples is None or reltuples < 0:
+        return None
+    return int(reltuples)
+
+
+def estimate_query_rows(db: Session, query: Query) -> int:
+    """
+    Оценка числа строк, которые вернёт запрос, по плану EXPLAIN (без выполнения).
+
+    Запрос компилируется под диалект соединения (psycopg2 или asyncpg) с раскрытыми списками IN
+    (render_postcompile) и подменой схемы (schema_translate_map, как в бенчмарках).
+    """
+    connection = db.connection()
+    schema_translate_map = connection.get_execution_options().get("schema_translate_map")
+    compiled = query.statement.compile(
+        dialect=connection.dialect,
+        schema_translate_map=schema_translate_map,
+        render_schema_translate=schema_translate_map is not None,
+        compile_kwargs={"render_postcompile": True},
+    )
+    params = compiled.params
+    if compiled.positional:
+        # asyncpg (run_sync в api/articles_async.py) ждёт $1, $2... - кортеж в порядке positiontup
+        params = tuple(params[name] for name in compiled.positiontup)
+    plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
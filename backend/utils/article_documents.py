@@ -0,0 +1,115 @@
+"""
+Read model статей: готовый JSON ArticleOut в колонке articles.document (JSONB).
+
+Документ строится в PostgreSQL одним UPDATE (refresh_article_documents) при
+каждой записи, которая меняет ArticleOut: создание и изменение статьи,
+привязка/отвязка авторов, массовое изменение вкладов, импорт CSV, связи
+статей с сотрудниками и изменение ФИО пользователя. Списки и карточка статьи
+читают document::text и склеивают ответ из готовых строк, без загрузки
+Article/Author/User и без валидации Pydantic.
+
+Если документ ещё не построен (NULL), статья сериализуется через ORM
+и ArticleOut, поэтому чтение всегда возвращает актуальный формат.
+"""
+
+import json
+from typing import Iterable, List, Sequence
+
+from fastapi import Response
+from sqlalchemy import Text, cast, text
+from sqlalchemy.orm import Session, selectinload
+
+from models.article import Article, EmployeeArticle
+from schemas.article import ArticleOut
+
+# Поля и порядок совпадают с ArticleOut/AuthorOut/EmployeeOut. В users нет колонки fio,
+# поэтому EmployeeOut.fio заполняется полным ФИО
+_REFRESH_DOCUMENT_SQL = text("""
+    UPDATE articles AS a
+    SET document = jsonb_build_object(
+        'id', a.id,
+        'external_id', a.external_id,
+        'title', a.title,
+        'year_pub', a.year_pub,
+        'in_rinc', coalesce(a.in_rinc, false),
+        'authors', coalesce((
+            SELECT jsonb_agg(jsonb_build_object(
+                'id', au.id,
+                'article_id', au.article_id,
+                'author_name', au.author_name,
+                'user_employee_id', au.user_employee_id,
+                'contribution', coalesce(au.contribution, 0),
+                'applied_for_award', au.applied_for_award,
+                'award_applied_date', to_char(au.award_applied_date, 'YYYY-MM-DD')
+            ) ORDER BY au.id)
+            FROM authors AS au
+            WHERE au.article_id = a.id
+        ), '[]'::jsonb),
+        'employees', coalesce((
+            SELECT jsonb_agg(jsonb_build_object(
+                'id', u.id,
+                'fio', u.full_name,
+                'full_name', u.full_name
+            ) ORDER BY u.id)
+            FROM employee_articles AS ea
+            JOIN users AS u ON u.id = ea.employee_id
+            WHERE ea.article_id = a.id
+        ), '[]'::jsonb)
+    )
+    WHERE a.id = ANY(:article_ids)
+""")
+
+# Колонка для выборки документа без разбора JSON драйвером
+DOCUMENT_TEXT = cast(Article.document, Text).label("document")
+
+
+def refresh_article_documents(db: Session, article_ids: Iterable[int]) -> None:
+    """
+    Пересчитывает документы указанных статей. Изменения должны быть уже
+    записаны в БД (db.flush()), коммит выполняет вызывающий код.
+    """
+    article_ids = list(set(article_ids))
+    if not article_ids:
+        return
+    db.execute(_REFRESH_DOCUMENT_SQL, {"article_ids": article_ids})
+
+
+def employee_article_ids(db: Session, user_id: int) -> List[int]:
+    """Статьи, в документах которых пользователь указан среди сотрудников"""
+    return [
+        row.article_id
+        for row in db.query(EmployeeArticle.article_id).filter(EmployeeArticle.employee_id == user_id)
+    ]
+
+
+def article_documents(db: Session, rows: Sequence) -> List[str]:
+    """
+    JSON-строки ArticleOut для строк выборки с колонками id и document
+    (порядок сохраняется). Статьи без документа дозагружаются одним запросом через ORM.
+    """
+    missing = [row.id for row in rows if row.document is None]
+    fallback = {}
+    if missing:
+        articles = db.query(Article).options(
+            selectinload(Article.authors),
+            selectinload(Article.employees)
+        ).filter(Article.id.in_(missing)).all()
+        fallback = {article.id: ArticleOut.model_validate(article).model_dump_json() for article in articles}
+    return [row.document if row.document is not None else fallback[row.id] for row in rows]
+
+
+def articles_response(documents: List[str], **fields) -> Response:
+    """Ответ {"articles": [...], **fields} из готовых JSON-строк статей"""
+    tail = json.dumps(fields, ensure_ascii=False, separators=(",", ":"))
+    body = '{"articles":[' + ",".join(documents) + "]"
+    body += "," + tail[1:] if fields else "}"
+    return Response(content=body, media_type="application/json")
+
+
+def document_list_response(documents: List[str]) -> Response:
+    """Ответ-список [...] из готовых JSON-строк статей"""
+    return Response(content="[" + ",".join(documents) + "]", media_type="application/json")
+
+
+def document_response(document: str) -> Response:
+    return Response(content=document, media_type="application/json")
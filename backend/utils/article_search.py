@@ -0,0 +1,33 @@
+from typing import Iterable
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Конфигурация полнотекстового поиска PostgreSQL
+FTS_CONFIG = "russian"
+
+# Пересчёт articles.search_vector: название (вес A) + имена всех авторов (вес B)
+_REFRESH_SEARCH_VECTOR_SQL = text(f"""
+    UPDATE articles AS a
+    SET search_vector =
+        setweight(to_tsvector('{FTS_CONFIG}', a.title), 'A') ||
+        setweight(to_tsvector('{FTS_CONFIG}', coalesce(
+            (SELECT string_agg(au.author_name, ' ') FROM authors AS au WHERE au.article_id = a.id),
+            ''
+        )), 'B')
+    WHERE a.id = ANY(:article_ids)
+""")
+
+
+def refresh_article_search_vectors(db: Session, article_ids: Iterable[int]) -> None:
+    """
+    Пересчитывает поисковый вектор для указанных статей.
+
+    Вызывается после изменения названия статьи или списка её авторов
+    (create_article, update_article, импорт CSV). Авторы должны быть
+    уже записаны в БД (db.flush()), коммит выполняет вызывающий код.
+    """
+    article_ids = list(article_ids)
+    if not article_ids:
+        return
+    db.execute(_REFRESH_SEARCH_VECTOR_SQL, {"article_ids": article_ids})
@@ -0,0 +1,318 @@
+"""
+Пакетное сопоставление авторов статей со всеми пользователями сразу.
+
+Правила те же, что у match_author_with_user: фамилии совпадают, первый
+инициал автора (если есть) совпадает с первой буквой имени пользователя,
+второй инициал (если есть) - с первой буквой отчества. Фамилии сравниваются
+по ключу utils.fuzzy_fio.surname_key (без учёта е/ё, латиница из elibrary
+приводится к транслитерации ГОСТ), инициалы латинских имён - по первой
+букве транслитерации. Вместо вызова функции для каждой пары
+"пользователь x автор" имена кодируются в массивы NumPy:
+    - ключ фамилии -> целочисленный код (общий словарь авторов и пользователей);
+    - инициалы -> коды символов Unicode (0 - инициала нет);
+    - нормализованное полное имя -> код (для точных совпадений).
+Пары-кандидаты строятся за один проход: пользователи сортируются по коду
+фамилии, для каждого автора np.searchsorted находит диапазон однофамильцев,
+диапазоны разворачиваются в пары, и условия по инициалам проверяются над
+массивами целиком.
+
+При max_distance > 0 к ним добавляются пары с фамилиями на расстоянии
+редактирования до max_distance (опечатки, часть двойной фамилии): по
+уникальным ключам через utils.fuzzy_fio.FuzzyKeyIndex, затем разворачиваются
+соединением по кодам фамилий.
+
+Уверенность (confidence):
+    1.0 - нормализованное имя автора совпадает с ФИО пользователя;
+    0.9 - совпали фамилия и оба инициала;
+    0.7 - совпали фамилия и первый инициал (второго у автора нет);
+    0.4 - у автора указана только фамилия;
+    за каждую правку в фамилии - минус 0.15 (точное совпадение имени - только без правок).
+
+Доступно администратору через GET /articles/management/bulk-match и из
+командной строки (из каталога backend):
+    python -m utils.bulk_matcher --min-confidence 0.7 --max-distance 1 --output pairs.csv
+"""
+
+import argparse
+import csv
+import sys
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from models.article import Author, User
+from utils.fio_utils import build_author_match_key
+from utils.fuzzy_fio import fuzzy_key_pairs, initial_key, surname_key
+
+CONFIDENCE_EXACT = 1.0
+CONFIDENCE_FULL_INITIALS = 0.9
+CONFIDENCE_FIRST_INITIAL = 0.7
+CONFIDENCE_SURNAME_ONLY = 0.4
+CONFIDENCE_FUZZY_PENALTY = 0.15  # за одну правку в фамилии
+
+_CYRILLIC = "[а-яёА-ЯЁ]"
+
+
+@dataclass
+class MatchResult:
+    """Пары-кандидаты (массивы одинаковой длины) и размеры входных данных"""
+    author_ids: np.ndarray
+    article_ids: np.ndarray
+    user_ids: np.ndarray
+    confidence: np.ndarray
+    authors_count: int
+    users_count: int
+
+    def __len__(self) -> int:
+        return len(self.author_ids)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "author_id": self.author_ids,
+            "article_id": self.article_ids,
+            "user_id": self.user_ids,
+            "confidence": self.confidence,
+        })
+
+
+def _normalize(names: pd.Series) -> pd.Series:
+    """Векторный аналог normalize_fio: нижний регистр, одиночные пробелы"""
+    return names.fillna("").str.lower().str.split().str.join(" ")
+
+
+def _char_codes(values: pd.Series) -> np.ndarray:
+    """Первый символ каждой строки как код Unicode (uint32), 0 - пустая строка"""
+    return values.fillna("").str[:1].to_numpy(dtype="U1").view(np.uint32)
+
+
+def _latin_char_codes(values: pd.Series) -> np.ndarray:
+    """Коды первой буквы транслитерации ("ж" -> "z", "Yu" -> "i") для сравнения разных алфавитов"""
+    first = values.fillna("").str[:1]
+    return _char_codes(first.map({char: initial_key(char) for char in first.unique()}))
+
+
+def _surname_keys(surnames: pd.Series) -> np.ndarray:
+    """surname_key для каждой фамилии (вычисляется один раз на уникальное значение)"""
+    codes, uniques = pd.factorize(surnames.fillna(""))
+    return np.array([surname_key(surname) for surname in uniques], dtype=object)[codes]
+
+
+def encode_authors(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    frame: колонки id, article_id, author_name, match_key.
+    Фамилия и инициалы берутся из authors.match_key ("иванов ас"); если ключ
+    не заполнен, он вычисляется так же, как при вставке автора.
+    """
+    keys = frame["match_key"].copy()
+    missing = keys.isna()
+    if missing.any():
+        keys[missing] = frame.loc[missing, "author_name"].map(build_author_match_key)
+    split = keys.str.partition(" ")
+    initials = split[2]
+    return pd.DataFrame({
+        "id": frame["id"].to_numpy(),
+        "article_id": frame["article_id"].to_numpy(),
+        "surname": _surname_keys(split[0]),
+        "first": _char_codes(initials),
+        "second": _char_codes(initials.str[1:]),
+        "first_latin": _latin_char_codes(initials),
+        "second_latin": _latin_char_codes(initials.str[1:]),
+        "cyrillic": frame["author_name"].fillna("").str.contains(_CYRILLIC).to_numpy(dtype=bool),
+        "full": _normalize(frame["author_name"]).to_numpy(),
+    })
+
+
+def encode_users(frame: pd.DataFrame) -> pd.DataFrame:
+    """frame: колонки id, full_name"""
+    normalized = _normalize(frame["full_name"])
+    parts = normalized.str.split(" ")
+    return pd.DataFrame({
+        "id": frame["id"].to_numpy(),
+        "surname": _surname_keys(parts.str[0]),
+        "first": _char_codes(parts.str[1]),
+        "second": _char_codes(parts.str[2]),
+        "first_latin": _latin_char_codes(parts.str[1]),
+        "second_latin": _latin_char_codes(parts.str[2]),
+        "cyrillic": normalized.str.contains(_CYRILLIC).to_numpy(dtype=bool),
+        "full": normalized.to_numpy(),
+    })
+
+
+def _fuzzy_pairs(
+    a_surname: np.ndarray,
+    u_surname: np.ndarray,
+    valid_users: np.ndarray,
+    surname_keys: np.ndarray,
+    max_distance: int
+) -> tuple:
+    """Пары (индекс автора, индекс пользователя, расстояние) с несовпадающими, но близкими фамилиями"""
+    author_codes = np.unique(a_surname)
+    user_codes = np.unique(u_surname[valid_users])
+    code_of = {key: code for code, key in enumerate(surname_keys)}
+    aliases = pd.DataFrame(
+        [
+            (code_of[author_key], code_of[user_key], distance)
+            for author_key, user_key, distance in fuzzy_key_pairs(
+                surname_keys[author_codes], surname_keys[user_codes], max_distance
+            )
+        ],
+        columns=["a_code", "u_code", "distance"]
+    )
+    pairs = (
+        pd.DataFrame({"a_idx": np.arange(len(a_surname)), "a_code": a_surname})
+        .merge(aliases, on="a_code")
+        .merge(pd.DataFrame({"u_idx": valid_users, "u_code": u_surname[valid_users]}), on="u_code")
+    )
+    return (
+        pairs["a_idx"].to_numpy(dtype=np.int64),
+        pairs["u_idx"].to_numpy(dtype=np.int64),
+        pairs["distance"].to_numpy(dtype=np.int64),
+    )
+
+
+def match_encoded(
+    authors: pd.DataFrame,
+    users: pd.DataFrame,
+    min_confidence: float = 0.0,
+    max_distance: int = 0
+) -> MatchResult:
+    """
+    Все пары (автор, пользователь) с confidence >= min_confidence за один векторный проход.
+    max_distance > 0 добавляет пары с фамилиями на расстоянии редактирования до max_distance.
+    """
+    empty = np.array([], dtype=np.int64)
+    if authors.empty or users.empty:
+        return MatchResult(empty, empty, empty, np.array([], dtype=np.float32), len(authors), len(users))
+
+    # Общие словари кодов для фамилий и полных имён: сравнение строк сводится к сравнению целых
+    surname_codes, surname_keys = pd.factorize(
+        np.concatenate([authors["surname"].to_numpy(), users["surname"].to_numpy()])
+    )
+    full_codes, _ = pd.factorize(np.concatenate([authors["full"].to_numpy(), users["full"].to_numpy()]))
+    n_authors = len(authors)
+    a_surname, u_surname = surname_codes[:n_authors], surname_codes[n_authors:]
+    a_full, u_full = full_codes[:n_authors], full_codes[n_authors:]
+
+    # Пользователи без фамилии не сопоставляются
+    valid_users = np.flatnonzero(users["surname"].to_numpy() != "")
+    order = valid_users[np.argsort(u_surname[valid_users], kind="stable")]
+    sorted_surnames = u_surname[order]
+
+    # Диапазон однофамильцев каждого автора в отсортированном массиве пользователей
+    lo = np.searchsorted(sorted_surnames, a_surname, side="left")
+    hi = np.searchsorted(sorted_surnames, a_surname, side="right")
+    counts = hi - lo
+    total = int(counts.sum())
+
+    # Разворачиваем диапазоны в пары (индекс автора, индекс пользователя)
+    pair_authors = np.repeat(np.arange(n_authors), counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    pair_users = order[np.repeat(lo, counts) + offsets]
+    distance = np.zeros(total, dtype=np.int64)
+
+    if max_distance > 0:
+        fuzzy_authors, fuzzy_users, fuzzy_distance = _fuzzy_pairs(
+            a_surname, u_surname, valid_users, np.asarray(surname_keys, dtype=object), max_distance
+        )
+        pair_authors = np.concatenate([pair_authors, fuzzy_authors])
+        pair_users = np.concatenate([pair_users, fuzzy_users])
+        distance = np.concatenate([distance, fuzzy_distance])
+
+    if len(pair_authors) == 0:
+        return MatchResult(empty, empty, empty, np.array([], dtype=np.float32), n_authors, len(users))
+
+    # Инициалы сравниваются как есть, если имена в одном алфавите, иначе - по транслитерации
+    same_script = authors["cyrillic"].to_numpy()[pair_authors] == users["cyrillic"].to_numpy()[pair_users]
+    a_first = authors["first"].to_numpy()[pair_authors]
+    a_second = authors["second"].to_numpy()[pair_authors]
+    first_equal = np.where(
+        same_script,
+        a_first == users["first"].to_numpy()[pair_users],
+        authors["first_latin"].to_numpy()[pair_authors] == users["first_latin"].to_numpy()[pair_users]
+    )
+    u_second = users["second"].to_numpy()[pair_users]
+    second_equal = np.where(
+        same_script,
+        a_second == u_second,
+        authors["second_latin"].to_numpy()[pair_authors] == users["second_latin"].to_numpy()[pair_users]
+    )
+
+    surname_only = a_first == 0
+    first_ok = (a_first != 0) & first_equal
+    second_ok = (a_second == 0) | ((u_second != 0) & second_equal)
+
+    confidence = np.zeros(len(pair_authors), dtype=np.float32)
+    confidence[surname_only] = CONFIDENCE_SURNAME_ONLY
+    confidence[first_ok & (a_second == 0)] = CONFIDENCE_FIRST_INITIAL
+    confidence[first_ok & (a_second != 0) & second_ok] = CONFIDENCE_FULL_INITIALS
+    confidence[(distance == 0) & (a_full[pair_authors] == u_full[pair_users])] = CONFIDENCE_EXACT
+    confidence = np.where(confidence > 0, confidence - CONFIDENCE_FUZZY_PENALTY * distance, 0).astype(np.float32)
+
+    keep = (confidence > 0) & (confidence >= min_confidence)
+    pair_authors, pair_users = pair_authors[keep], pair_users[keep]
+    return MatchResult(
+        author_ids=authors["id"].to_numpy()[pair_authors],
+        article_ids=authors["article_id"].to_numpy()[pair_authors],
+        user_ids=users["id"].to_numpy()[pair_users],
+        confidence=confidence[keep],
+        authors_count=n_authors,
+        users_count=len(users),
+    )
+
+
+def match_all(
+    db: Session,
+    min_confidence: float = 0.0,
+    include_claimed: bool = False,
+    max_distance: int = 0
+) -> MatchResult:
+    """
+    Сопоставляет всех авторов (по умолчанию - ещё не привязанных) со всеми
+    пользователями. Два запроса к БД, дальше - только операции над массивами.
+    """
+    author_query = db.query(Author.id, Author.article_id, Author.author_name, Author.match_key)
+    if not include_claimed:
+        author_query = author_query.filter(Author.user_employee_id.is_(None))
+    authors = pd.DataFrame(author_query.all(), columns=["id", "article_id", "author_name", "match_key"])
+    users = pd.DataFrame(db.query(User.id, User.full_name).all(), columns=["id", "full_name"])
+    return match_encoded(encode_authors(authors), encode_users(users), min_confidence, max_distance)
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description="Пакетное сопоставление авторов с пользователями")
+    parser.add_argument("--min-confidence", type=float, default=0.7, help="Минимальная уверенность пары")
+    parser.add_argument("--include-claimed", action="store_true", help="Учитывать уже привязанных авторов")
+    parser.add_argument("--max-distance", type=int, default=0, help="Допустимое число правок в фамилии (0-2)")
+    parser.add_argument("--output", help="CSV-файл для пар (по умолчанию - stdout)")
+    args = parser.parse_args(argv)
+
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        result = match_all(db, args.min_confidence, args.include_claimed, args.max_distance)
+    finally:
+        db.close()
+
+    output = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        writer = csv.writer(output)
+        writer.writerow(["author_id", "article_id", "user_id", "confidence"])
+        writer.writerows(zip(
+            result.author_ids.tolist(), result.article_ids.tolist(),
+            result.user_ids.tolist(), np.round(result.confidence, 2).tolist()
+        ))
+    finally:
+        if args.output:
+            output.close()
+    print(
+        f"Авторов: {result.authors_count}, пользователей: {result.users_count}, пар: {len(result)}",
+        file=sys.stderr
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,470 @@
+"""
+Потоковый импорт статей из CSV.
+
+Файл читается частями (chunk_size строк), для каждой части:
+- одним запросом загружаются уже существующие external_id;
+- новые статьи вставляются одним многострочным INSERT ... RETURNING id;
+- авторы всех новых статей вставляются одним многострочным INSERT;
+- пересчитываются полнотекстовые векторы, документы и предложения
+  (только для авторов новых и изменённых статей) и выполняется коммит.
+
+В режиме upsert вместо пропуска существующих статей выполняется
+INSERT ... ON CONFLICT (external_id) DO UPDATE только для строк, у которых
+изменился content_hash; авторы обновлённых статей сверяются по имени.
+
+Память не зависит от размера файла, число обращений к БД - от числа частей.
+"""
+
+import hashlib
+import io
+import re
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import BinaryIO, Callable, List, Optional
+
+import pandas as pd
+import psutil
+from sqlalchemy import insert, literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from models.article import Article, Author
+from utils.article_search import refresh_article_search_vectors
+from utils.article_documents import refresh_article_documents
+from utils.suggestions import refresh_article_suggestions
+from utils.fio_utils import build_author_match_key
+from utils.fuzzy_fio import author_surname_index
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# Сколько ошибок по строкам возвращать в отчёте (остальные только считаются)
+MAX_REPORTED_ERRORS = 100
+
+# Возможные названия колонок CSV и их стандартные имена
+COLUMN_MAPPING = {
+    'ID': ['ID', 'id', 'External ID', 'external_id'],
+    'Название': ['Название', 'название', 'Title', 'title', 'Наименование'],
+    'Авторы': ['Авторы', 'авторы', 'Authors', 'authors', 'Список авторов'],
+    'Год публикации': ['Год публикации', 'год', 'Year', 'year_pub', 'Год'],
+    'В_РИНЦ': ['В_РИНЦ', 'РИНЦ', 'in_rinc', 'В РИНЦ', 'Индекс РИНЦ']
+}
+
+REQUIRED_COLUMNS = ['ID', 'Название', 'Авторы', 'Год публикации', 'В_РИНЦ']
+
+IMPORT_MODES = ("insert", "upsert")
+
+# Регулярное выражение для поиска имен авторов в формате Фамилия И.О.
+AUTHOR_PATTERN = re.compile(r'[А-ЯЁ][а-яё]+(?:-[А-ЯЁ][а-яё]+)?\s+[А-ЯЁ]\.[А-ЯЁ]?\.?')
+
+
+class CsvFormatError(ValueError):
+    """Файл не удалось разобрать как CSV или в нём нет обязательных колонок"""
+
+
+@dataclass
+class ImportStats:
+    processed: int = 0
+    chunks: int = 0  # обработано частей файла (записанных или откаченных)
+    imported: int = 0  # вставлено новых статей
+    updated: int = 0  # обновлено изменившихся (режим upsert)
+    unchanged: int = 0  # совпали с базой по content_hash (режим upsert)
+    skipped: int = 0
+    errors: List[dict] = field(default_factory=list)
+    error_count: int = 0
+    elapsed_seconds: float = 0.0
+    peak_memory_bytes: int = 0  # наибольший RSS процесса, замеренный во время импорта
+
+    def add_error(self, row: int, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "error": message})
+
+    @property
+    def rows_per_second(self) -> float:
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.processed / self.elapsed_seconds
+
+    def as_dict(self) -> dict:
+        return {
+            "processed": self.processed,
+            "imported": self.imported,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "skipped": self.skipped,
+            "error_count": self.error_count,
+            "errors": self.errors,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+            "peak_memory_mb": round(self.peak_memory_bytes / (1024 * 1024), 2),
+        }
+
+
+def extract_authors(authors_str) -> List[str]:
+    """Извлекает имена авторов в формате "Фамилия И.О." из строки"""
+    if pd.isna(authors_str) or authors_str == 'Нет авторов':
+        return []
+
+    return [match.strip() for match in AUTHOR_PATTERN.findall(authors_str)]
+
+
+def detect_csv_format(stream: BinaryIO, sample_size: int = 64 * 1024) -> dict:
+    """
+    Определяет кодировку, разделитель и символ кавычек по началу файла.
+    Возвращает параметры для pd.read_csv; позиция потока возвращается в начало.
+    """
+    sample = stream.read(sample_size)
+    stream.seek(0)
+
+    for encoding in ['utf-8', 'windows-1251']:
+        for sep in [',', ';', '\t']:
+            for quotechar in ['"', "'"]:
+                try:
+                    head = pd.read_csv(
+                        io.BytesIO(sample),
+                        sep=sep,
+                        encoding=encoding,
+                        quotechar=quotechar,
+                        skipinitialspace=True,  # Пропускать пробелы после разделителя
+                        nrows=20
+                    )
+                except (ValueError, UnicodeDecodeError, pd.errors.ParserError):
+                    continue
+                if len(head.columns) >= 5:  # Минимум 5 колонок
+                    return {"sep": sep, "encoding": encoding, "quotechar": quotechar}
+
+    raise CsvFormatError("Could not detect CSV format: expected at least 5 columns")
+
+
+def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Переименовывает колонки в стандартные названия и проверяет обязательные"""
+    renames = {}
+    for std_name, variants in COLUMN_MAPPING.items():
+        for variant in variants:
+            if variant in df.columns:
+                renames[variant] = std_name
+                break
+    df = df.rename(columns=renames)
+
+    for col in REQUIRED_COLUMNS:
+        if col not in df.columns:
+            raise CsvFormatError(
+                f"Missing required column: {col}. Available columns: {list(df.columns)}"
+            )
+    return df
+
+
+def compute_content_hash(title: str, year_pub: int, in_rinc: bool, authors: List[str]) -> str:
+    """
+    Хеш содержимого статьи из файла импорта: название, год, РИНЦ и авторы по порядку.
+    По нему режим upsert отличает изменённые статьи от неизменённых.
+    """
+    payload = "\x1f".join([title, str(year_pub), "1" if in_rinc else "0", "\x1e".join(authors)])
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def parse_row(row) -> dict:
+    """Преобразует строку CSV в поля статьи и список авторов"""
+    parsed = {
+        "external_id": int(row['ID']) if pd.notna(row['ID']) else None,
+        "title": str(row['Название']) if pd.notna(row['Название']) else 'Без названия',
+        "year_pub": int(float(row['Год публикации'])) if pd.notna(row['Год публикации']) else 2025,
+        "in_rinc": str(row['В_РИНЦ']).strip().lower() == 'да' if pd.notna(row['В_РИНЦ']) else False,
+        "authors": extract_authors(row['Авторы']),
+    }
+    parsed["content_hash"] = compute_content_hash(
+        parsed["title"], parsed["year_pub"], parsed["in_rinc"], parsed["authors"]
+    )
+    return parsed
+
+
+def iter_csv_chunks(stream: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Читает CSV частями по chunk_size строк, не загружая файл в память целиком"""
+    csv_format = detect_csv_format(stream)
+    reader = pd.read_csv(
+        stream,
+        chunksize=chunk_size,
+        dtype=str,
+        skipinitialspace=True,
+        **csv_format
+    )
+    for chunk in reader:
+        yield normalize_columns(chunk)
+
+
+def _parse_chunk(chunk: pd.DataFrame, stats: ImportStats) -> list:
+    """Разбирает строки части файла, ошибочные строки учитывает как пропущенные"""
+    parsed = []
+    for index, row in zip(chunk.index, chunk[REQUIRED_COLUMNS].to_dict('records')):
+        try:
+            parsed.append(parse_row(row))
+        except (ValueError, TypeError) as e:
+            stats.skipped += 1
+            stats.add_error(int(index), str(e))
+    return parsed
+
+
+def _article_row(p: dict) -> dict:
+    return {
+        "external_id": p["external_id"], "title": p["title"], "year_pub": p["year_pub"],
+        "in_rinc": p["in_rinc"], "content_hash": p["content_hash"],
+    }
+
+
+def _author_row(article_id: int, author_name: str) -> dict:
+    # НЕ привязываем авторов к пользователям автоматически:
+    # пользователь сможет привязать статью вручную через интерфейс
+    return {
+        "article_id": article_id, "author_name": author_name, "user_employee_id": None,
+        "contribution": 0.0, "applied_for_award": False,
+    }
+
+
+def _insert_chunk(db: Session, parsed: list, stats: ImportStats) -> List[int]:
+    """Режим insert: существующие external_id пропускаются. Возвращает id новых статей"""
+    # Существующие external_id загружаем одним запросом на всю часть
+    chunk_external_ids = {p["external_id"] for p in parsed if p["external_id"] is not None}
+    existing_ids = set()
+    if chunk_external_ids:
+        existing_ids = {
+            external_id for (external_id,) in
+            db.query(Article.external_id).filter(Article.external_id.in_(chunk_external_ids))
+        }
+
+    new_articles = []
+    for p in parsed:
+        external_id = p["external_id"]
+        if external_id is not None:
+            if external_id in existing_ids:
+                stats.skipped += 1
+                continue
+            existing_ids.add(external_id)  # дубликаты внутри файла тоже пропускаем
+        new_articles.append(p)
+
+    if not new_articles:
+        return []
+
+    article_ids = db.execute(
+        insert(Article).returning(Article.id, sort_by_parameter_order=True),
+        [_article_row(p) for p in new_articles]
+    ).scalars().all()
+
+    author_rows = [
+        _author_row(article_id, author_name)
+        for article_id, p in zip(article_ids, new_articles)
+        for author_name in p["authors"]
+    ]
+    if author_rows:
+        db.execute(insert(Author), author_rows)
+
+    stats.imported += len(article_ids)
+    return list(article_ids)
+
+
+def _same_author_key(key_a: str, key_b: str) -> bool:
+    """
+    Ключи сопоставления относятся к одному автору: фамилия совпадает,
+    а инициалы одного ключа являются началом инициалов другого
+    ("редкова н" и "редкова на").
+    """
+    surname_a, _, initials_a = key_a.partition(' ')
+    surname_b, _, initials_b = key_b.partition(' ')
+    return surname_a == surname_b and (initials_a.startswith(initials_b) or initials_b.startswith(initials_a))
+
+
+def _sync_authors(db: Session, article_authors: dict) -> None:
+    """
+    Приводит авторов обновлённых статей к новому списку, не теряя привязки.
+
+    article_authors: {article_id: [имена авторов из файла]}
+    - совпавшие по имени авторы остаются как есть (привязка, вклад, заявка на премию);
+    - привязанный автор, которого нет в новом списке, переименовывается в новое
+      имя с совместимым ключом сопоставления (например, исправленные инициалы);
+    - прочие исчезнувшие непривязанные авторы удаляются, новые добавляются.
+    Привязанные к сотрудникам авторы никогда не удаляются.
+    """
+    existing_by_article = defaultdict(list)
+    for author in db.query(Author).filter(
+        Author.article_id.in_(list(article_authors))
+    ).order_by(Author.id):
+        existing_by_article[author.article_id].append(author)
+
+    to_delete = []
+    author_rows = []
+    for article_id, names in article_authors.items():
+        remaining = existing_by_article.get(article_id, [])
+        unmatched_names = []
+        for name in names:
+            same = next((a for a in remaining if a.author_name == name), None)
+            if same is not None:
+                remaining.remove(same)
+            else:
+                unmatched_names.append(name)
+
+        for name in unmatched_names:
+            key = build_author_match_key(name)
+            renamed = next(
+                (a for a in remaining
+                 if a.user_employee_id is not None and _same_author_key(a.match_key or '', key)),
+                None
+            )
+            if renamed is not None:
+                remaining.remove(renamed)
+                renamed.author_name = name
+                renamed.match_key = key
+            else:
+                author_rows.append(_author_row(article_id, name))
+
+        to_delete.extend(a.id for a in remaining if a.user_employee_id is None)
+
+    if to_delete:
+        db.query(Author).filter(Author.id.in_(to_delete)).delete(synchronize_session=False)
+    if author_rows:
+        db.execute(insert(Author), author_rows)
+    db.flush()
+
+
+def _upsert_chunk(db: Session, parsed: list, stats: ImportStats) -> List[int]:
+    """
+    Режим upsert: INSERT ... ON CONFLICT (external_id) DO UPDATE, но только
+    для строк с изменившимся content_hash. Неизменённые строки не пишутся.
+    Возвращает id вставленных и обновлённых статей.
+    """
+    # ON CONFLICT не может изменить одну строку дважды за команду:
+    # для повторяющихся external_id берём последнюю строку файла
+    by_external_id = {}
+    without_external_id = []
+    for p in parsed:
+        if p["external_id"] is None:
+            without_external_id.append(p)
+        else:
+            by_external_id[p["external_id"]] = p
+    stats.skipped += len(parsed) - len(by_external_id) - len(without_external_id)
+
+    # Статьи без external_id сопоставить не с чем - они всегда добавляются
+    changed_ids = _insert_chunk(db, without_external_id, stats) if without_external_id else []
+
+    rows = list(by_external_id.values())
+    if not rows:
+        return changed_ids
+
+    stmt = pg_insert(Article)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Article.external_id],
+        set_={
+            "title": stmt.excluded.title,
+            "year_pub": stmt.excluded.year_pub,
+            "in_rinc": stmt.excluded.in_rinc,
+            "content_hash": stmt.excluded.content_hash,
+        },
+        where=Article.content_hash.is_distinct_from(stmt.excluded.content_hash)
+    ).returning(Article.id, Article.external_id, literal_column("xmax = 0").label("inserted"))
+
+    # Строки без изменений не возвращаются RETURNING
+    result = db.execute(stmt, [_article_row(p) for p in rows]).all()
+
+    inserted_authors = []
+    updated_authors = {}
+    for article_id, external_id, inserted in result:
+        p = by_external_id[external_id]
+        changed_ids.append(article_id)
+        if inserted:
+            stats.imported += 1
+            inserted_authors.extend(_author_row(article_id, name) for name in p["authors"])
+        else:
+            stats.updated += 1
+            updated_authors[article_id] = p["authors"]
+    stats.unchanged += len(rows) - len(result)
+
+    if inserted_authors:
+        db.execute(insert(Author), inserted_authors)
+    if updated_authors:
+        _sync_authors(db, updated_authors)
+
+    return changed_ids
+
+
+def import_articles_stream(
+    db: Session,
+    stream: BinaryIO,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    on_progress: Optional[Callable[[ImportStats], None]] = None,
+    mode: str = "insert",
+    resume: Optional[ImportStats] = None
+) -> ImportStats:
+    """
+    Импортирует статьи из CSV-потока, коммитя каждую часть отдельно.
+
+    mode="insert" - статьи с существующим external_id пропускаются;
+    mode="upsert" - изменённые статьи (по content_hash) обновляются на месте,
+    неизменённые не затрагиваются.
+
+    Ошибка при записи части откатывает только эту часть: её строки
+    считаются пропущенными, импорт продолжается со следующей.
+
+    on_progress вызывается после каждой части внутри её транзакции, до коммита:
+    записанный в нём прогресс коммитится вместе со статьями части (сам
+    on_progress не коммитит). resume - статистика прерванного импорта того же
+    файла с тем же chunk_size: первые resume.chunks частей пропускаются,
+    счётчики продолжаются с сохранённых значений.
+    """
+    if mode not in IMPORT_MODES:
+        raise ValueError(f"Unknown import mode: {mode}")
+
+    stats = resume if resume is not None else ImportStats()
+    done_chunks = stats.chunks
+    started = time.perf_counter() - stats.elapsed_seconds
+    # RSS процесса, а не tracemalloc: импорт идёт в фоновом потоке процесса API,
+    # и трассировка замедляла бы все параллельные запросы
+    process = psutil.Process()
+    stats.peak_memory_bytes = max(stats.peak_memory_bytes, process.memory_info().rss)
+
+    def finish_chunk(rows: int) -> None:
+        stats.processed += rows
+        stats.chunks += 1
+        stats.elapsed_seconds = time.perf_counter() - started
+        # Пик части (DataFrame, разобранные строки) ещё в памяти - замеряем здесь
+        stats.peak_memory_bytes = max(stats.peak_memory_bytes, process.memory_info().rss)
+        if on_progress is not None:
+            on_progress(stats)
+
+    try:
+        for index, chunk in enumerate(iter_csv_chunks(stream, chunk_size)):
+            if index < done_chunks:
+                # Часть записана до перезапуска
+                continue
+            before = (
+                stats.processed, stats.chunks, stats.imported, stats.updated, stats.unchanged, stats.skipped,
+                stats.error_count, len(stats.errors)
+            )
+            try:
+                parsed = _parse_chunk(chunk, stats)
+                if mode == "upsert":
+                    changed_ids = _upsert_chunk(db, parsed, stats)
+                else:
+                    changed_ids = _insert_chunk(db, parsed, stats)
+                refresh_article_search_vectors(db, changed_ids)
+                refresh_article_documents(db, changed_ids)
+                refresh_article_suggestions(db, changed_ids)
+                finish_chunk(len(chunk))
+                db.commit()
+                if changed_ids:
+                    author_surname_index.schedule_rebuild()
+            except Exception as e:
+                db.rollback()
+                (
+                    stats.processed, stats.chunks, stats.imported, stats.updated, stats.unchanged, stats.skipped,
+                    stats.error_count, reported_errors
+                ) = before
+                # Ошибки строк откаченной части заменяются одной ошибкой части
+                del stats.errors[reported_errors:]
+                stats.skipped += len(chunk)
+                stats.add_error(int(chunk.index[0]), f"Rows {chunk.index[0]}-{chunk.index[-1]} failed: {e}")
+                # Части нечего записывать, кроме прогресса
+                finish_chunk(len(chunk))
+                db.commit()
+    finally:
+        stats.elapsed_seconds = time.perf_counter() - started
+
+    return stats
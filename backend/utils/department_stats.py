@@ -0,0 +1,155 @@
+"""
+Статистика публикаций подразделений.
+
+Статьи подразделения - статьи, в которых хотя бы один автор привязан
+к сотруднику подразделения (user_departments -> authors -> articles).
+По каждому году считаются:
+    articles            - число статей
+    rinc_articles       - из них в РИНЦ
+    claimed_authors     - авторы этих статей, привязанные к пользователям (любым)
+    unclaimed_authors   - авторы этих статей без привязки
+    member_authors      - строки авторов, привязанные к сотрудникам подразделения
+    total_contribution  - суммарный вклад сотрудников подразделения
+    award_applications  - поданные сотрудниками заявки на награды
+
+Всё считается одним агрегирующим запросом (department_stats_query) сразу
+для одного или всех подразделений. При DEPARTMENT_STATS_ROLLUP=true те же
+строки читаются из материализованного представления department_stats_rollup,
+которое обновляется после каждого импорта CSV; изменения привязок между
+импортами в нём не видны, для точных цифр у эндпоинтов есть параметр live.
+"""
+
+import os
+from typing import Dict, Iterable, List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import Column, Float, Integer, MetaData, Table, func, select, text
+from sqlalchemy.orm import Session
+
+from models.article import Article, Author, UserDepartment
+
+load_dotenv()
+
+DEPARTMENT_STATS_ROLLUP = os.getenv("DEPARTMENT_STATS_ROLLUP", "false").lower() == "true"
+
+# Материализованное представление (миграция 6a4e2f9c1b38, Create_DB.sql).
+# Своя MetaData, чтобы create_all не создавал его как таблицу
+department_stats_rollup = Table(
+    "department_stats_rollup",
+    MetaData(schema="elibrary"),
+    Column("department_id", Integer),
+    Column("year_pub", Integer),
+    Column("articles", Integer),
+    Column("rinc_articles", Integer),
+    Column("claimed_authors", Integer),
+    Column("unclaimed_authors", Integer),
+    Column("member_authors", Integer),
+    Column("total_contribution", Float),
+    Column("award_applications", Integer),
+)
+
+STAT_FIELDS = [
+    "articles", "rinc_articles", "claimed_authors", "unclaimed_authors",
+    "member_authors", "total_contribution", "award_applications",
+]
+
+
+def department_stats_query(department_ids: Optional[Iterable[int]] = None):
+    """
+    Строки (department_id, year_pub, ...STAT_FIELDS) одним запросом.
+    Сначала сотрудники подразделений сводятся к парам (подразделение, статья),
+    затем для этих статей считаются все авторы, затем всё группируется по году.
+    """
+    member = (
+        select(
+            UserDepartment.department_id,
+            Author.article_id,
+            func.count().label("member_authors"),
+            func.coalesce(func.sum(Author.contribution), 0).label("member_contribution"),
+            func.count().filter(Author.applied_for_award.is_(True)).label("award_applications"),
+        )
+        .join_from(UserDepartment, Author, Author.user_employee_id == UserDepartment.user_id)
+        .group_by(UserDepartment.department_id, Author.article_id)
+    )
+    if department_ids is not None:
+        member = member.where(UserDepartment.department_id.in_(list(department_ids)))
+    member = member.cte("member")
+
+    article_authors = (
+        select(
+            Author.article_id,
+            func.count(Author.user_employee_id).label("claimed_authors"),
+            (func.count() - func.count(Author.user_employee_id)).label("unclaimed_authors"),
+        )
+        .where(Author.article_id.in_(select(member.c.article_id)))
+        .group_by(Author.article_id)
+        .cte("article_authors")
+    )
+
+    return (
+        select(
+            member.c.department_id,
+            Article.year_pub,
+            func.count().label("articles"),
+            func.count().filter(Article.in_rinc.is_(True)).label("rinc_articles"),
+            func.sum(article_authors.c.claimed_authors).label("claimed_authors"),
+            func.sum(article_authors.c.unclaimed_authors).label("unclaimed_authors"),
+            func.sum(member.c.member_authors).label("member_authors"),
+            func.sum(member.c.member_contribution).label("total_contribution"),
+            func.sum(member.c.award_applications).label("award_applications"),
+        )
+        .join_from(member, Article, Article.id == member.c.article_id)
+        .join(article_authors, article_authors.c.article_id == member.c.article_id)
+        .group_by(member.c.department_id, Article.year_pub)
+    )
+
+
+def rollup_query(department_ids: Optional[Iterable[int]] = None):
+    query = select(department_stats_rollup)
+    if department_ids is not None:
+        query = query.where(department_stats_rollup.c.department_id.in_(list(department_ids)))
+    return query
+
+
+def collect_department_stats(
+    db: Session,
+    departments: List[tuple],
+    use_rollup: bool = False
+) -> List[Dict]:
+    """
+    Статистика для подразделений departments (пары (id, name)): итоги и разбивка
+    по годам. Подразделения без статей возвращаются с нулями.
+    """
+    department_ids = [department_id for department_id, _ in departments]
+    if not department_ids:
+        return []
+
+    query = rollup_query(department_ids) if use_rollup else department_stats_query(department_ids)
+    by_department: Dict[int, List[Dict]] = {department_id: [] for department_id in department_ids}
+    for row in db.execute(query).mappings():
+        year_stats = {"year_pub": row["year_pub"]}
+        for field in STAT_FIELDS:
+            year_stats[field] = row[field] or 0
+        year_stats["total_contribution"] = float(year_stats["total_contribution"])
+        by_department[row["department_id"]].append(year_stats)
+
+    result = []
+    for department_id, name in departments:
+        years = sorted(by_department[department_id], key=lambda y: (y["year_pub"] is None, y["year_pub"]))
+        totals = {field: sum(y[field] for y in years) for field in STAT_FIELDS}
+        totals["total_contribution"] = round(totals["total_contribution"], 4)
+        result.append({
+            "department_id": department_id,
+            "department_name": name,
+            **totals,
+            "rinc_share": round(totals["rinc_articles"] / totals["articles"], 4) if totals["articles"] else 0.0,
+            "by_year": years,
+            "source": "rollup" if use_rollup else "live",
+        })
+    return result
+
+
+def refresh_department_stats_rollup(db: Session) -> None:
+    """Пересчитывает department_stats_rollup, не блокируя чтение (CONCURRENTLY)"""
+    db.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY elibrary.department_stats_rollup"))
+    db.commit()
@@ -1,5 +1,18 @@
+import os
 import re
-from typing import List
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import FrozenSet, Iterable, List
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Сколько скомпилированных сопоставителей пользователей хранится в памяти процесса
+USER_MATCHER_CACHE_SIZE = int(os.getenv("USER_MATCHER_CACHE_SIZE", "1024"))
+
+# Инициалы без пробела: "А.С." (и "А.С" без последней точки)
+_COMPACT_INITIALS_RE = re.compile(r"^([^\W\d_])\.([^\W\d_])\.?$")
 
 
 def normalize_fio(fio: str) -> str:
@@ -13,8 +26,13 @@ def extract_fio_parts(full_name: str) -> dict:
     """
     Извлекает части ФИО из полной строки.
     Возвращает словарь с ключами: last_name, first_name, patronymic
+    Слитные инициалы разбираются на имя и отчество: "Иванов А.С." -> "А.", "С."
     """
     parts = full_name.strip().split()
+    if len(parts) == 2:
+        compact = _COMPACT_INITIALS_RE.match(parts[1])
+        if compact:
+            parts = [parts[0], compact.group(1) + '.', compact.group(2) + '.']
     
     result = {
         'last_name': parts[0] if len(parts) >= 1 else '',
@@ -98,50 +116,118 @@ def match_author_with_user(author_name: str, user_full_name: str) -> bool:
     user_full_name: полное ФИО пользователя (например, "Иванов Александр Сергеевич")
     
     Возвращает True, если найдено совпадение.
+    Для проверки многих авторов одного пользователя используйте compile_user_matcher.
     """
-    # Нормализуем входные данные
-    author_normalized = normalize_fio(author_name)
-    user_normalized = normalize_fio(user_full_name)
-    
-    # Прямое совпадение
-    if author_normalized == user_normalized:
-        return True
-    
-    # Генерируем варианты для пользователя и проверяем совпадения
-    user_variants = generate_author_variants(user_full_name)
-    for variant in user_variants:
-        if normalize_fio(variant) == author_normalized:
+    return compile_user_matcher(user_full_name).matches(author_name)
+
+
+@dataclass(frozen=True)
+class UserMatcher:
+    """
+    Скомпилированные правила сопоставления авторов с одним пользователем:
+    варианты написания, фамилия и инициалы вычислены один раз.
+    Неизменяемый, поэтому его можно кэшировать и использовать из разных потоков.
+    """
+    full_name: str  # нормализованное ФИО
+    variants: FrozenSet[str]  # нормализованные generate_author_variants и само ФИО
+    last_name: str
+    first_initial: str
+    patronymic_initial: str
+
+    def matches(self, author_name: str) -> bool:
+        """То же, что match_author_with_user(author_name, <ФИО пользователя>)"""
+        author_normalized = normalize_fio(author_name)
+
+        # Прямое совпадение или один из вариантов написания
+        if author_normalized in self.variants:
             return True
-    
-    # Проверяем совпадение по фамилии и инициалам
-    user_parts = extract_fio_parts(user_full_name)
-    author_parts = extract_fio_parts(author_name)
-    
-    # Сравниваем фамилии
-    if user_parts['last_name'].lower() != author_parts['last_name'].lower():
-        return False
-    
-    # Если в author_name только фамилия - считаем совпадением
-    if not author_parts['first_name']:
-        return True
-    
-    # Сравниваем инициалы
-    user_first_initial = get_initials(user_parts['first_name'])[0].lower()
-    user_patronymic_initial = get_initials(user_parts['patronymic'])[0].lower() if user_parts['patronymic'] else ''
-    
-    # Проверяем, соответствует ли первый инициал
-    if author_parts['first_name']:
-        author_first_char = author_parts['first_name'][0].lower()
-        if author_first_char != user_first_initial:
+
+        # Фамилия и инициалы ("И.О." и "И. О." разбираются одинаково)
+        author_parts = extract_fio_parts(author_normalized)
+        if author_parts['last_name'] != self.last_name:
             return False
-    
-    # Проверяем второй инициал (отчество)
-    if author_parts['patronymic']:
-        author_patronymic_char = author_parts['patronymic'][0].lower()
-        if not user_patronymic_initial or author_patronymic_char != user_patronymic_char:
+
+        # Если в author_name только фамилия - считаем совпадением
+        if not author_parts['first_name']:
+            return True
+
+        if author_parts['first_name'][0] != self.first_initial:
             return False
-    
-    return True
+
+        if author_parts['patronymic']:
+            if not self.patronymic_initial or author_parts['patronymic'][0] != self.patronymic_initial:
+                return False
+
+        return True
+
+    def match_many(self, author_names: Iterable[str]) -> List[bool]:
+        """Результаты matches для каждого имени автора"""
+        matches = self.matches
+        return [matches(author_name) for author_name in author_names]
+
+
+@lru_cache(maxsize=USER_MATCHER_CACHE_SIZE)
+def compile_user_matcher(user_full_name: str) -> UserMatcher:
+    """
+    Строит (или берёт из кэша) сопоставитель для ФИО пользователя.
+    Например: compile_user_matcher("Иванов Александр Сергеевич").matches("Иванов А.С.") -> True
+    """
+    user_normalized = normalize_fio(user_full_name)
+    user_parts = extract_fio_parts(user_full_name)
+
+    variants = {normalize_fio(variant) for variant in generate_author_variants(user_full_name)}
+    variants.add(user_normalized)
+
+    # У пользователя может быть указана только фамилия
+    return UserMatcher(
+        full_name=user_normalized,
+        variants=frozenset(variants),
+        last_name=user_parts['last_name'].lower(),
+        first_initial=get_initials(user_parts['first_name'])[0].lower() if user_parts['first_name'] else '',
+        patronymic_initial=get_initials(user_parts['patronymic'])[0].lower() if user_parts['patronymic'] else '',
+    )
+
+
+def build_author_match_key(author_name: str) -> str:
+    """
+    Строит ключ сопоставления для имени автора: фамилия в нижнем регистре
+    и первые буквы имени и отчества.
+    Например: "Иванов А.С." -> "иванов ас", "Иванов А. С." -> "иванов ас", "Иванов А." -> "иванов а"
+
+    Ключ хранится в authors.match_key и позволяет отобрать кандидатов
+    индексным запросом, не прогоняя match_author_with_user по всей таблице.
+    """
+    parts = extract_fio_parts(normalize_fio(author_name))
+
+    key = parts['last_name']
+    initials = ''.join(
+        part[0] for part in (parts['first_name'], parts['patronymic']) if part
+    )
+    if initials:
+        key = f"{key} {initials}"
+
+    return key
+
+
+def build_user_match_keys(user_full_name: str) -> List[str]:
+    """
+    Возвращает все ключи authors.match_key, при которых
+    match_author_with_user может вернуть True для данного пользователя.
+    Например: "Иванов Александр Сергеевич" -> ["иванов", "иванов а", "иванов ас"]
+    """
+    parts = extract_fio_parts(normalize_fio(user_full_name))
+
+    last_name = parts['last_name']
+    if not last_name:
+        return []
+
+    keys = [last_name]
+    if parts['first_name']:
+        keys.append(f"{last_name} {parts['first_name'][0]}")
+        if parts['patronymic']:
+            keys.append(f"{last_name} {parts['first_name'][0]}{parts['patronymic'][0]}")
+
+    return keys
 
 
 def find_matching_articles_for_user(user_full_name: str, articles: list) -> list:
@@ -153,13 +239,11 @@ def find_matching_articles_for_user(user_full_name: str, articles: list) -> list
     
     Возвращает список статей, где имя автора совпадает с ФИО пользователя.
     """
-    matching_articles = []
-    
-    for article in articles:
-        if hasattr(article, 'authors'):
-            for author in article.authors:
-                if match_author_with_user(author.author_name, user_full_name):
-                    matching_articles.append(article)
-                    break
-    
-    return matching_articles
+    matcher = compile_user_matcher(user_full_name)
+    matches = matcher.matches
+
+    return [
+        article for article in articles
+        if hasattr(article, 'authors')
+        and any(matches(author.author_name) for author in article.authors)
+    ]
@@ -0,0 +1,277 @@
+"""
+Нечёткое сопоставление фамилий: свёртка е/ё, транслитерация и индекс
+для запросов с ограниченным расстоянием редактирования.
+
+Ключ фамилии (surname_key): нижний регистр, ё -> е, кириллица транслитерируется
+по ГОСТ Р 52535.1-2006 (как в загранпаспортах), после чего и транслитерация,
+и латинская запись из elibrary сводятся к одному виду (y/j -> i, kh -> h,
+ts -> tc, ...). Поэтому "Ёлкин", "Елкин" и "Yolkin" дают один ключ "elkin".
+Дефис сохраняется: части двойной фамилии сопоставляются с расстоянием 1.
+
+Опечатки ищутся индексом FuzzyKeyIndex: для каждого ключа хранятся все
+варианты с удалением до max_distance символов (окрестность удалений, как
+в SymSpell). Два ключа на расстоянии <= d имеют общий вариант, поэтому
+запрос - это несколько десятков обращений к словарю и проверка найденных
+кандидатов edit_distance, без перебора всех фамилий.
+
+author_surname_index - снимок фамилий авторов в памяти процесса (ключ ->
+authors.match_key), перестраиваемый в фоне. Используется предложениями (utils.suggestions) и поиском
+статей по автору (GET /articles/?search_author=...&author_distance=1).
+"""
+
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import structlog
+from dotenv import load_dotenv
+from sqlalchemy import select
+
+from models.article import Author
+
+load_dotenv()
+
+logger = structlog.get_logger(__name__)
+
+# Допустимое число правок в фамилии для предложений и поиска по автору
+# (0 - только точные ключи). От него зависит размер индекса фамилий авторов
+FUZZY_MAX_DISTANCE = int(os.getenv("FUZZY_MAX_DISTANCE", "1"))
+# Как часто индекс фамилий авторов перестраивается без явного запроса (записи других процессов)
+FUZZY_INDEX_TTL = float(os.getenv("FUZZY_INDEX_TTL", "600"))
+
+# Верхняя граница расстояния в запросах (окрестность удалений растёт как len^d)
+MAX_QUERY_DISTANCE = 2
+
+# ГОСТ Р 52535.1-2006 (ё и е совпадают)
+_GOST_TRANSLIT = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e", "ж": "zh",
+    "з": "z", "и": "i", "й": "i", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o",
+    "п": "p", "р": "r", "с": "s", "т": "t", "у": "u", "ф": "f", "х": "kh", "ц": "tc",
+    "ч": "ch", "ш": "sh", "щ": "shch", "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "iu",
+    "я": "ia",
+}
+
+# Другие распространённые латинские записи -> вид ГОСТ (применяется к обеим сторонам)
+_LATIN_FOLDS = [
+    ("x", "ks"), ("w", "v"), ("q", "k"), ("ph", "f"), ("j", "i"), ("y", "i"),
+    ("kh", "h"), ("ts", "tc"), ("io", "e"), ("ie", "e"),
+]
+
+
+def is_cyrillic(text: str) -> bool:
+    return any("а" <= ch <= "я" or ch == "ё" for ch in text.lower())
+
+
+def surname_key(surname: str) -> str:
+    """
+    Ключ фамилии для сравнения без учёта е/ё и алфавита.
+    Например: "Ёлкин" -> "elkin", "Yolkin" -> "elkin", "Хохлова-Цветкова" -> "hohlova-tcvetkova"
+    """
+    translit = "".join(_GOST_TRANSLIT.get(ch, ch) for ch in surname.lower())
+    key = "".join(ch for ch in translit if "a" <= ch <= "z" or ch == "-").strip("-")
+    for variant, replacement in _LATIN_FOLDS:
+        key = key.replace(variant, replacement)
+    return key
+
+
+def initial_key(name: str) -> str:
+    """Первая буква ключа имени - для сравнения инициалов в разных алфавитах"""
+    return surname_key(name)[:1]
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Расстояние Дамерау-Левенштейна (оптимальное выравнивание строк: вставка,
+    удаление, замена, перестановка соседних). Если оно больше limit,
+    возвращается limit + 1 без досчёта.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if a == b:
+        return 0
+    # Общие начало и конец на расстояние не влияют: для опечатки остаётся 1-2 символа
+    prefix = 0
+    while prefix < min(len(a), len(b)) and a[prefix] == b[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < min(len(a), len(b)) - prefix and a[-1 - suffix] == b[-1 - suffix]:
+        suffix += 1
+    a, b = a[prefix:len(a) - suffix], b[prefix:len(b) - suffix]
+
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+def allowed_distance(key: str, max_distance: int) -> int:
+    """Короткие фамилии сравниваются строже: "ли" и "ю" не должны совпадать с чем угодно"""
+    if len(key) <= 3:
+        return 0
+    if len(key) <= 6:
+        return min(max_distance, 1)
+    return min(max_distance, MAX_QUERY_DISTANCE)
+
+
+def _deletions(term: str, depth: int) -> Set[str]:
+    """Сам ключ и все варианты с удалением до depth символов"""
+    result = {term}
+    frontier = {term}
+    for _ in range(depth):
+        frontier = {word[:i] + word[i + 1:] for word in frontier for i in range(len(word))}
+        result |= frontier
+    return result
+
+
+def _key_parts(key: str) -> List[Tuple[str, int]]:
+    """Ключ и, для двойной фамилии, её части со штрафом 1"""
+    parts = [(key, 0)]
+    if "-" in key:
+        parts.extend((part, 1) for part in key.split("-") if part)
+    return parts
+
+
+class FuzzyKeyIndex:
+    """
+    Ключи фамилий для запросов "все значения на расстоянии <= d".
+    Каждый ключ связан с набором значений (например, authors.match_key);
+    части двойных фамилий индексируются со штрафом 1.
+    """
+
+    def __init__(self, max_distance: int = 1):
+        self.max_distance = min(max_distance, MAX_QUERY_DISTANCE)
+        self._values: Dict[str, Dict[object, int]] = defaultdict(dict)
+        self._deletes: Dict[str, Set[str]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def add(self, key: str, value: object = None) -> None:
+        if not key:
+            return
+        value = key if value is None else value
+        for term, penalty in _key_parts(key):
+            known = term in self._values
+            values = self._values[term]
+            values[value] = min(penalty, values.get(value, penalty))
+            if not known:
+                for variant in _deletions(term, allowed_distance(term, self.max_distance)):
+                    self._deletes[variant].add(term)
+
+    def lookup(self, key: str, max_distance: Optional[int] = None) -> Dict[object, int]:
+        """Значения, ключи которых на расстоянии <= max_distance от key -> расстояние"""
+        max_distance = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        found: Dict[object, int] = {}
+        for query, query_penalty in _key_parts(key):
+            limit = allowed_distance(query, max_distance) - query_penalty
+            if limit < 0:
+                continue
+            terms = set()
+            for variant in _deletions(query, limit):
+                terms |= self._deletes.get(variant, set())
+            for term in terms:
+                # Ограничение симметрично: короткий ключ индекса сравнивается так же строго
+                distance = edit_distance(query, term, limit)
+                if distance > limit or distance > allowed_distance(term, max_distance):
+                    continue
+                for value, penalty in self._values[term].items():
+                    total = distance + query_penalty + penalty
+                    if total <= max_distance and total < found.get(value, total + 1):
+                        found[value] = total
+        return found
+
+
+def fuzzy_key_pairs(
+    queries: Iterable[str],
+    keys: Iterable[str],
+    max_distance: int
+) -> List[Tuple[str, str, int]]:
+    """Пары (запрос, ключ, расстояние) с 0 < расстояние <= max_distance"""
+    index = FuzzyKeyIndex(max_distance)
+    for key in keys:
+        index.add(key)
+    pairs = []
+    for query in queries:
+        for key, distance in index.lookup(query).items():
+            if distance > 0:
+                pairs.append((query, key, distance))
+    return pairs
+
+
+class AuthorSurnameIndex:
+    """
+    Индекс фамилий авторов в памяти процесса: ключ фамилии -> authors.match_key.
+
+    Индекс - неизменяемый снимок: rebuild читает ключи из БД без блокировок,
+    строит новый FuzzyKeyIndex и подменяет ссылку на него одним присваиванием.
+    Поиск (similar_match_keys) читает текущий снимок и не обращается к БД,
+    поэтому безопасен и в потоке цикла событий (AsyncSession.run_sync).
+
+    При запуске API снимок строится синхронно (main.py), дальше его
+    перестраивает фоновый поток (start): после записей, меняющих авторов
+    (schedule_rebuild - импорт CSV, создание, изменение и удаление статьи),
+    и раз в ttl_seconds - для изменений из других процессов. Пока новый
+    снимок строится, запросы видят предыдущий. Лишние ключи безвредны -
+    по ним просто не найдётся авторов.
+    """
+
+    def __init__(self, max_distance: int = 1, ttl_seconds: float = 600.0):
+        self.max_distance = max_distance
+        self.ttl_seconds = ttl_seconds
+        self._index = FuzzyKeyIndex(max_distance)
+        self._wake = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    def rebuild(self, db) -> None:
+        """Строит снимок по всем authors.match_key (db - Session или Connection)"""
+        rows = db.execute(
+            select(Author.match_key).where(Author.match_key.isnot(None)).distinct()
+        ).scalars()
+        index = FuzzyKeyIndex(self.max_distance)
+        for match_key in rows:
+            index.add(surname_key(match_key.partition(" ")[0]), match_key)
+        self._index = index
+
+    def similar_match_keys(self, surname: str, max_distance: Optional[int] = None) -> Dict[str, int]:
+        """Ключи authors.match_key с фамилией на расстоянии <= max_distance -> расстояние"""
+        return self._index.lookup(surname_key(surname), max_distance)
+
+    def schedule_rebuild(self) -> None:
+        """Просит фоновый поток перестроить снимок; вызывается после коммита"""
+        self._wake.set()
+
+    def start(self, session_factory) -> None:
+        """Запускает фоновый поток перестроения (один на процесс)"""
+        if self._worker is None:
+            self._worker = threading.Thread(
+                target=self._run, args=(session_factory,), name="author-surname-index", daemon=True
+            )
+            self._worker.start()
+
+    def _run(self, session_factory) -> None:
+        while True:
+            self._wake.wait(self.ttl_seconds)
+            # Сброс до чтения БД: запись, закоммиченная позже, запросит ещё одно перестроение
+            self._wake.clear()
+            try:
+                with session_factory() as db:
+                    self.rebuild(db)
+            except Exception as e:
+                logger.warning("author_surname_index_rebuild_failed", error=str(e))
+
+    def invalidate(self) -> None:
+        """Пустой снимок (тесты)"""
+        self._index = FuzzyKeyIndex(self.max_distance)
+
+
+author_surname_index = AuthorSurnameIndex(max_distance=FUZZY_MAX_DISTANCE, ttl_seconds=FUZZY_INDEX_TTL)
@@ -0,0 +1,191 @@
+"""
+Фоновое выполнение импорта CSV.
+
+Загруженный файл сохраняется на диск, задача записывается в таблицу
+import_jobs и выполняется в отдельном потоке. Прогресс пишется в БД после
+каждой части файла в той же транзакции, что и статьи части (chunks_done -
+число обработанных частей), поэтому его видно через GET /import/jobs/{id}.
+После перезапуска API незавершённые задачи продолжаются с первой
+необработанной части и с сохранёнными счётчиками: уже записанные части
+(в том числе статьи без external_id) повторно не вставляются.
+
+Предполагается один процесс API, выполняющий импорт: при запуске он
+считает все задачи в статусе running прерванными.
+"""
+
+import os
+import shutil
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import BinaryIO, Optional
+
+import structlog
+from dotenv import load_dotenv
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models.import_job import ImportJob
+from utils.article_counts import article_count_cache
+from utils.csv_importer import ImportStats, import_articles_stream
+from utils.department_stats import DEPARTMENT_STATS_ROLLUP, refresh_department_stats_rollup
+
+load_dotenv()
+
+IMPORT_UPLOAD_DIR = os.getenv(
+    "IMPORT_UPLOAD_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "uploads", "imports")
+)
+IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS", "1"))
+
+_executor = ThreadPoolExecutor(max_workers=IMPORT_WORKERS, thread_name_prefix="csv-import")
+
+logger = structlog.get_logger(__name__)
+
+
+def save_upload(stream: BinaryIO) -> str:
+    """Сохраняет загруженный файл на диск и возвращает путь к нему"""
+    os.makedirs(IMPORT_UPLOAD_DIR, exist_ok=True)
+    path = os.path.join(IMPORT_UPLOAD_DIR, f"{uuid.uuid4().hex}.csv")
+    with open(path, "wb") as f:
+        shutil.copyfileobj(stream, f)
+    return path
+
+
+def _apply_stats(job: ImportJob, stats: ImportStats) -> None:
+    job.processed = stats.processed
+    job.chunks_done = stats.chunks
+    job.imported = stats.imported
+    job.updated = stats.updated
+    job.unchanged = stats.unchanged
+    job.skipped = stats.skipped
+    job.error_count = stats.error_count
+    job.errors = list(stats.errors)
+    job.elapsed_seconds = stats.elapsed_seconds
+    job.rows_per_second = stats.rows_per_second
+    job.peak_memory_mb = stats.peak_memory_bytes / (1024 * 1024)
+
+
+def _saved_stats(job: ImportJob) -> ImportStats:
+    """Счётчики задачи, сохранённые после последней обработанной части"""
+    return ImportStats(
+        processed=job.processed,
+        chunks=job.chunks_done,
+        imported=job.imported,
+        updated=job.updated,
+        unchanged=job.unchanged,
+        skipped=job.skipped,
+        errors=list(job.errors or []),
+        error_count=job.error_count,
+        elapsed_seconds=job.elapsed_seconds,
+        peak_memory_bytes=int(job.peak_memory_mb * 1024 * 1024),
+    )
+
+
+def run_import_job(job_id: int) -> None:
+    """Выполняет задачу импорта (вызывается в потоке исполнителя)"""
+    db = SessionLocal()
+    try:
+        # Атомарно забираем задачу, чтобы она не выполнялась дважды
+        claimed = db.query(ImportJob).filter(
+            ImportJob.id == job_id,
+            ImportJob.status == "queued"
+        ).update(
+            {"status": "running", "started_at": func.coalesce(ImportJob.started_at, datetime.utcnow()), "message": None},
+            synchronize_session=False
+        )
+        db.commit()
+        if not claimed:
+            return
+
+        job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+
+        def on_progress(stats: ImportStats) -> None:
+            # Коммитится вместе со статьями части
+            _apply_stats(job, stats)
+
+        try:
+            with open(job.file_path, "rb") as f:
+                stats = import_articles_stream(
+                    db, f, chunk_size=job.chunk_size, on_progress=on_progress, mode=job.mode,
+                    resume=_saved_stats(job)
+                )
+        except Exception as e:
+            db.rollback()
+            job.status = "failed"
+            job.message = str(e)
+        else:
+            _apply_stats(job, stats)
+            job.status = "done"
+        finally:
+            article_count_cache.invalidate()
+
+        job.finished_at = datetime.utcnow()
+        db.commit()
+
+        if job.status == "done" and DEPARTMENT_STATS_ROLLUP:
+            try:
+                refresh_department_stats_rollup(db)
+            except Exception as e:
+                db.rollback()
+                logger.warning("department_stats_refresh_failed", job_id=job_id, error=str(e))
+
+        if job.status == "done" and os.path.exists(job.file_path):
+            os.remove(job.file_path)
+    finally:
+        db.close()
+
+
+def enqueue_import_job(
+    db: Session,
+    stream: BinaryIO,
+    filename: Optional[str],
+    chunk_size: int,
+    user_id: int,
+    mode: str = "insert"
+) -> ImportJob:
+    """Сохраняет файл, создаёт запись задачи и ставит её в очередь"""
+    job = ImportJob(
+        status="queued",
+        mode=mode,
+        filename=filename,
+        file_path=save_upload(stream),
+        chunk_size=chunk_size,
+        created_by=user_id
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    _executor.submit(run_import_job, job.id)
+    return job
+
+
+def resume_pending_import_jobs() -> int:
+    """
+    Повторно ставит в очередь задачи, прерванные перезапуском API:
+    они продолжатся с первой необработанной части. Возвращает количество таких задач.
+    """
+    db = SessionLocal()
+    try:
+        pending = db.query(ImportJob).filter(
+            ImportJob.status.in_(["queued", "running"])
+        ).order_by(ImportJob.id).all()
+
+        resumed_ids = []
+        for job in pending:
+            if not os.path.exists(job.file_path):
+                job.status = "failed"
+                job.message = "Uploaded file is missing, please upload it again"
+                job.finished_at = datetime.utcnow()
+                continue
+            job.status = "queued"
+            resumed_ids.append(job.id)
+        db.commit()
+
+        for job_id in resumed_ids:
+            _executor.submit(run_import_job, job_id)
+        return len(resumed_ids)
+    finally:
+        db.close()
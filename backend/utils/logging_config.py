@@ -0,0 +1,50 @@
+"""
+Настройка структурированного логирования (structlog).
+
+Уровень задаётся LOG_LEVEL (DEBUG, INFO, WARNING, ...), формат - LOG_FORMAT:
+"console" - читаемый вывод для разработки, "json" - одна JSON-строка на событие
+для сборщиков логов. Сообщения ниже LOG_LEVEL отбрасываются до форматирования,
+поэтому отладочные вызовы logger.debug(...) на горячем пути почти ничего не стоят.
+
+Использование:
+    import structlog
+    logger = structlog.get_logger(__name__)
+    logger.debug("article_not_found", article_id=id)
+"""
+
+import logging
+import os
+
+import structlog
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "console").lower()
+
+
+def configure_logging() -> None:
+    """Настраивает structlog; вызывается один раз при запуске приложения"""
+    level = logging.getLevelName(LOG_LEVEL)
+    if not isinstance(level, int):
+        level = logging.INFO
+
+    renderer = (
+        structlog.processors.JSONRenderer(ensure_ascii=False)
+        if LOG_FORMAT == "json"
+        else structlog.dev.ConsoleRenderer()
+    )
+
+    structlog.configure(
+        processors=[
+            structlog.contextvars.merge_contextvars,
+            structlog.processors.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso", utc=True),
+            structlog.processors.format_exc_info,
+            renderer,
+        ],
+        wrapper_class=structlog.make_filtering_bound_logger(level),
+        logger_factory=structlog.WriteLoggerFactory(),
+        cache_logger_on_first_use=True,
+    )
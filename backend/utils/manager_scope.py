@@ -0,0 +1,42 @@
+import os
+from typing import FrozenSet, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from utils.ttl_cache import TTLCache
+
+load_dotenv()
+
+MANAGER_SCOPE_TTL = float(os.getenv("MANAGER_SCOPE_TTL", "60"))
+MANAGER_SCOPE_CACHE_SIZE = int(os.getenv("MANAGER_SCOPE_CACHE_SIZE", "1024"))
+
+
+class ManagerScopeCache(TTLCache):
+    """
+    Кэш области видимости менеджеров: manager_id -> (ID управляемых подразделений,
+    ID пользователей этих подразделений).
+
+    Записи сбрасываются при изменении подразделения или его состава
+    (invalidate_department), смене менеджера (invalidate_manager) и удалении
+    пользователя (invalidate_member).
+    """
+
+    def get(self, manager_id: int) -> Optional[Tuple[FrozenSet[int], FrozenSet[int]]]:
+        return super().get(manager_id)
+
+    def set(self, manager_id: int, department_ids: FrozenSet[int], user_ids: FrozenSet[int]) -> None:
+        super().set(manager_id, (department_ids, user_ids))
+
+    def invalidate_manager(self, manager_id: int) -> None:
+        self.pop(manager_id)
+
+    def invalidate_department(self, department_id: int) -> None:
+        """Сбрасывает записи всех менеджеров, в область которых входит подразделение"""
+        self.invalidate_where(lambda manager_id, scope: department_id in scope[0])
+
+    def invalidate_member(self, user_id: int) -> None:
+        """Сбрасывает записи, в которых виден пользователь, и его собственную запись"""
+        self.invalidate_where(lambda manager_id, scope: user_id in scope[1] or manager_id == user_id)
+
+
+manager_scope_cache = ManagerScopeCache(max_entries=MANAGER_SCOPE_CACHE_SIZE, ttl_seconds=MANAGER_SCOPE_TTL)
@@ -0,0 +1,64 @@
+"""
+Хеширование и проверка паролей (bcrypt).
+
+Единственное место, где создаётся CryptContext: его используют api/auth.py,
+api/auth_async.py, api/employees.py и ноутбук passGen.ipynb.
+
+bcrypt выполняется в отдельном пуле потоков PASSWORD_HASH_WORKERS
+(библиотека bcrypt отпускает GIL, поэтому потоки работают параллельно).
+Пул ограничивает число одновременных вычислений хеша. Обработчики входа,
+создания и изменения пользователей асинхронные: они ждут хеш через await
+(hash_password_async, verify_and_update_async), а запросы к БД выполняют
+в пуле потоков FastAPI (run_in_threadpool) до и после хеширования. Поэтому
+всплеск входов или массовое создание пользователей не занимает потоки пула
+FastAPI на время bcrypt. hash_password - блокирующий вариант для скриптов
+(passGen.ipynb, бенчмарки).
+
+Стоимость задаётся BCRYPT_ROUNDS. Хеши с другой стоимостью считаются
+устаревшими и пересчитываются при успешном входе (verify_and_update_async).
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from dotenv import load_dotenv
+from passlib.context import CryptContext
+
+load_dotenv()
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# min_rounds = max_rounds = BCRYPT_ROUNDS: хеш с любой другой стоимостью требует пересчёта
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS
+)
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+
+def hash_password(password: str) -> str:
+    """Хеширует пароль в пуле bcrypt (блокирующий вызов для скриптов)"""
+    return _executor.submit(pwd_context.hash, password).result()
+
+
+async def hash_password_async(password: str) -> str:
+    """Хеширует пароль в пуле bcrypt, не блокируя цикл событий и пул потоков FastAPI"""
+    return await asyncio.wrap_future(_executor.submit(pwd_context.hash, password))
+
+
+async def verify_and_update_async(password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+    """
+    Проверяет пароль в пуле bcrypt, не блокируя цикл событий.
+    Возвращает (пароль верен, новый хеш или None). Новый хеш возвращается,
+    если пароль верен, а сохранённый хеш создан с другой стоимостью.
+    """
+    return await asyncio.wrap_future(
+        _executor.submit(pwd_context.verify_and_update, password, password_hash)
+    )
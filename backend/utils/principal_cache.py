@@ -0,0 +1,46 @@
+import os
+from typing import Any, Dict, Hashable
+
+from dotenv import load_dotenv
+from sqlalchemy.orm import make_transient_to_detached
+
+from models.article import User
+from utils.ttl_cache import TTLCache
+
+load_dotenv()
+
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "1024"))
+
+
+class PrincipalCache(TTLCache):
+    """
+    Кэш аутентифицированных пользователей для get_current_user,
+    ключ - (login, iat) из JWT.
+
+    Хранятся значения колонок строки users, а не сам объект: на каждый запрос
+    из них собирается новый экземпляр User и присоединяется к сессии запроса
+    без SELECT (см. to_user). Записи пользователя сбрасываются при изменении
+    его строки, роли или подразделений (invalidate_user).
+    """
+
+    def set(self, key: Hashable, user: User) -> None:
+        super().set(key, {column.key: getattr(user, column.key) for column in User.__table__.columns})
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Сбрасывает все записи пользователя (по всем выданным ему токенам)"""
+        self.invalidate_where(lambda key, values: values["id"] == user_id)
+
+    @staticmethod
+    def to_user(values: Dict[str, Any]) -> User:
+        """
+        Собирает отсоединённый User из закэшированных значений. Его нужно
+        передать в session.merge(user, load=False): объект попадёт в сессию
+        без запроса к БД, а связи (departments и т.п.) загрузятся лениво.
+        """
+        user = User(**values)
+        make_transient_to_detached(user)
+        return user
+
+
+principal_cache = PrincipalCache(max_entries=PRINCIPAL_CACHE_SIZE, ttl_seconds=PRINCIPAL_CACHE_TTL)
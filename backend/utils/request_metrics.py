@@ -0,0 +1,178 @@
+"""
+Метрики запросов: время обработки, время в БД, число SQL-запросов и строк.
+
+События SQLAlchemy (install_sql_instrumentation) суммируют время и число
+выполненных запросов в RequestStats текущего HTTP-запроса; RequestMetricsMiddleware
+создаёт этот объект, добавляет к ответу заголовок Server-Timing и пишет
+структурированную запись в лог (событие "request").
+
+Пример заголовка:
+    Server-Timing: app;dur=18.41, db;dur=6.02;desc="statements=3 rows=51"
+
+Статистика передаётся через contextvars, поэтому видна и в синхронных
+обработчиках (FastAPI копирует контекст в пул потоков). Запросы вне HTTP
+(фоновый импорт, миграции) не учитываются.
+
+Бюджет запросов: маршрут объявляет предельное число SQL-запросов через
+dependencies=[Depends(query_budget(N))]. Превышение означает, что число
+запросов растёт с размером выборки (N+1 из-за ленивой загрузки связей).
+Оно пишется в лог как query_budget_exceeded, а при QUERY_BUDGET_STRICT=true
+запрос завершается ошибкой QueryBudgetExceeded. Бюджеты всех маршрутов
+проверяются тестами tests/test_query_budgets.py на двух размерах выборки.
+"""
+
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+import structlog
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+load_dotenv()
+
+logger = structlog.get_logger("request")
+
+QUERY_BUDGET_STRICT = os.getenv("QUERY_BUDGET_STRICT", "false").lower() == "true"
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Маршрут выполнил больше SQL-запросов, чем объявлено в query_budget"""
+
+
+@dataclass
+class RequestStats:
+    statements: int = 0
+    db_seconds: float = 0.0
+    rows: int = 0  # Строки, возвращённые SELECT или изменённые INSERT/UPDATE/DELETE
+    budget: Optional[int] = None  # Предельное число запросов маршрута (query_budget)
+    budget_exceeded: bool = False
+
+    def server_timing(self, wall_seconds: float) -> str:
+        return (
+            f"app;dur={wall_seconds * 1000:.2f}, "
+            f'db;dur={self.db_seconds * 1000:.2f};desc="statements={self.statements} rows={self.rows}"'
+        )
+
+
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """Статистика текущего HTTP-запроса или None вне запроса"""
+    return _current_stats.get()
+
+
+def query_budget(max_statements: int):
+    """
+    Зависимость FastAPI, объявляющая предельное число SQL-запросов на запрос
+    к маршруту (включая проверку пользователя):
+
+        @router.get("/", dependencies=[Depends(query_budget(4))])
+    """
+    async def set_query_budget() -> None:
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.budget = max_statements
+    # Бюджет маршрута читают тесты (tests/test_query_budgets.py)
+    set_query_budget.max_statements = max_statements
+    return set_query_budget
+
+
+def _check_budget(stats: RequestStats, statement: str) -> None:
+    if stats.budget is None or stats.statements <= stats.budget:
+        return
+    if not stats.budget_exceeded:
+        stats.budget_exceeded = True
+        logger.warning(
+            "query_budget_exceeded",
+            budget=stats.budget,
+            statements=stats.statements,
+            statement=statement[:200],
+        )
+    if QUERY_BUDGET_STRICT:
+        raise QueryBudgetExceeded(
+            f"Query budget exceeded: {stats.statements} statements, budget {stats.budget}"
+        )
+
+
+def install_sql_instrumentation(engine: Engine) -> None:
+    """
+    Подключает учёт SQL-запросов к движку. Для AsyncEngine передаётся
+    async_engine.sync_engine.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start_time"].pop()
+        stats = _current_stats.get()
+        if stats is None:
+            return
+        stats.statements += 1
+        stats.db_seconds += time.perf_counter() - started
+        # Для серверных курсоров (stream_results) rowcount неизвестен (-1)
+        if cursor.rowcount and cursor.rowcount > 0:
+            stats.rows += cursor.rowcount
+        _check_budget(stats, statement)
+
+
+def _route_path(scope) -> str:
+    """Шаблон маршрута (/articles/{id}) вместо фактического пути, если маршрут найден"""
+    endpoint = scope.get("endpoint")
+    app = scope.get("app")
+    if endpoint is not None and app is not None:
+        for route in app.routes:
+            if getattr(route, "endpoint", None) is endpoint:
+                return route.path
+    return scope.get("path", "")
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware: Server-Timing в ответе и запись "request" в лог"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message.setdefault("headers", [])
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", stats.server_timing(time.perf_counter() - started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            # Для потоковых ответов (экспорт) сюда попадает и время передачи тела
+            logger.info(
+                "request",
+                method=scope["method"],
+                route=_route_path(scope),
+                status=status_code,
+                wall_ms=round((time.perf_counter() - started) * 1000, 2),
+                db_ms=round(stats.db_seconds * 1000, 2),
+                statements=stats.statements,
+                rows=stats.rows,
+                budget=stats.budget,
+            )
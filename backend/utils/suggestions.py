@@ -0,0 +1,125 @@
+"""
+Сохранённые предложения статей: таблица suggestions (author_id, user_id, score).
+
+В таблице лежат только непривязанные авторы, сопоставленные с пользователями
+по правилам utils.bulk_matcher (score - его confidence), включая фамилии
+с опечатками на расстоянии до FUZZY_MAX_DISTANCE (utils.fuzzy_fio). Таблица ведётся
+инкрементально, полного пересчёта при чтении нет:
+    - импорт CSV, создание и изменение статьи, отвязка автора -
+      refresh_article_suggestions: сопоставляются только авторы этих статей;
+    - создание пользователя и изменение его ФИО - refresh_user_suggestions:
+      пересчитывается только этот пользователь (кандидаты - ключи authors.match_key
+      близких фамилий из индекса author_surname_index);
+    - привязка автора - prune_author_suggestions;
+    - удаление автора или пользователя - каскадом по внешним ключам.
+
+GET /articles/my/suggestions и вариант для менеджеров читают статьи по
+индексу idx_suggestions_user_id (suggested_article_rows), поэтому стоимость
+чтения не зависит от размера корпуса.
+
+Функции принимают Session или Connection и не коммитят.
+"""
+
+from typing import Iterable, List
+
+import pandas as pd
+from sqlalchemy import delete, func, insert, select
+
+from models.article import Article, Author, User
+from models.suggestion import Suggestion
+from utils.article_documents import DOCUMENT_TEXT
+from utils.bulk_matcher import encode_authors, encode_users, match_encoded
+from utils.fio_utils import build_user_match_keys, extract_fio_parts
+from utils.fuzzy_fio import FUZZY_MAX_DISTANCE, author_surname_index
+
+_AUTHOR_COLUMNS = ["id", "article_id", "author_name", "match_key"]
+_USER_COLUMNS = ["id", "full_name"]
+
+
+def _author_frame(db, *conditions) -> pd.DataFrame:
+    rows = db.execute(
+        select(Author.id, Author.article_id, Author.author_name, Author.match_key)
+        .where(Author.user_employee_id.is_(None), *conditions)
+    ).all()
+    return pd.DataFrame(rows, columns=_AUTHOR_COLUMNS)
+
+
+def _user_frame(db) -> pd.DataFrame:
+    return pd.DataFrame(db.execute(select(User.id, User.full_name)).all(), columns=_USER_COLUMNS)
+
+
+def _store(db, authors: pd.DataFrame, users: pd.DataFrame) -> int:
+    """Сопоставляет авторов с пользователями и записывает пары. Возвращает число пар"""
+    if authors.empty or users.empty:
+        return 0
+    result = match_encoded(encode_authors(authors), encode_users(users), max_distance=FUZZY_MAX_DISTANCE)
+    if len(result):
+        db.execute(insert(Suggestion), [
+            {"author_id": author_id, "user_id": user_id, "score": score}
+            for author_id, user_id, score in zip(
+                result.author_ids.tolist(), result.user_ids.tolist(),
+                result.confidence.astype(float).round(2).tolist()
+            )
+        ])
+    return len(result)
+
+
+def refresh_article_suggestions(db, article_ids: Iterable[int]) -> None:
+    """
+    Пересчитывает предложения для авторов указанных статей (со всеми пользователями).
+    Авторы должны быть уже записаны в БД (db.flush()).
+    """
+    article_ids = list(set(article_ids))
+    if not article_ids:
+        return
+    author_ids = select(Author.id).where(Author.article_id.in_(article_ids))
+    db.execute(delete(Suggestion).where(Suggestion.author_id.in_(author_ids)))
+    _store(db, _author_frame(db, Author.article_id.in_(article_ids)), _user_frame(db))
+
+
+def refresh_user_suggestions(db, user_id: int, full_name: str) -> None:
+    """
+    Пересчитывает предложения одного пользователя. Кандидаты отбираются
+    по индексу authors.match_key, поэтому корпус целиком не читается.
+    """
+    db.execute(delete(Suggestion).where(Suggestion.user_id == user_id))
+    surname = extract_fio_parts(full_name)['last_name']
+    if not surname:
+        return
+    # Ключи с той же фамилией (е/ё, латиница) и с фамилиями на расстоянии до FUZZY_MAX_DISTANCE
+    match_keys = set(build_user_match_keys(full_name))
+    match_keys.update(author_surname_index.similar_match_keys(surname))
+    users = pd.DataFrame([(user_id, full_name)], columns=_USER_COLUMNS)
+    _store(db, _author_frame(db, Author.match_key.in_(sorted(match_keys))), users)
+
+
+def prune_author_suggestions(db, author_ids: Iterable[int]) -> None:
+    """Убирает предложения для авторов, которые только что привязаны к пользователю"""
+    author_ids = list(set(author_ids))
+    if author_ids:
+        db.execute(delete(Suggestion).where(Suggestion.author_id.in_(author_ids)))
+
+
+def rebuild_suggestions(db) -> int:
+    """Полный пересчёт таблицы (миграция, заполнение бенчмарка). Возвращает число пар"""
+    db.execute(delete(Suggestion))
+    return _store(db, _author_frame(db), _user_frame(db))
+
+
+def suggested_article_rows(db, user_id: int) -> List:
+    """
+    Статьи, предложенные пользователю (строки id, document), по убыванию
+    лучшего score, затем по id. Один запрос по индексу suggestions.user_id.
+    """
+    best = (
+        select(Author.article_id, func.max(Suggestion.score).label("score"))
+        .join_from(Suggestion, Author, Author.id == Suggestion.author_id)
+        .where(Suggestion.user_id == user_id)
+        .group_by(Author.article_id)
+        .subquery()
+    )
+    return db.execute(
+        select(Article.id, DOCUMENT_TEXT)
+        .join(best, best.c.article_id == Article.id)
+        .order_by(best.c.score.desc(), Article.id)
+    ).all()
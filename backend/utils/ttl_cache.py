@@ -0,0 +1,66 @@
+"""
+Общий кэш внутри процесса: LRU с ограничением числа записей и временем жизни.
+
+На нём построены кэши пользователей (utils.principal_cache), областей
+видимости менеджеров (utils.manager_scope) и количеств статей
+(utils.article_counts). Кэш живёт внутри процесса, поэтому при нескольких
+воркерах uvicorn изменения в соседнем процессе видны только после
+истечения ttl_seconds.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Потокобезопасный LRU-кэш: запись старше ttl_seconds считается отсутствующей,
+    при превышении max_entries вытесняются давно не читавшиеся записи.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, stored_at = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """Сбрасывает записи, для которых predicate(key, value) истинно. Возвращает их число"""
+        with self._lock:
+            keys = [key for key, (value, _) in self._entries.items() if predicate(key, value)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
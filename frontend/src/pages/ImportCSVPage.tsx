@@ -48,10 +48,22 @@ export default function ImportCSVPage() {
         },
       });
 
+      // Импорт выполняется в фоне - опрашиваем состояние задачи до завершения
+      let job = response.data;
+      while (job.status === 'queued' || job.status === 'running') {
+        await new Promise((resolve) => setTimeout(resolve, 1000));
+        job = (await api.get(`/import/jobs/${job.id}`)).data;
+      }
+
+      if (job.status === 'failed') {
+        setError(job.message || 'Ошибка при импорте CSV файла');
+        return;
+      }
+
       setSuccess({
-        message: response.data.message,
-        imported: response.data.imported,
-        skipped: response.data.skipped,
+        message: `Импортировано ${job.imported} статей, пропущено ${job.skipped}`,
+        imported: job.imported,
+        skipped: job.skipped,
       });
       setFile(null);
     } catch (err: any) {